@@ -0,0 +1,290 @@
+"""
+PatchPlanner - Benchmark Suite
+
+Time and measure peak memory of the loader (cold and cached), graph
+construction, every strategy's generate(), SimulationEngine.run and
+write_report on generated scenarios, then optionally compare against a saved
+baseline. CLI cold start (importing the CLI, and `--help`) is timed in fresh
+interpreters and checked against fixed targets.
+
+Usage:
+    python benchmarks/bench.py                                  # 1k/10k/100k nodes
+    python benchmarks/bench.py --sizes 1000 10000 --repeat 3
+    python benchmarks/bench.py --save-baseline                  # record a new baseline
+    python benchmarks/bench.py --baseline benchmarks/results/baseline.json --threshold 0.25
+"""
+
+import argparse
+import gc
+import importlib
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+from patchplanner.generate import GeneratorConfig, write_scenario
+from patchplanner.infra_loader import build_graph, load_scenario
+from patchplanner.planner import STRATEGIES, create_strategy
+from patchplanner.simulator.engine import SimulationEngine
+from patchplanner.simulator.reporter import write_report
+
+BENCH_DIR = Path(__file__).parent
+CACHE_DIR = BENCH_DIR / ".cache"
+RESULTS_DIR = BENCH_DIR / "results"
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+# Planners too slow for large scenarios are skipped above these sizes unless
+# --no-limits is given. The optimal search uses up its whole time budget on
+# anything but small scenarios, which says nothing about the code.
+SIZE_LIMITS = {"optimal": 1_000}
+
+# Imported by the package on first use; imported up front here so that no
+# case pays for them.
+LAZY_DEPENDENCIES = ("yaml", "networkx")
+
+# Cases faster than this are too noisy to flag as time regressions
+NOISE_FLOOR_SECONDS = 0.005
+
+# Cold-start commands, run in a fresh interpreter, and the wall time each must
+# stay under. The CLI is invoked thousands of times by orchestration jobs.
+STARTUP_COMMANDS = {
+    "startup.import_cli": ["-c", "import patchplanner.cli"],
+    "startup.help": ["-m", "patchplanner.cli", "--help"],
+}
+STARTUP_TARGET_SECONDS = {
+    "startup.import_cli": 0.15,
+    "startup.help": 0.3,
+}
+
+
+def measure(func, repeat: int, memory: bool):
+    """Best wall time over ``repeat`` calls, plus peak traced memory of one more call.
+
+    Memory is measured in a separate call because tracemalloc slows down
+    allocation-heavy code.
+    """
+    times = []
+    value = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        value = func()
+        times.append(time.perf_counter() - start)
+    result = {"seconds": min(times)}
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result["peak_bytes"] = peak
+    return result, value
+
+
+def scenario_path(nodes: int, seed: int) -> Path:
+    """Generate (once) and return the benchmark scenario with ``nodes`` nodes."""
+    path = CACHE_DIR / f"layered-{nodes}-{seed}.yaml"
+    if not path.exists():
+        config = GeneratorConfig(
+            topology="layered",
+            nodes=nodes,
+            seed=seed,
+            patch_profiles=("config", "restart", "reboot"),
+            degraded_ratio=0.05,
+        )
+        write_scenario(config, path)
+    return path
+
+
+def run_size(nodes: int, args, results: dict) -> None:
+    def record(case: str, func):
+        key = f"{case}[{nodes}]"
+        print(f"  {key}...", end=" ", flush=True)
+        try:
+            measured, value = measure(func, args.repeat, not args.no_memory)
+        except Exception as exc:
+            results[key] = {"error": f"{type(exc).__name__}: {exc}"}
+            print("ERROR")
+            return None
+        results[key] = measured
+        print(format_measurement(measured))
+        return value
+
+    path = scenario_path(nodes, args.seed)
+    scenario = record("load_scenario", lambda: load_scenario(path))
+    if scenario is None:
+        return
+    with tempfile.TemporaryDirectory() as cache_dir:
+        load_scenario(path, cache_dir=cache_dir)
+        record("load_scenario_cached", lambda: load_scenario(path, cache_dir=cache_dir))
+    graph, edges = record("build_graph", lambda: build_graph(scenario))
+    record("build_graph.csr", lambda: build_graph(scenario, backend="csr"))
+    engine = SimulationEngine(scenario, graph, edges)
+
+    report_result = None
+    for strategy in args.strategy:
+        limit = SIZE_LIMITS.get(strategy)
+        if limit is not None and nodes > limit and not args.no_limits:
+            results[f"generate.{strategy}[{nodes}]"] = {"skipped": f"above {limit} nodes"}
+            print(f"  generate.{strategy}[{nodes}]... skipped (above {limit} nodes)")
+            continue
+        plan = record(
+            f"generate.{strategy}",
+            lambda: create_strategy(strategy, scenario, graph).generate(),
+        )
+        if plan is None:
+            continue
+        result = record(f"run.{strategy}", lambda: engine.run(plan, seed=args.seed))
+        if result is not None and (report_result is None or strategy == "rolling"):
+            report_result = result
+
+    if report_result is not None:
+        with tempfile.TemporaryDirectory() as out_dir:
+            record(
+                "write_report",
+                lambda: write_report(
+                    out_dir, report_result.plan, report_result.events, report_result.metrics
+                ),
+            )
+
+
+def run_startup(args, results: dict) -> list:
+    """Time each startup command; return (case, target, seconds) for missed targets."""
+    missed = []
+    for case, command in STARTUP_COMMANDS.items():
+        print(f"  {case}...", end=" ", flush=True)
+        measured, _ = measure(
+            lambda: subprocess.run([sys.executable, *command], capture_output=True, check=True),
+            max(args.repeat, 5),
+            memory=False,
+        )
+        results[case] = measured
+        print(format_measurement(measured))
+        target = STARTUP_TARGET_SECONDS[case]
+        if measured["seconds"] > target:
+            missed.append((case, target, measured["seconds"]))
+    return missed
+
+
+def format_measurement(measured: dict) -> str:
+    text = f"{measured['seconds']:.4f}s"
+    if "peak_bytes" in measured:
+        text += f" {measured['peak_bytes'] / 2**20:.1f} MiB"
+    return text
+
+
+def compare_to_baseline(results: dict, baseline: dict, threshold: float) -> list:
+    """Return (case, metric, baseline, current) for every regression beyond ``threshold``."""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None or "seconds" not in current or "seconds" not in previous:
+            continue
+        if previous["seconds"] >= NOISE_FLOOR_SECONDS and (
+            current["seconds"] > previous["seconds"] * (1 + threshold)
+        ):
+            regressions.append((key, "seconds", previous["seconds"], current["seconds"]))
+        if "peak_bytes" in current and "peak_bytes" in previous and (
+            current["peak_bytes"] > previous["peak_bytes"] * (1 + threshold)
+        ):
+            regressions.append((key, "peak_bytes", previous["peak_bytes"], current["peak_bytes"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run PatchPlanner benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument(
+        "--strategy",
+        nargs="+",
+        choices=sorted(STRATEGIES),
+        default=list(STRATEGIES),
+        help="Strategies to benchmark (default: all)",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Timed calls per case (best is kept)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--no-limits", action="store_true", help="Ignore SIZE_LIMITS")
+    parser.add_argument(
+        "--no-startup", action="store_true", help="Skip the CLI cold-start cases"
+    )
+    parser.add_argument(
+        "--out", default=str(RESULTS_DIR / "latest.json"), help="Where to write results JSON"
+    )
+    parser.add_argument(
+        "--baseline", default=str(RESULTS_DIR / "baseline.json"), help="Baseline to compare with"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="Allowed slowdown/growth, e.g. 0.2 = 20%%"
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Also write results to --baseline"
+    )
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("PatchPlanner Benchmarks")
+    print("=" * 60)
+
+    results = {}
+    missed = []
+    if not args.no_startup:
+        print("\n[startup]")
+        missed = run_startup(args, results)
+    for module in LAZY_DEPENDENCIES:
+        importlib.import_module(module)
+    for nodes in args.sizes:
+        print(f"\n[{nodes} nodes]")
+        run_size(nodes, args, results)
+
+    document = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": args.sizes,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    out_path = Path(args.out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(document, indent=2), encoding="utf-8")
+    print(f"\nResults saved to: {out_path}")
+
+    for case, target, seconds in missed:
+        print(f"Startup target missed: {case} took {seconds:.3f}s (target {target:.3f}s)")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(document, indent=2), encoding="utf-8")
+        print(f"Baseline saved to: {baseline_path}")
+        sys.exit(1 if missed else 0)
+
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; run with --save-baseline to create one.")
+        sys.exit(1 if missed else 0)
+
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))["results"]
+    regressions = compare_to_baseline(results, baseline, args.threshold)
+    if not regressions:
+        print(f"No regressions beyond {args.threshold:.0%} against {baseline_path}")
+        sys.exit(1 if missed else 0)
+    print(f"\nRegressions beyond {args.threshold:.0%} against {baseline_path}:")
+    for key, metric, previous, current in regressions:
+        print(f"  {key} {metric}: {previous:,.4g} -> {current:,.4g} ({current / previous:.2f}x)")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
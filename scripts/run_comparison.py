@@ -7,15 +7,17 @@ Usage:
     python scripts/run_comparison.py                    # Run all
     python scripts/run_comparison.py --scenario scenario1  # Single scenario
     python scripts/run_comparison.py --strategy hybrid     # Single strategy
+    python scripts/run_comparison.py --num-seeds 200 --jobs 8  # Seed sweep in parallel
 """
 
 import argparse
-import csv
 import json
-import subprocess
-import sys
 from pathlib import Path
 
+from patchplanner.compare import aggregate, compare
+from patchplanner.infra_loader import default_cache_dir
+from patchplanner.planner import STRATEGIES as REGISTRY
+
 # Project paths
 PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
@@ -23,7 +25,7 @@ RESULTS_DIR = PROJECT_ROOT / "results"
 
 # Available options
 SCENARIOS = ["scenario1", "scenario2", "scenario3"]
-STRATEGIES = ["bigbang", "rolling", "batch_rolling", "canary", "bluegreen", "dep_greedy", "hybrid"]
+STRATEGIES = list(REGISTRY)
 
 # Key metrics to compare
 KEY_METRICS = [
@@ -39,45 +41,6 @@ KEY_METRICS = [
 ]
 
 
-def run_simulation(scenario: str, strategy: str, seed: int = 42) -> dict:
-    """Run a single simulation and return metrics."""
-    out_dir = RESULTS_DIR / scenario / strategy
-    out_dir.mkdir(parents=True, exist_ok=True)
-    
-    cmd = [
-        sys.executable, "-m", "patchplanner.cli",
-        "--scenario", str(DATA_DIR / f"{scenario}.yaml"),
-        "--strategy", strategy,
-        "--out", str(out_dir),
-        "--seed", str(seed),
-    ]
-    
-    print(f"  Running {strategy} on {scenario}...", end=" ", flush=True)
-    
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=PROJECT_ROOT)
-        if result.returncode != 0:
-            print(f"FAILED")
-            print(f"    Error: {result.stderr.strip()}")
-            return {"error": result.stderr.strip()}
-        print("OK")
-    except Exception as e:
-        print(f"ERROR: {e}")
-        return {"error": str(e)}
-    
-    # Read metrics
-    metrics_file = out_dir / "metrics.csv"
-    if metrics_file.exists():
-        metrics = {}
-        with open(metrics_file, "r") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                metrics[row["metric"]] = row["value"]
-        return metrics
-    
-    return {"error": "No metrics file generated"}
-
-
 def generate_comparison_table(all_results: dict) -> str:
     """Generate a markdown comparison table."""
     lines = ["# Strategy Comparison Results\n"]
@@ -165,6 +128,8 @@ def main():
     parser.add_argument("--scenario", choices=SCENARIOS, help="Run only this scenario")
     parser.add_argument("--strategy", choices=STRATEGIES, help="Run only this strategy")
     parser.add_argument("--seed", type=int, default=42, help="Random seed for reproducibility")
+    parser.add_argument("--num-seeds", type=int, default=1, help="Average over this many seeds")
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes (0: one per CPU)")
     args = parser.parse_args()
     
     scenarios = [args.scenario] if args.scenario else SCENARIOS
@@ -175,15 +140,24 @@ def main():
     print("=" * 60)
     
     RESULTS_DIR.mkdir(exist_ok=True)
-    all_results = {}
-    
-    for scenario in scenarios:
+    runs = compare(
+        [DATA_DIR / f"{scenario}.yaml" for scenario in scenarios],
+        strategies,
+        seeds=range(args.seed, args.seed + args.num_seeds),
+        jobs=args.jobs or None,
+        report_dir=RESULTS_DIR,
+        cache_dir=default_cache_dir(),
+    )
+    all_results = aggregate(runs)
+
+    for scenario, by_strategy in all_results.items():
         print(f"\n[{scenario}]")
-        all_results[scenario] = {}
-        
-        for strategy in strategies:
-            metrics = run_simulation(scenario, strategy, args.seed)
-            all_results[scenario][strategy] = metrics
+        for strategy, metrics in by_strategy.items():
+            if "error" in metrics:
+                print(f"  {strategy}: FAILED")
+                print(f"    Error: {metrics['error']}")
+            else:
+                print(f"  {strategy}: OK")
     
     # Save raw results as JSON
     results_json = RESULTS_DIR / "all_results.json"
@@ -13,8 +13,11 @@ import json
 import sys
 from pathlib import Path
 
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
+try:
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as mpatches
+except ImportError:  # optional dependency, only needed for charts
+    sys.exit("matplotlib is required for charts: pip install -e '.[viz]'")
 
 # Key metrics to visualize
 METRICS = {
@@ -1,61 +1,489 @@
-"""Command-line interface for PatchPlanner simulator."""
+"""Command-line interface for PatchPlanner simulator.
+
+Only argparse and lightweight modules are imported up front; the loader,
+planners and simulator are imported once arguments have been parsed, so
+``--help`` and argument errors return without loading NumPy, pydantic or
+networkx.
+"""
 from __future__ import annotations
 
 import argparse
+import json
+import sys
+from dataclasses import asdict
+from pathlib import Path
+from typing import List, Optional
 
-from .infra_loader import build_graph, load_scenario
-from .planner import (
-    BatchRollingStrategy,
-    BigBangStrategy,
-    BlueGreenStrategy,
-    CanaryStrategy,
-    DependencyAwareGreedyStrategy,
-    HybridRiskAwareStrategy,
-    RollingStrategy,
+from .generate import (
+    PATCH_PROFILES,
+    TOPOLOGIES,
+    GeneratorConfig,
+    write_inventory,
+    write_scenario,
 )
-from .simulator.engine import SimulationEngine
-from .simulator.reporter import write_report
-
-# Registry of available deployment strategies
-STRATEGIES = {
-    "bigbang": BigBangStrategy,
-    "rolling": RollingStrategy,
-    "batch_rolling": BatchRollingStrategy,
-    "canary": CanaryStrategy,
-    "bluegreen": BlueGreenStrategy,
-    "dep_greedy": DependencyAwareGreedyStrategy,
-    "hybrid": HybridRiskAwareStrategy,
-}
+from .options import ENGINE_MODES, GRAPH_BACKENDS, SEARCH_MODES, TUNABLE_PARAMS
+from .planner import STRATEGIES
+from .simulator.events import EVENT_LEVELS
+
+# Metrics echoed to stdout by ``patchplanner compare``
+COMPARE_SUMMARY_METRICS = (
+    "time_to_full_patch",
+    "exposure_window_weighted",
+    "total_downtime_seconds_overall",
+    "rollback_count",
+)
+
+
+def _strategy_params(strategy: str, args: argparse.Namespace) -> dict:
+    if strategy == "batch_rolling":
+        return {"batch_size": args.batch_size}
+    if strategy == "dep_greedy":
+        return {"waves": args.waves}
+    if strategy == "optimal":
+        return {"time_budget": args.time_budget}
+    if strategy == "hybrid":
+        return {"cooldown_seconds": args.cooldown_seconds}
+    if strategy == "canary":
+        return {"pause_seconds": args.pause_seconds}
+    return {}
+
+
+def _add_waves(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--waves",
+        action="store_true",
+        help="dep_greedy: patch all ready groups that fit min_up together in one step",
+    )
+
+
+def _add_time_budget(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=5.0,
+        help="optimal: seconds to search before returning the best plan found (default: 5)",
+    )
+
+
+def _add_pauses(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--cooldown-seconds",
+        type=int,
+        default=30,
+        help="hybrid: pause after each group (default: 30)",
+    )
+    parser.add_argument(
+        "--pause-seconds",
+        type=int,
+        default=60,
+        help="canary: pause to observe the canaries (default: 60)",
+    )
+
+
+def _add_engine_mode(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--engine-mode",
+        choices=ENGINE_MODES,
+        default="step",
+        help="step: each plan step is a barrier; event: nodes complete independently",
+    )
+
+
+def _add_graph_backend(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--graph-backend",
+        choices=GRAPH_BACKENDS,
+        default="networkx",
+        help="networkx: DiGraph with attribute dicts; csr: compact array-backed graph",
+    )
+
+
+def _add_scenario_cache(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--scenario-cache",
+        default=None,
+        help="Directory for compiled scenarios (default: $PATCHPLANNER_CACHE_DIR "
+        "or ~/.cache/patchplanner)",
+    )
+    parser.add_argument(
+        "--no-scenario-cache",
+        action="store_true",
+        help="Always parse and validate the scenario file",
+    )
+
+
+def _scenario_cache_dir(args: argparse.Namespace) -> Optional[Path]:
+    from .infra_loader import default_cache_dir
+
+    if args.no_scenario_cache:
+        return None
+    return Path(args.scenario_cache) if args.scenario_cache else default_cache_dir()
+
+
+def _add_plan_cache(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--plan-cache",
+        default=None,
+        help="Directory for generated plans (default: $PATCHPLANNER_CACHE_DIR "
+        "or ~/.cache/patchplanner)",
+    )
+    parser.add_argument(
+        "--no-plan-cache",
+        action="store_true",
+        help="Always generate the plan",
+    )
+
+
+def _plan_cache_dir(args: argparse.Namespace) -> Optional[Path]:
+    from .infra_loader import default_cache_dir
+
+    if args.no_plan_cache:
+        return None
+    return Path(args.plan_cache) if args.plan_cache else default_cache_dir()
+
 
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in SUBCOMMANDS:
+        SUBCOMMANDS[argv[0]](argv[1:])
+        return
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Patch planner simulator")
+    parser = argparse.ArgumentParser(
+        description="Patch planner simulator",
+        epilog="Subcommands: compare (multi-scenario comparison), "
+        "generate (synthetic scenarios), tune (parameter search). "
+        "Run '<subcommand> --help' for details.",
+    )
     parser.add_argument("--scenario", required=True, help="Path to scenario YAML")
     parser.add_argument(
         "--strategy",
         required=True,
-        choices=sorted(STRATEGIES.keys()),
+        choices=STRATEGIES,
+        metavar="STRATEGY",
+        help="Deployment strategy: %(choices)s",
     )
     parser.add_argument("--out", required=True, help="Output directory")
     parser.add_argument("--seed", type=int, default=None)
     parser.add_argument("--batch-size", type=int, default=2)
-    args = parser.parse_args()
+    _add_waves(parser)
+    _add_time_budget(parser)
+    _add_pauses(parser)
+    _add_engine_mode(parser)
+    parser.add_argument(
+        "--event-level",
+        choices=list(EVENT_LEVELS),
+        default="node",
+        help="Detail streamed to events.jsonl: off, step events only, or per-node events",
+    )
+    _add_graph_backend(parser)
+    _add_scenario_cache(parser)
+    _add_plan_cache(parser)
+    args = parser.parse_args(argv)
+
+    from .infra_loader import build_graph, load_scenario
+    from .plan_cache import generate_plan
+    from .simulator.engine import SimulationEngine
+    from .simulator.events import JsonlSink
+    from .simulator.reporter import write_report
 
     # Load scenario from YAML and build dependency graph
-    scenario = load_scenario(args.scenario)
-    graph, edges = build_graph(scenario)
+    scenario = load_scenario(args.scenario, cache_dir=_scenario_cache_dir(args))
+    graph, edges = build_graph(scenario, backend=args.graph_backend)
+
+    # Generate the selected strategy's plan, or reuse it from the plan cache
+    plan = generate_plan(
+        args.strategy,
+        scenario,
+        graph,
+        _strategy_params(args.strategy, args),
+        cache_dir=_plan_cache_dir(args),
+    )
+    engine = SimulationEngine(scenario, graph, edges)
+    # Stream events straight to disk rather than holding them for the report
+    with JsonlSink(Path(args.out) / "events.jsonl", EVENT_LEVELS[args.event_level]) as sink:
+        result = engine.run(plan, seed=args.seed, mode=args.engine_mode, sink=sink)
+    write_report(args.out, result.plan, None, result.metrics)
+
 
-    # Instantiate the selected strategy
-    strategy_cls = STRATEGIES[args.strategy]
-    if args.strategy == "batch_rolling":
-        strategy = strategy_cls(scenario, graph, batch_size=args.batch_size)
+def compare_main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="patchplanner compare",
+        description="Compare strategies across scenarios and seeds in-process",
+    )
+    parser.add_argument(
+        "--scenario", required=True, nargs="+", help="Paths to scenario YAML files"
+    )
+    parser.add_argument(
+        "--strategy",
+        nargs="+",
+        choices=STRATEGIES,
+        metavar="STRATEGY",
+        help="Strategies to run (default: all): %(choices)s",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="First seed")
+    parser.add_argument(
+        "--num-seeds", type=int, default=1, help="Run seeds seed..seed+num_seeds-1"
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=1, help="Worker processes (0: one per CPU)"
+    )
+    parser.add_argument("--batch-size", type=int, default=2)
+    _add_waves(parser)
+    _add_time_budget(parser)
+    _add_pauses(parser)
+    _add_engine_mode(parser)
+    parser.add_argument(
+        "--out",
+        default=None,
+        help="Directory for all_results.json (seed means) and runs.jsonl (every run)",
+    )
+    _add_graph_backend(parser)
+    _add_scenario_cache(parser)
+    _add_plan_cache(parser)
+    args = parser.parse_args(argv)
+    strategies = args.strategy or list(STRATEGIES)
+
+    from .compare import aggregate, compare
+
+    runs = compare(
+        args.scenario,
+        strategies,
+        seeds=range(args.seed, args.seed + args.num_seeds),
+        jobs=args.jobs or None,
+        strategy_params={name: _strategy_params(name, args) for name in strategies},
+        mode=args.engine_mode,
+        cache_dir=_scenario_cache_dir(args),
+        graph_backend=args.graph_backend,
+        plan_cache_dir=_plan_cache_dir(args),
+    )
+    results = aggregate(runs)
+
+    if args.out is not None:
+        out_dir = Path(args.out)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        with (out_dir / "all_results.json").open("w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+        with (out_dir / "runs.jsonl").open("w", encoding="utf-8") as handle:
+            for run in runs:
+                handle.write(json.dumps(asdict(run)) + "\n")
+
+    for scenario, by_strategy in results.items():
+        print(f"[{scenario}]")
+        for strategy, metrics in by_strategy.items():
+            if "error" in metrics:
+                print(f"  {strategy}: FAILED {metrics['error']}")
+                continue
+            summary = " ".join(
+                f"{metric}={metrics[metric]:g}" for metric in COMPARE_SUMMARY_METRICS
+            )
+            print(f"  {strategy}: {summary}")
+
+
+def generate_main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="patchplanner generate",
+        description="Write a reproducible synthetic scenario YAML",
+    )
+    parser.add_argument(
+        "--out",
+        required=True,
+        help="Scenario YAML to write, or the inventory directory for jsonl/csv",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("yaml", "jsonl", "csv"),
+        default="yaml",
+        help="yaml: one scenario file; jsonl/csv: inventory directory",
+    )
+    parser.add_argument("--topology", choices=TOPOLOGIES, default="layered")
+    parser.add_argument("--nodes", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--service-size",
+        type=int,
+        nargs=2,
+        metavar=("MIN", "MAX"),
+        default=(2, 6),
+        help="Instances per service",
+    )
+    parser.add_argument(
+        "--min-up-ratio", type=float, default=0.5, help="Share of instances kept up"
+    )
+    parser.add_argument(
+        "--patch-profile",
+        nargs="+",
+        choices=sorted(PATCH_PROFILES),
+        default=["restart"],
+        help="Profiles services draw their patch from",
+    )
+    parser.add_argument("--fan-out", type=int, default=2, help="Dependencies per service")
+    parser.add_argument("--degraded-ratio", type=float, default=0.0)
+    parser.add_argument("--layers", type=int, default=4)
+    parser.add_argument("--cluster-size", type=int, default=2)
+    parser.add_argument("--name", default=None, help="Scenario name")
+    args = parser.parse_args(argv)
+
+    config = GeneratorConfig(
+        topology=args.topology,
+        nodes=args.nodes,
+        seed=args.seed,
+        service_size=tuple(args.service_size),
+        min_up_ratio=args.min_up_ratio,
+        patch_profiles=tuple(args.patch_profile),
+        fan_out=args.fan_out,
+        degraded_ratio=args.degraded_ratio,
+        layers=args.layers,
+        cluster_size=args.cluster_size,
+        name=args.name,
+    )
+    if args.format == "yaml":
+        nodes, edges = write_scenario(config, args.out)
     else:
-        strategy = strategy_cls(scenario, graph)
+        nodes, edges = write_inventory(config, args.out, args.format)
+    print(f"Wrote {nodes} nodes and {edges} edges to {args.out}")
 
-    plan = strategy.generate()
-    engine = SimulationEngine(scenario, graph, edges)
-    result = engine.run(plan, seed=args.seed)
-    write_report(args.out, result.plan, result.events, result.metrics)
+
+def _parse_param(text: str) -> tuple:
+    """``NAME=V1,V2,...`` as (name, values); values are read as JSON, else kept as text."""
+    name, sep, values = text.partition("=")
+    if not sep or not name or not values:
+        raise argparse.ArgumentTypeError(f"expected NAME=V1,V2,...: {text!r}")
+    parsed = []
+    for value in values.split(","):
+        try:
+            parsed.append(json.loads(value))
+        except ValueError:
+            parsed.append(value)
+    return name, parsed
+
+
+def tune_main(argv: Optional[List[str]] = None) -> None:
+    spaces = "; ".join(
+        " ".join(f"{name}={','.join(map(str, values))}" for name, values in space.items())
+        + f" ({strategy})"
+        for strategy, space in TUNABLE_PARAMS.items()
+    )
+    parser = argparse.ArgumentParser(
+        prog="patchplanner tune",
+        description="Search a strategy's parameters for the lowest objective",
+        epilog=f"Default parameter spaces: {spaces}.",
+    )
+    parser.add_argument(
+        "--scenario", required=True, nargs="+", help="Paths to scenario YAML files"
+    )
+    parser.add_argument(
+        "--strategy",
+        required=True,
+        choices=STRATEGIES,
+        metavar="STRATEGY",
+        help="Strategy to tune: %(choices)s",
+    )
+    parser.add_argument(
+        "--param",
+        type=_parse_param,
+        action="append",
+        metavar="NAME=V1,V2,...",
+        help="Constructor parameter and the values to try; repeat for several "
+        "(default: the strategy's space listed below)",
+    )
+    parser.add_argument(
+        "--objective",
+        default="time_to_full_patch",
+        help="Expression over metric names to minimise, e.g. "
+        "'time_to_full_patch + 0.01 * exposure_window_weighted' (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--search",
+        choices=SEARCH_MODES,
+        default="grid",
+        help="grid: every combination; random: --samples of them; "
+        "halving: successive halving over seeds",
+    )
+    parser.add_argument(
+        "--samples", type=int, default=None, help="Combinations to draw (random, halving)"
+    )
+    parser.add_argument("--search-seed", type=int, default=0, help="Seed for drawing samples")
+    parser.add_argument("--seed", type=int, default=42, help="First seed")
+    parser.add_argument(
+        "--num-seeds", type=int, default=3, help="Run seeds seed..seed+num_seeds-1"
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=1, help="Worker processes (0: one per CPU)"
+    )
+    _add_engine_mode(parser)
+    parser.add_argument(
+        "--out",
+        default=None,
+        help="Directory for best.json (best parameters) and trials.jsonl (every candidate)",
+    )
+    _add_graph_backend(parser)
+    _add_scenario_cache(parser)
+    _add_plan_cache(parser)
+    args = parser.parse_args(argv)
+
+    from .compare import aggregate
+    from .tune import tune
+
+    try:
+        trials = tune(
+            args.scenario,
+            args.strategy,
+            objective=args.objective,
+            space=dict(args.param) if args.param else None,
+            search=args.search,
+            seeds=range(args.seed, args.seed + args.num_seeds),
+            samples=args.samples,
+            search_seed=args.search_seed,
+            jobs=args.jobs or None,
+            mode=args.engine_mode,
+            cache_dir=_scenario_cache_dir(args),
+            graph_backend=args.graph_backend,
+            plan_cache_dir=_plan_cache_dir(args),
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    def record(trial) -> dict:
+        return {
+            "params": trial.params,
+            "score": trial.score if trial.error is None else None,
+            "seeds": trial.seeds,
+            "error": trial.error,
+            "metrics": {
+                scenario: by_strategy[args.strategy]
+                for scenario, by_strategy in aggregate(trial.runs).items()
+            },
+        }
+
+    best = trials[0]
+    if args.out is not None:
+        out_dir = Path(args.out)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        with (out_dir / "best.json").open("w", encoding="utf-8") as handle:
+            json.dump(
+                {"strategy": args.strategy, "objective": args.objective, **record(best)},
+                handle,
+                indent=2,
+            )
+        with (out_dir / "trials.jsonl").open("w", encoding="utf-8") as handle:
+            for trial in trials:
+                handle.write(json.dumps(record(trial)) + "\n")
+
+    for trial in trials:
+        params = " ".join(f"{name}={value}" for name, value in trial.params.items())
+        outcome = f"FAILED {trial.error}" if trial.error else f"score={trial.score:g}"
+        print(f"  {params}: {outcome} seeds={trial.seeds}")
+    if best.error is not None:
+        sys.exit(f"Every candidate failed; first error: {best.error}")
+    params = " ".join(f"{name}={value}" for name, value in best.params.items())
+    print(f"Best {args.strategy}: {params} (score {best.score:g})")
+
+
+SUBCOMMANDS = {
+    "compare": compare_main,
+    "generate": generate_main,
+    "tune": tune_main,
+}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,246 @@
+"""In-process comparison of strategies across scenarios and seeds."""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from statistics import fmean
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .infra_loader import build_graph, load_scenario
+from .models import ScenarioSpec
+from .plan_cache import generate_plan
+from .simulator.engine import SimulationEngine
+from .simulator.events import JsonlSink, NullSink
+from .simulator.reporter import write_report
+
+
+@dataclass
+class ComparisonRun:
+    """Outcome of one scenario × strategy × seed run.
+
+    ``metrics`` holds the engine's metrics as returned by ``SimulationEngine.run``;
+    it is empty and ``error`` is set when planning or simulating raised.
+    """
+    scenario: str
+    strategy: str
+    seed: Optional[int]
+    metrics: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass(frozen=True)
+class _Task:
+    scenario_path: str
+    strategy: str
+    params: Mapping[str, Any]
+    seeds: Tuple[Optional[int], ...]
+    mode: str
+    report_dir: Optional[str]
+    cache_dir: Optional[str]
+    graph_backend: str
+    plan_cache_dir: Optional[str]
+
+
+# Scenarios loaded by the tasks of the current run, keyed by path and graph
+# backend, so a scenario is parsed at most once per run in each process. Pool
+# workers drop theirs with the pool; a run in this process clears it when done,
+# so later runs see changed files and nothing stays loaded.
+_LOADED: Dict[Tuple[str, str], Tuple[ScenarioSpec, Any, SimulationEngine]] = {}
+
+
+def _load(
+    path: str, cache_dir: Optional[str], graph_backend: str = "networkx"
+) -> Tuple[ScenarioSpec, Any, SimulationEngine]:
+    loaded = _LOADED.get((path, graph_backend))
+    if loaded is None:
+        scenario = load_scenario(path, cache_dir=cache_dir)
+        graph, edges = build_graph(scenario, backend=graph_backend)
+        loaded = _LOADED[path, graph_backend] = (
+            scenario,
+            graph,
+            SimulationEngine(scenario, graph, edges),
+        )
+    return loaded
+
+
+def scenario_name(path: str | Path) -> str:
+    """Name a scenario in results by its file stem (``data/scenario1.yaml`` -> ``scenario1``)."""
+    return Path(path).stem
+
+
+def _run_task(task: _Task) -> List[ComparisonRun]:
+    name = scenario_name(task.scenario_path)
+    try:
+        scenario, graph, engine = _load(
+            task.scenario_path, task.cache_dir, task.graph_backend
+        )
+        plan = generate_plan(
+            task.strategy, scenario, graph, task.params, cache_dir=task.plan_cache_dir
+        )
+    except Exception as exc:  # reported per run, like a failed CLI invocation
+        return [
+            ComparisonRun(name, task.strategy, seed, error=f"{type(exc).__name__}: {exc}")
+            for seed in task.seeds
+        ]
+
+    runs = []
+    for position, seed in enumerate(task.seeds):
+        # Only a reported run keeps its events; the rest never build them.
+        out_dir = None
+        sink = NullSink()
+        if task.report_dir is not None and position == 0:
+            out_dir = Path(task.report_dir) / name / task.strategy
+            sink = JsonlSink(out_dir / "events.jsonl")
+        try:
+            with sink:
+                result = engine.run(plan, seed=seed, mode=task.mode, sink=sink)
+        except Exception as exc:
+            runs.append(
+                ComparisonRun(name, task.strategy, seed, error=f"{type(exc).__name__}: {exc}")
+            )
+            continue
+        if out_dir is not None:
+            write_report(out_dir, result.plan, None, result.metrics)
+        runs.append(ComparisonRun(name, task.strategy, seed, metrics=result.metrics))
+    return runs
+
+
+def compare(
+    scenarios: Iterable[str | Path],
+    strategies: Iterable[str],
+    seeds: Iterable[Optional[int]] = (None,),
+    jobs: Optional[int] = 1,
+    strategy_params: Optional[Mapping[str, Mapping[str, Any]]] = None,
+    mode: str = "step",
+    report_dir: Optional[str | Path] = None,
+    cache_dir: Optional[str | Path] = None,
+    graph_backend: str = "networkx",
+    plan_cache_dir: Optional[str | Path] = None,
+) -> List[ComparisonRun]:
+    """Run every strategy on every scenario for every seed.
+
+    Work is split into one task per scenario × strategy: the plan is generated
+    once and simulated for each seed on a shared engine. With ``jobs`` > 1
+    tasks run in a process pool (``None`` uses one worker per CPU), each worker
+    loading a scenario at most once. ``strategy_params`` maps a strategy name to
+    keyword arguments for its constructor. When ``report_dir`` is given, the
+    first seed of each task also writes the usual report files to
+    ``report_dir/<scenario>/<strategy>/``. ``cache_dir`` is passed on to
+    ``load_scenario`` so that repeated sweeps skip parsing unchanged scenarios,
+    and ``graph_backend`` to ``build_graph``. With ``plan_cache_dir``, plans
+    are reused from a :class:`~patchplanner.plan_cache.PlanCache` there.
+
+    Runs are returned in scenario, strategy, seed order regardless of ``jobs``.
+    """
+    seeds = tuple(seeds)
+    strategies = tuple(strategies)
+    strategy_params = strategy_params or {}
+    tasks = [
+        _Task(
+            scenario_path=str(path),
+            strategy=strategy,
+            params=dict(strategy_params.get(strategy, {})),
+            seeds=seeds,
+            mode=mode,
+            report_dir=None if report_dir is None else str(report_dir),
+            cache_dir=None if cache_dir is None else str(cache_dir),
+            graph_backend=graph_backend,
+            plan_cache_dir=None if plan_cache_dir is None else str(plan_cache_dir),
+        )
+        for path in scenarios
+        for strategy in strategies
+    ]
+    return [run for batch in _run_tasks(tasks, jobs) for run in batch]
+
+
+def compare_variants(
+    scenarios: Iterable[str | Path],
+    strategy: str,
+    variants: Iterable[Tuple[Mapping[str, Any], Iterable[Optional[int]]]],
+    jobs: Optional[int] = 1,
+    mode: str = "step",
+    cache_dir: Optional[str | Path] = None,
+    graph_backend: str = "networkx",
+    plan_cache_dir: Optional[str | Path] = None,
+) -> List[List[ComparisonRun]]:
+    """Run ``strategy`` with each ``(params, seeds)`` variant on every scenario.
+
+    Returns the runs of each variant, in scenario then seed order; all
+    variants share one pool of ``jobs`` processes. The other arguments are as
+    in :func:`compare`.
+    """
+    scenarios = [str(path) for path in scenarios]
+    variants = [(dict(params), tuple(seeds)) for params, seeds in variants]
+    tasks = [
+        _Task(
+            scenario_path=path,
+            strategy=strategy,
+            params=params,
+            seeds=seeds,
+            mode=mode,
+            report_dir=None,
+            cache_dir=None if cache_dir is None else str(cache_dir),
+            graph_backend=graph_backend,
+            plan_cache_dir=None if plan_cache_dir is None else str(plan_cache_dir),
+        )
+        for params, seeds in variants
+        for path in scenarios
+    ]
+    batches = iter(_run_tasks(tasks, jobs))
+    return [[run for _ in scenarios for run in next(batches)] for _ in variants]
+
+
+def _run_tasks(tasks: Sequence[_Task], jobs: Optional[int]) -> List[List[ComparisonRun]]:
+    """Runs of every task, in order, in a pool of ``jobs`` processes (``None``: one per CPU)."""
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if jobs <= 1 or len(tasks) <= 1:
+        try:
+            return [_run_task(task) for task in tasks]
+        finally:
+            _LOADED.clear()
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+        return list(pool.map(_run_task, tasks))
+
+
+def aggregate(runs: Sequence[ComparisonRun]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Average metrics over seeds, keyed by scenario then strategy.
+
+    Per-service metrics such as ``total_downtime_seconds`` are averaged per
+    service, counting a service a run did not list as 0.
+
+    A scenario × strategy pair with any failed run reports ``{"error": ...}``
+    with the first error instead, matching the layout of ``all_results.json``.
+    """
+    grouped: Dict[str, Dict[str, List[ComparisonRun]]] = {}
+    for run in runs:
+        grouped.setdefault(run.scenario, {}).setdefault(run.strategy, []).append(run)
+
+    results: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for scenario, by_strategy in grouped.items():
+        results[scenario] = {}
+        for strategy, strategy_runs in by_strategy.items():
+            failed = next((run for run in strategy_runs if not run.ok), None)
+            if failed is not None:
+                results[scenario][strategy] = {"error": failed.error}
+                continue
+            results[scenario][strategy] = {
+                metric: _mean([run.metrics[metric] for run in strategy_runs])
+                for metric, value in strategy_runs[0].metrics.items()
+                if isinstance(value, (int, float, dict))
+            }
+    return results
+
+
+def _mean(values: Sequence[Any]) -> Any:
+    """Mean of scalar metrics, or per key of per-service metrics (missing keys count as 0)."""
+    if isinstance(values[0], dict):
+        keys = sorted({key for value in values for key in value})
+        return {key: fmean(value.get(key, 0) for value in values) for key in keys}
+    return fmean(values)
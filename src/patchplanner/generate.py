@@ -0,0 +1,324 @@
+"""Synthetic scenario generator for scale testing.
+
+Scenarios are described by a :class:`GeneratorConfig` and written straight to
+a format read by ``infra_loader.load_scenario``: one YAML file or a JSONL/CSV
+inventory directory. Only per-service parameters are held in memory; node and
+edge records are streamed to the output one line at a time, so million-node
+scenarios can be produced with a small footprint. The same config and seed
+always produce the same output.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+TOPOLOGIES = ("layered", "star", "random_dag", "incompatible_clusters")
+
+# Patch templates that generated services draw from, written to the scenario's
+# ``patch_profiles`` section and referenced by name from each node.
+PATCH_PROFILES: Dict[str, Dict[str, Any]] = {
+    "config": {
+        "patch_duration_seconds": 30,
+        "failure_probability": 0.01,
+        "rollback_supported": True,
+        "severity": 4.0,
+    },
+    "restart": {
+        "patch_duration_seconds": 60,
+        "requires_restart": True,
+        "failure_probability": 0.02,
+        "rollback_supported": True,
+        "severity": 6.5,
+    },
+    "reboot": {
+        "patch_duration_seconds": 180,
+        "requires_reboot": True,
+        "failure_probability": 0.05,
+        "rollback_supported": True,
+        "severity": 8.0,
+    },
+    "risky": {
+        "patch_duration_seconds": 120,
+        "requires_restart": True,
+        "failure_probability": 0.15,
+        "rollback_supported": False,
+        "severity": 9.5,
+    },
+}
+
+
+@dataclass(frozen=True)
+class GeneratorConfig:
+    """Parameters of a synthetic scenario.
+
+    ``service_size`` bounds the number of instances per service; each service
+    keeps ``min_up_ratio`` of its instances up (at least one when it has more
+    than one instance). Every service draws its patch from ``patch_profiles``.
+    ``fan_out`` is the number of services a service depends on, and each
+    dependency edge is DEGRADED with probability ``degraded_ratio``.
+    ``layers`` applies to the layered families and ``cluster_size`` to
+    ``incompatible_clusters``, which links same-index instances of
+    ``cluster_size`` neighbouring services with INCOMPATIBLE edges.
+    """
+    topology: str = "layered"
+    nodes: int = 1000
+    seed: int = 0
+    service_size: Tuple[int, int] = (2, 6)
+    min_up_ratio: float = 0.5
+    patch_profiles: Tuple[str, ...] = ("restart",)
+    fan_out: int = 2
+    degraded_ratio: float = 0.0
+    layers: int = 4
+    cluster_size: int = 2
+    name: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if self.topology not in TOPOLOGIES:
+            raise ValueError(f"Unknown topology: {self.topology}")
+        if self.nodes < 1:
+            raise ValueError("nodes must be >= 1")
+        low, high = self.service_size
+        if not 1 <= low <= high:
+            raise ValueError("service_size must satisfy 1 <= min <= max")
+        if not 0.0 <= self.min_up_ratio <= 1.0:
+            raise ValueError("min_up_ratio must be in [0, 1]")
+        if not 0.0 <= self.degraded_ratio <= 1.0:
+            raise ValueError("degraded_ratio must be in [0, 1]")
+        unknown = [p for p in self.patch_profiles if p not in PATCH_PROFILES]
+        if unknown or not self.patch_profiles:
+            raise ValueError(f"Unknown patch profiles: {unknown or 'none given'}")
+        if self.layers < 1 or self.fan_out < 0 or self.cluster_size < 2:
+            raise ValueError("layers >= 1, fan_out >= 0 and cluster_size >= 2 required")
+
+
+@dataclass
+class _Service:
+    name: str
+    size: int
+    node_type: str
+    criticality: int
+    min_up: int
+    profile: str
+    layer: int = 0
+    depends_on: List[int] = field(default_factory=list)
+    # Following service in the same INCOMPATIBLE cluster, if any
+    incompatible_with: Optional[int] = None
+
+
+def _plan_services(config: GeneratorConfig) -> List[_Service]:
+    """Draw every service-level parameter; node and edge records derive from these."""
+    rng = random.Random(config.seed)
+    low, high = config.service_size
+    services: List[_Service] = []
+    remaining = config.nodes
+    while remaining:
+        size = min(rng.randint(low, high), remaining)
+        remaining -= size
+        min_up = min(size - 1, max(1, int(size * config.min_up_ratio))) if size > 1 else 0
+        services.append(
+            _Service(
+                name=f"s{len(services)}",
+                size=size,
+                node_type="SERVICE_INSTANCE",
+                criticality=rng.randint(1, 5),
+                min_up=min_up,
+                profile=rng.choice(config.patch_profiles),
+            )
+        )
+
+    count = len(services)
+    if config.topology in ("layered", "incompatible_clusters"):
+        layers = min(config.layers, count)
+        by_layer: List[List[int]] = [[] for _ in range(layers)]
+        for idx, service in enumerate(services):
+            service.layer = idx * layers // count
+            by_layer[service.layer].append(idx)
+        for idx, service in enumerate(services):
+            if service.layer == layers - 1:
+                service.node_type = "DATABASE"
+                continue
+            below = by_layer[service.layer + 1]
+            service.depends_on = rng.sample(below, min(config.fan_out, len(below)))
+        if config.topology == "incompatible_clusters":
+            for members in by_layer:
+                for start in range(0, len(members), config.cluster_size):
+                    cluster = members[start : start + config.cluster_size]
+                    for left, right in zip(cluster, cluster[1:]):
+                        services[left].incompatible_with = right
+    elif config.topology == "star":
+        hubs = max(1, count // 50)
+        for idx, service in enumerate(services):
+            if idx < hubs:
+                service.node_type = "DATABASE"
+            else:
+                service.depends_on = [rng.randrange(hubs)]
+    else:  # random_dag: depend only on earlier services, so the graph stays acyclic
+        services[0].node_type = "DATABASE"
+        for idx in range(1, count):
+            services[idx].depends_on = rng.sample(range(idx), min(config.fan_out, idx))
+    return services
+
+
+def _iter_nodes(services: List[_Service]) -> Iterator[Dict[str, Any]]:
+    for service in services:
+        for instance in range(service.size):
+            yield {
+                "id": f"{service.name}-{instance}",
+                "type": service.node_type,
+                "service": service.name,
+                "criticality": service.criticality,
+                "redundancy": service.size,
+                "min_up": service.min_up,
+                "patch_profile": service.profile,
+            }
+
+
+def _iter_edges(
+    services: List[_Service], config: GeneratorConfig
+) -> Iterator[Dict[str, Any]]:
+    # Edge compatibilities use their own stream so they do not shift the service plan.
+    rng = random.Random(f"{config.seed}:edges")
+    for service in services:
+        for dependency_idx in service.depends_on:
+            dependency = services[dependency_idx]
+            for instance in range(service.size):
+                edge = {
+                    "source": f"{service.name}-{instance}",
+                    "target": f"{dependency.name}-{instance % dependency.size}",
+                }
+                if config.degraded_ratio and rng.random() < config.degraded_ratio:
+                    edge["compatibility"] = "DEGRADED"
+                yield edge
+        if service.incompatible_with is not None:
+            partner = services[service.incompatible_with]
+            for instance in range(min(service.size, partner.size)):
+                yield {
+                    "source": f"{service.name}-{instance}",
+                    "target": f"{partner.name}-{instance}",
+                    "compatibility": "INCOMPATIBLE",
+                }
+
+
+def _flow(record: Dict[str, Any]) -> str:
+    # JSON objects are valid YAML flow mappings and much faster to emit.
+    return json.dumps(record, separators=(", ", ": "))
+
+
+def write_scenario(config: GeneratorConfig, out: str | Path | TextIO) -> Tuple[int, int]:
+    """Write the scenario for ``config`` to a path or text stream.
+
+    Returns the number of nodes and edges written.
+    """
+    if not isinstance(out, (str, Path)):
+        return _write(config, out)
+    path = Path(out)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as handle:
+        return _write(config, handle)
+
+
+def _settings(config: GeneratorConfig, services: List[_Service]) -> Dict[str, Any]:
+    return {
+        "name": config.name or f"{config.topology}-{config.nodes}",
+        "seed": config.seed,
+        "min_up_default": 1,
+        "incompatible_max_duration_seconds": 0,
+        "patch_profiles": {name: PATCH_PROFILES[name] for name in config.patch_profiles},
+        "metadata": {
+            "generator": {
+                "topology": config.topology,
+                "nodes": config.nodes,
+                "services": len(services),
+                "patch_profiles": list(config.patch_profiles),
+            }
+        },
+    }
+
+
+def _write(config: GeneratorConfig, handle: TextIO) -> Tuple[int, int]:
+    services = _plan_services(config)
+    for key, value in _settings(config, services).items():
+        handle.write(f"{key}: {_flow(value)}\n")
+
+    node_count = edge_count = 0
+    handle.write("nodes:\n")
+    for node in _iter_nodes(services):
+        handle.write(f"  - {_flow(node)}\n")
+        node_count += 1
+    handle.write("edges:\n")
+    for edge in _iter_edges(services, config):
+        handle.write(f"  - {_flow(edge)}\n")
+        edge_count += 1
+    if not edge_count:
+        # An empty block sequence would parse as null rather than a list
+        handle.write("  []\n")
+    return node_count, edge_count
+
+
+# Column order of CSV inventories
+NODE_COLUMNS = (
+    "id",
+    "type",
+    "service",
+    "criticality",
+    "redundancy",
+    "min_up",
+    "patch_profile",
+)
+EDGE_COLUMNS = ("source", "target", "compatibility")
+
+
+def write_inventory(
+    config: GeneratorConfig, directory: str | Path, fmt: str = "jsonl"
+) -> Tuple[int, int]:
+    """Write the scenario for ``config`` as an inventory directory.
+
+    The directory gets ``scenario.yaml`` with the scenario-level settings and
+    ``nodes`` and ``edges`` files in ``fmt`` (``"jsonl"`` or ``"csv"``), the
+    layout ``load_scenario`` streams row by row. Returns the number of nodes
+    and edges written.
+    """
+    if fmt not in ("jsonl", "csv"):
+        raise ValueError(f"Unknown inventory format: {fmt}")
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    services = _plan_services(config)
+    with (directory / "scenario.yaml").open("w", encoding="utf-8") as handle:
+        for key, value in _settings(config, services).items():
+            handle.write(f"{key}: {_flow(value)}\n")
+    node_count = _write_records(
+        directory / f"nodes.{fmt}", _iter_nodes(services), NODE_COLUMNS
+    )
+    edge_count = _write_records(
+        directory / f"edges.{fmt}", _iter_edges(services, config), EDGE_COLUMNS
+    )
+    return node_count, edge_count
+
+
+def _write_records(
+    path: Path, records: Iterator[Dict[str, Any]], columns: Tuple[str, ...]
+) -> int:
+    count = 0
+    with path.open("w", encoding="utf-8", newline="") as handle:
+        if path.suffix == ".jsonl":
+            for record in records:
+                handle.write(json.dumps(record))
+                handle.write("\n")
+                count += 1
+            return count
+        writer = csv.writer(handle)
+        writer.writerow(columns)
+        for record in records:
+            writer.writerow([record.get(column, "") for column in columns])
+            count += 1
+    return count
+
+
+if __name__ == "__main__":
+    from .cli import generate_main
+
+    generate_main()
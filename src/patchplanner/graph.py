@@ -0,0 +1,300 @@
+"""Array-backed dependency graph, an alternative to ``networkx.DiGraph``.
+
+``build_graph(scenario, backend="csr")`` returns a :class:`CSRGraph`. Nodes are
+numbered by their position in ``scenario.nodes`` and adjacency is stored as CSR
+offset and index arrays in both directions, so a graph costs a handful of
+arrays instead of a dict per node and per edge. Node attributes are read from
+each node's :class:`NodeSpec` on access rather than copied.
+
+The class implements the subset of the ``DiGraph`` interface used by the
+planners, the engine and the constraint checks (``nodes``, ``edges``,
+``in_degree``, ``out_degree``, ``successors``, ...), plus array-level
+connected components and topological ordering.
+"""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .models import CompatibilityLevel, EdgeSpec, NodeSpec
+
+# Node attributes exposed through ``graph.nodes[node_id]``, as set by the
+# networkx backend of ``build_graph``; "spec" is the NodeSpec itself.
+NODE_ATTRIBUTES = (
+    "spec",
+    "type",
+    "service",
+    "criticality",
+    "redundancy",
+    "min_up",
+    "patchable",
+    "group",
+    "version",
+    "health",
+)
+
+_COMPATIBILITY_LEVELS = tuple(CompatibilityLevel)
+_COMPATIBILITY_CODES = {level: code for code, level in enumerate(_COMPATIBILITY_LEVELS)}
+
+
+class NodeAttributes(Mapping):
+    """Read-only attribute mapping of one node, backed by its NodeSpec."""
+
+    __slots__ = ("spec",)
+
+    def __init__(self, spec: NodeSpec):
+        self.spec = spec
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "spec":
+            return self.spec
+        if key not in NODE_ATTRIBUTES:
+            raise KeyError(key)
+        return getattr(self.spec, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(NODE_ATTRIBUTES)
+
+    def __len__(self) -> int:
+        return len(NODE_ATTRIBUTES)
+
+
+class _NodeView:
+    """``graph.nodes``: iterate node IDs, index attributes, or call with ``data=True``."""
+
+    __slots__ = ("_graph",)
+
+    def __init__(self, graph: "CSRGraph"):
+        self._graph = graph
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._graph.node_ids)
+
+    def __len__(self) -> int:
+        return len(self._graph.node_ids)
+
+    def __contains__(self, node_id: object) -> bool:
+        return node_id in self._graph.index
+
+    def __getitem__(self, node_id: str) -> NodeAttributes:
+        return NodeAttributes(self._graph.specs[self._graph.index[node_id]])
+
+    def __call__(self, data: bool = False):
+        if not data:
+            return iter(self._graph.node_ids)
+        return ((spec.id, NodeAttributes(spec)) for spec in self._graph.specs)
+
+
+class _EdgeView:
+    """``graph.edges``: iterate (source, target) pairs or index ``edges[source, target]``."""
+
+    __slots__ = ("_graph",)
+
+    def __init__(self, graph: "CSRGraph"):
+        self._graph = graph
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        graph = self._graph
+        ids = graph.node_ids
+        sources = graph.edge_sources().tolist()
+        return ((ids[s], ids[t]) for s, t in zip(sources, graph.out_indices.tolist()))
+
+    def __len__(self) -> int:
+        return len(self._graph.out_indices)
+
+    def __contains__(self, pair: object) -> bool:
+        try:
+            return self._graph._edge_position(*pair) is not None
+        except (KeyError, TypeError, ValueError):
+            return False
+
+    def __getitem__(self, pair: Tuple[str, str]) -> Dict[str, Any]:
+        position = self._graph._edge_position(*pair)
+        if position is None:
+            raise KeyError(pair)
+        code = self._graph.edge_compatibility[position]
+        return {"compatibility": _COMPATIBILITY_LEVELS[code]}
+
+
+class CSRGraph:
+    """Directed graph over integer node IDs with CSR in/out adjacency.
+
+    ``node_ids[i]`` and ``specs[i]`` describe node ``i`` and ``index`` maps an
+    ID back to ``i``. The out-neighbours of ``i`` are
+    ``out_indices[out_offsets[i]:out_offsets[i + 1]]`` in ascending order, with
+    ``edge_compatibility`` holding each of those edges' compatibility code;
+    ``in_offsets`` and ``in_indices`` hold the in-neighbours the same way.
+    Repeated edges collapse into one and the last compatibility wins, as they
+    do in a ``DiGraph``.
+    """
+
+    def __init__(
+        self,
+        specs: Sequence[NodeSpec],
+        sources: np.ndarray,
+        targets: np.ndarray,
+        compatibility: np.ndarray,
+    ):
+        self.specs: List[NodeSpec] = list(specs)
+        self.node_ids: List[str] = [spec.id for spec in self.specs]
+        self.index: Dict[str, int] = {
+            node_id: idx for idx, node_id in enumerate(self.node_ids)
+        }
+        count = len(self.node_ids)
+
+        # Keep the last of any repeated (source, target) pair; np.unique also
+        # sorts the keys, which orders edges by source, then target.
+        keys = sources.astype(np.int64) * count + targets
+        unique_keys, last = np.unique(keys[::-1], return_index=True)
+        self.out_indices = (unique_keys % max(count, 1)).astype(np.intp)
+        self.edge_compatibility = compatibility[::-1][last].astype(np.int8)
+        edge_sources = (unique_keys // max(count, 1)).astype(np.intp)
+        self.out_offsets = _offsets(edge_sources, count)
+
+        # Stable sort by target keeps each node's in-neighbours ascending
+        order = np.argsort(self.out_indices, kind="stable")
+        self.in_indices = edge_sources[order]
+        self.in_offsets = _offsets(self.out_indices, count)
+
+        self.nodes = _NodeView(self)
+        self.edges = _EdgeView(self)
+
+    @classmethod
+    def from_specs(
+        cls, nodes: Sequence[NodeSpec], edges: Sequence[EdgeSpec]
+    ) -> "CSRGraph":
+        """Build the graph of ``nodes``; every edge endpoint must be one of them."""
+        index = {node.id: idx for idx, node in enumerate(nodes)}
+        try:
+            sources = np.fromiter((index[e.source] for e in edges), np.intp, len(edges))
+            targets = np.fromiter((index[e.target] for e in edges), np.intp, len(edges))
+        except KeyError as exc:
+            raise ValueError(f"Edge references unknown node {exc}") from None
+        compatibility = np.fromiter(
+            (_COMPATIBILITY_CODES[e.compatibility] for e in edges), np.int8, len(edges)
+        )
+        return cls(nodes, sources, targets, compatibility)
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.node_ids)
+
+    def __contains__(self, node_id: object) -> bool:
+        return node_id in self.index
+
+    def number_of_nodes(self) -> int:
+        return len(self.node_ids)
+
+    def number_of_edges(self) -> int:
+        return len(self.out_indices)
+
+    def in_degree(self, node_id: str) -> int:
+        idx = self.index[node_id]
+        return int(self.in_offsets[idx + 1] - self.in_offsets[idx])
+
+    def out_degree(self, node_id: str) -> int:
+        idx = self.index[node_id]
+        return int(self.out_offsets[idx + 1] - self.out_offsets[idx])
+
+    def in_degrees(self) -> np.ndarray:
+        """In-degree of every node, by node index."""
+        return np.diff(self.in_offsets)
+
+    def out_degrees(self) -> np.ndarray:
+        """Out-degree of every node, by node index."""
+        return np.diff(self.out_offsets)
+
+    def successors(self, node_id: str) -> List[str]:
+        idx = self.index[node_id]
+        row = self.out_indices[self.out_offsets[idx] : self.out_offsets[idx + 1]]
+        return [self.node_ids[i] for i in row.tolist()]
+
+    def predecessors(self, node_id: str) -> List[str]:
+        idx = self.index[node_id]
+        row = self.in_indices[self.in_offsets[idx] : self.in_offsets[idx + 1]]
+        return [self.node_ids[i] for i in row.tolist()]
+
+    # Like DiGraph.neighbors, which yields successors
+    neighbors = successors
+
+    def edge_sources(self) -> np.ndarray:
+        """Source index of every edge, aligned with ``out_indices``."""
+        return np.repeat(np.arange(len(self.node_ids), dtype=np.intp), self.out_degrees())
+
+    def _edge_position(self, source: str, target: str) -> Optional[int]:
+        src, tgt = self.index[source], self.index[target]
+        start, end = int(self.out_offsets[src]), int(self.out_offsets[src + 1])
+        position = start + int(np.searchsorted(self.out_indices[start:end], tgt))
+        if position < end and self.out_indices[position] == tgt:
+            return position
+        return None
+
+    def connected_components(
+        self,
+        sources: Optional[np.ndarray] = None,
+        targets: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Weakly connected component label of every node, by node index.
+
+        Components are numbered in order of their lowest node index, which is
+        the order ``networkx.connected_components`` yields them in. Edge
+        directions are ignored; ``sources`` and ``targets`` restrict the
+        edges considered to the given index pairs.
+        """
+        if sources is None or targets is None:
+            sources, targets = self.edge_sources(), self.out_indices
+        count = len(self.node_ids)
+        labels = np.arange(count, dtype=np.intp)
+        if not len(sources):
+            return labels
+        # Min-label propagation with pointer jumping: each node converges on
+        # the lowest index in its component in O(log n) rounds on typical graphs.
+        while True:
+            lowest = np.minimum(labels[sources], labels[targets])
+            updated = labels.copy()
+            np.minimum.at(updated, sources, lowest)
+            np.minimum.at(updated, targets, lowest)
+            while True:
+                jumped = updated[updated]
+                if np.array_equal(jumped, updated):
+                    break
+                updated = jumped
+            if np.array_equal(updated, labels):
+                break
+            labels = updated
+        roots = np.flatnonzero(labels == np.arange(count))
+        return np.searchsorted(roots, labels)
+
+    def topological_order(self) -> List[str]:
+        """Node IDs with every edge's source before its target.
+
+        Nodes are released first-in first-out, starting from the sources in
+        index order, so the result is deterministic. Raises ``ValueError`` if the graph has a cycle.
+        """
+        remaining = self.in_degrees().tolist()
+        offsets = self.out_offsets.tolist()
+        out_indices = self.out_indices.tolist()
+        ready = deque(idx for idx, degree in enumerate(remaining) if degree == 0)
+        order: List[int] = []
+        while ready:
+            idx = ready.popleft()
+            order.append(idx)
+            for succ in out_indices[offsets[idx] : offsets[idx + 1]]:
+                remaining[succ] -= 1
+                if remaining[succ] == 0:
+                    ready.append(succ)
+        if len(order) != len(self.node_ids):
+            raise ValueError("Graph contains a cycle; no topological order exists")
+        return [self.node_ids[idx] for idx in order]
+
+
+def _offsets(rows: np.ndarray, count: int) -> np.ndarray:
+    """CSR offsets for entries already sorted by ``rows``."""
+    offsets = np.zeros(count + 1, dtype=np.intp)
+    np.cumsum(np.bincount(rows, minlength=count), out=offsets[1:])
+    return offsets
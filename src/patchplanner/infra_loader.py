@@ -1,40 +1,178 @@
 """Infrastructure loading utilities: YAML parsing and graph construction."""
 from __future__ import annotations
 
+import csv
+import gc
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
-import networkx as nx
-import yaml
+import numpy as np
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
+from . import __version__
+from .graph import CSRGraph
 from .models import (
     CompatibilityLevel,
     EdgeSpec,
     NodeSpec,
+    PatchSpec,
     ScenarioSpec,
 )
+from .options import GRAPH_BACKENDS
+
+# PyYAML and networkx are imported on first use: a cache hit needs neither,
+# and neither does the CSR graph backend.
+if TYPE_CHECKING:
+    import networkx as nx
+
+# Bump when the pickled cache entry layout changes incompatibly.
+_CACHE_FORMAT = 3
+
+# Inventory directories: optional settings file and the record file suffixes
+INVENTORY_MANIFEST = "scenario.yaml"
+RECORD_FORMATS = (".jsonl", ".csv")
+
+# Node and edge records are validated in bulk, this many per TypeAdapter call
+VALIDATION_CHUNK_SIZE = 10_000
+_NODE_LIST = TypeAdapter(List[NodeSpec])
+_EDGE_LIST = TypeAdapter(List[EdgeSpec])
+M = TypeVar("M", bound=BaseModel)
+
+
+def default_cache_dir() -> Path:
+    """Directory for compiled scenarios: ``$PATCHPLANNER_CACHE_DIR`` or the user cache."""
+    configured = os.environ.get("PATCHPLANNER_CACHE_DIR")
+    if configured:
+        return Path(configured)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "patchplanner"
+
+
+def load_scenario(
+    path: str | Path, cache_dir: Optional[str | Path] = None
+) -> ScenarioSpec:
+    """Load scenario from YAML file and parse into structured objects.
+
+    ``path`` may also be an inventory directory, or a YAML manifest whose
+    ``nodes``, ``edges`` or ``patches`` entries name JSONL/CSV files (see
+    :func:`_read_inventory`); those files are read one row at a time.
+
+    With ``cache_dir``, the validated scenario is stored there under a hash of
+    its input files and reused while they are unchanged, skipping parsing and
+    validation. Unreadable cache entries are rebuilt.
+    """
+    path = Path(path)
+    if cache_dir is None:
+        with _gc_paused():
+            return _parse_scenario(path)[0]
+
+    # The name defaults to the file stem, so it is part of the key too. A
+    # directory has no content of its own: the record files present decide
+    # which are read, so their names are part of the key, and the content of
+    # those read is checked on every hit.
+    if path.is_dir():
+        digest = hashlib.sha256(str(path.resolve()).encode())
+        for name in _inventory_files(path):
+            digest.update(f"\0{name}".encode())
+    else:
+        with path.open("rb") as handle:
+            digest = hashlib.file_digest(handle, "sha256")
+    digest.update(f"\0{path.stem}\0{__version__}\0{_CACHE_FORMAT}".encode())
+    cache_path = Path(cache_dir) / "scenarios" / f"{digest.hexdigest()}.pickle"
+    try:
+        with cache_path.open("rb") as handle, _gc_paused():
+            scenario, inputs = pickle.load(handle)
+        if isinstance(scenario, ScenarioSpec) and all(
+            _file_digest(Path(name)) == expected for name, expected in inputs.items()
+        ):
+            return scenario
+    except Exception:  # missing, stale or corrupt entry; rebuilt below
+        pass
+
+    with _gc_paused():
+        scenario, inputs = _parse_scenario(path)
+    _write_cache(
+        cache_path, scenario, {str(name.resolve()): _file_digest(name) for name in inputs}
+    )
+    return scenario
+
+
+def _file_digest(path: Path) -> str:
+    with path.open("rb") as handle:
+        return hashlib.file_digest(handle, "sha256").hexdigest()
 
 
-def load_scenario(path: str | Path) -> ScenarioSpec:
-    """Load scenario from YAML file and parse into structured objects."""
-    raw = yaml.safe_load(Path(path).read_text(encoding="utf-8"))
+def _write_cache(cache_path: Path, scenario: ScenarioSpec, inputs: Dict[str, str]) -> None:
+    # Write then rename so concurrent loaders never read a partial entry.
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            pickle.dump((scenario, inputs), handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_name, cache_path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def _read_yaml(path: Path) -> Dict[str, Any]:
+    import yaml
+
+    # libyaml-backed loader when PyYAML was built with it
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with path.open("r", encoding="utf-8") as handle:
+        raw = yaml.load(handle, Loader=loader)
     if raw is None:
         raise ValueError(f"Empty scenario file: {path}")
+    return raw
+
 
-    # Support optional global patches section
+def _parse_scenario(path: Path) -> Tuple[ScenarioSpec, List[Path]]:
+    """Build the scenario at ``path`` and list the inventory files it read."""
+    if path.is_dir():
+        raw, base, inputs = _read_inventory(path)
+    else:
+        raw, base, inputs = _read_yaml(path), path.parent, []
+
+    # Support optional global patches section, inline or as a records file
     patches = raw.get("patches", {})
-    nodes = []
-    for node_data in raw.get("nodes", []):
-        node_id = node_data.get("id")
-        patch_data = patches.get(node_id)
-        if patch_data and "patch" not in node_data:
-            node_data = dict(node_data)
-            node_data["patch"] = patch_data
-        nodes.append(NodeSpec(**node_data))
+    if isinstance(patches, str):
+        inputs.append(base / patches)
+        patches = {
+            record.pop("id"): record for record in iter_records(base / patches)
+        }
+    # Named patch profiles, inline or as a records file keyed by ``name``
+    profiles = raw.get("patch_profiles", {})
+    if isinstance(profiles, str):
+        inputs.append(base / profiles)
+        profiles = {
+            record.pop("name"): record for record in iter_records(base / profiles)
+        }
+    patch_profiles = {name: PatchSpec(**fields) for name, fields in profiles.items()}
 
-    edges = [EdgeSpec(**edge) for edge in raw.get("edges", [])]
+    nodes = _load_models(raw, "nodes", base, inputs, NodeSpec, _NODE_LIST, patches)
+    _resolve_patches(nodes, patch_profiles)
+    edges = _load_models(raw, "edges", base, inputs, EdgeSpec, _EDGE_LIST)
 
-    return ScenarioSpec(
+    scenario = ScenarioSpec(
         name=raw.get("name", Path(path).stem),
         seed=raw.get("seed", 0),
         incompatible_max_duration_seconds=raw.get(
@@ -43,13 +181,220 @@ def load_scenario(path: str | Path) -> ScenarioSpec:
         min_up_default=raw.get("min_up_default", 1),
         nodes=nodes,
         edges=edges,
+        patch_profiles=patch_profiles,
         metadata=raw.get("metadata", {}),
     )
+    return scenario, inputs
+
+
+def _resolve_patches(nodes: List[NodeSpec], profiles: Dict[str, PatchSpec]) -> None:
+    """Point nodes at their named profile and share identical patch specs.
+
+    A node's own ``patch`` (inline or from the ``patches`` section) wins over
+    its ``patch_profile``. Afterwards every distinct patch is a single
+    :class:`PatchSpec` instance, so node memory grows with the number of
+    distinct patches and consumers can key per-patch work on identity.
+    """
+    interned: Dict[PatchSpec, PatchSpec] = {}
+    for profile in profiles.values():
+        interned.setdefault(profile, profile)
+    for node in nodes:
+        if node.patch_profile is not None and "patch" not in node.model_fields_set:
+            try:
+                node.patch = interned[profiles[node.patch_profile]]
+            except KeyError:
+                raise ValueError(
+                    f"Unknown patch profile {node.patch_profile!r} for node {node.id!r}"
+                ) from None
+        else:
+            node.patch = interned.setdefault(node.patch, node.patch)
+
+
+def _validate_bulk(
+    records: Iterable[Dict[str, Any]], model: Type[M], adapter: TypeAdapter
+) -> List[M]:
+    """Validate ``records`` as ``model`` instances a chunk at a time.
+
+    A whole chunk goes through one ``TypeAdapter`` call, avoiding per-object
+    call overhead; a chunk that fails is redone record by record, so the
+    error raised is the one ``model(**record)`` gives for the first bad record.
+    """
+    validated: List[M] = []
+    chunk: List[Dict[str, Any]] = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == VALIDATION_CHUNK_SIZE:
+            validated.extend(_validate_chunk(chunk, model, adapter))
+            chunk = []
+    validated.extend(_validate_chunk(chunk, model, adapter))
+    return validated
+
+
+def _validate_chunk(
+    chunk: List[Dict[str, Any]], model: Type[M], adapter: TypeAdapter
+) -> List[M]:
+    try:
+        return adapter.validate_python(chunk)
+    except ValidationError:
+        return [model(**record) for record in chunk]
+
+
+def _validate_jsonl(path: Path, model: Type[M], adapter: TypeAdapter) -> List[M]:
+    """Parse and validate a JSONL file in chunks of raw lines.
+
+    Each chunk is handed to pydantic as one JSON array, so parsing and
+    validation both happen in pydantic-core. A chunk that fails is redone
+    through ``json.loads`` and :func:`_validate_chunk` to raise the same
+    error as the record-by-record path.
+    """
+    validated: List[M] = []
+    with path.open("r", encoding="utf-8") as handle:
+        while True:
+            chunk = list(islice(handle, VALIDATION_CHUNK_SIZE))
+            lines = [line for line in chunk if line.strip()]
+            if lines:
+                try:
+                    validated.extend(adapter.validate_json("[" + ",".join(lines) + "]"))
+                except ValueError:
+                    records = [json.loads(line) for line in lines]
+                    validated.extend(_validate_chunk(records, model, adapter))
+            if len(chunk) < VALIDATION_CHUNK_SIZE:
+                return validated
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """Suspend cyclic GC while building many small objects.
+
+    The models form no reference cycles, but every allocation threshold
+    crossing would otherwise rescan the growing object graph.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _inventory_files(directory: Path) -> List[str]:
+    """Names of the manifest and conventionally named record files in ``directory``."""
+    candidates = [INVENTORY_MANIFEST] + [
+        f"{section}{suffix}"
+        for section in ("nodes", "edges", "patches")
+        for suffix in RECORD_FORMATS
+    ]
+    return sorted(name for name in candidates if (directory / name).exists())
+
+
+def _read_inventory(directory: Path) -> Tuple[Dict[str, Any], Path, List[Path]]:
+    """Read an inventory directory.
+
+    The directory holds an optional ``scenario.yaml`` with the scenario-level
+    settings, a ``nodes.jsonl`` or ``nodes.csv`` file and optionally
+    ``edges`` and ``patches`` files in either format. Entries in
+    ``scenario.yaml`` take precedence over the conventional file names.
+    """
+    manifest = directory / INVENTORY_MANIFEST
+    inputs = []
+    raw: Dict[str, Any] = {}
+    if manifest.exists():
+        raw = dict(_read_yaml(manifest))
+        inputs.append(manifest)
+    for section in ("nodes", "edges", "patches"):
+        if section in raw:
+            continue
+        for suffix in RECORD_FORMATS:
+            if (directory / f"{section}{suffix}").exists():
+                raw[section] = f"{section}{suffix}"
+                break
+    if "nodes" not in raw:
+        raise ValueError(f"No nodes.jsonl or nodes.csv in inventory directory: {directory}")
+    return raw, directory, inputs
+
+
+def _load_models(
+    raw: Dict[str, Any],
+    key: str,
+    base: Path,
+    inputs: List[Path],
+    model: Type[M],
+    adapter: TypeAdapter,
+    patches: Optional[Dict[str, Any]] = None,
+) -> List[M]:
+    """Validate the ``key`` section, inline or from a records file."""
+    value = raw.get(key, [])
+    if isinstance(value, str):
+        source = base / value
+        inputs.append(source)
+        if source.suffix == ".jsonl" and not patches:
+            return _validate_jsonl(source, model, adapter)
+        records: Iterable[Dict[str, Any]] = iter_records(source)
+    else:
+        records = value
+    if patches:
+        records = _with_patches(records, patches)
+    return _validate_bulk(records, model, adapter)
+
+
+def _with_patches(
+    records: Iterable[Dict[str, Any]], patches: Dict[str, Any]
+) -> Iterator[Dict[str, Any]]:
+    for node_data in records:
+        node_id = node_data.get("id")
+        patch_data = patches.get(node_id)
+        if patch_data and "patch" not in node_data:
+            node_data = dict(node_data)
+            node_data["patch"] = patch_data
+        yield node_data
+
+
+def iter_records(path: str | Path) -> Iterator[Dict[str, Any]]:
+    """Stream records from a ``.jsonl`` or ``.csv`` file, one row at a time.
+
+    CSV cells that are empty are left out so model defaults apply, and dotted
+    headers nest, e.g. ``patch.severity`` becomes ``{"patch": {"severity": ...}}``.
+    """
+    path = Path(path)
+    if path.suffix not in RECORD_FORMATS:
+        raise ValueError(f"Unsupported inventory file (expected .jsonl or .csv): {path}")
+    with path.open("r", encoding="utf-8", newline="") as handle:
+        if path.suffix == ".jsonl":
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        for row in csv.DictReader(handle):
+            record: Dict[str, Any] = {}
+            for column, value in row.items():
+                if value is None or value == "":
+                    continue
+                target = record
+                *parents, field = column.split(".")
+                for parent in parents:
+                    target = target.setdefault(parent, {})
+                target[field] = value
+            yield record
 
 
 def build_graph(
-    scenario: ScenarioSpec,
-) -> tuple[nx.DiGraph, List[EdgeSpec]]:
+    scenario: ScenarioSpec, backend: str = "networkx"
+) -> tuple[nx.DiGraph | CSRGraph, List[EdgeSpec]]:
+    """Build the dependency graph of ``scenario`` and return it with its edges.
+
+    ``backend`` is one of ``GRAPH_BACKENDS``: ``"networkx"`` builds a
+    ``DiGraph`` with every node field copied into its attribute dict, while
+    ``"csr"`` builds a :class:`CSRGraph` over arrays that reads attributes from
+    the node specs. Strategies and the engine accept either.
+    """
+    if backend not in GRAPH_BACKENDS:
+        raise ValueError(f"Unknown graph backend: {backend}")
+    if backend == "csr":
+        return CSRGraph.from_specs(scenario.nodes, scenario.edges), list(scenario.edges)
+
+    import networkx as nx
+
     graph = nx.DiGraph()
     for node in scenario.nodes:
         graph.add_node(
@@ -73,13 +418,25 @@ def build_graph(
 
 
 def incompatible_components(
-    graph: nx.DiGraph, edges: Iterable[EdgeSpec]
+    graph: nx.DiGraph | CSRGraph, edges: Iterable[EdgeSpec]
 ) -> Dict[str, int]:
+    incompatible = [
+        edge for edge in edges if edge.compatibility == CompatibilityLevel.INCOMPATIBLE
+    ]
+    if isinstance(graph, CSRGraph):
+        index = graph.index
+        labels = graph.connected_components(
+            np.array([index[edge.source] for edge in incompatible], dtype=np.intp),
+            np.array([index[edge.target] for edge in incompatible], dtype=np.intp),
+        )
+        return dict(zip(graph.node_ids, labels.tolist()))
+
+    import networkx as nx
+
     undirected = nx.Graph()
     undirected.add_nodes_from(graph.nodes)
-    for edge in edges:
-        if edge.compatibility == CompatibilityLevel.INCOMPATIBLE:
-            undirected.add_edge(edge.source, edge.target)
+    for edge in incompatible:
+        undirected.add_edge(edge.source, edge.target)
     components = {}
     for idx, comp in enumerate(nx.connected_components(undirected)):
         for node_id in comp:
@@ -3,7 +3,7 @@ from __future__ import annotations
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 class NodeType(str, Enum):
@@ -25,6 +25,9 @@ class CompatibilityLevel(str, Enum):
 
 
 class PatchSpec(BaseModel):
+    # Frozen so identical specs can be shared between nodes and used as dict keys
+    model_config = ConfigDict(frozen=True)
+
     patch_duration_seconds: int = 0
     requires_restart: bool = False
     requires_reboot: bool = False
@@ -66,6 +69,8 @@ class NodeSpec(BaseModel):
     version: str = "v_old"
     health: HealthState = HealthState.HEALTHY
     patch: PatchSpec = Field(default_factory=PatchSpec)
+    # Name of a scenario-level patch profile; an explicit ``patch`` takes precedence
+    patch_profile: Optional[str] = None
 
     @field_validator("criticality")
     @classmethod
@@ -103,6 +108,7 @@ class ScenarioSpec(BaseModel):
     min_up_default: int = 1
     nodes: List[NodeSpec]
     edges: List[EdgeSpec] = Field(default_factory=list)
+    patch_profiles: Dict[str, PatchSpec] = Field(default_factory=dict)
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
 
@@ -0,0 +1,22 @@
+"""Names accepted for the engine mode, graph backend and tuning search.
+
+This module has no third-party imports, so the CLI can build its argument
+parsers without loading the simulator.
+"""
+
+# "step": every PlanStep is a barrier lasting its slowest node.
+# "event": nodes complete at their own times off an event heap.
+ENGINE_MODES = ("step", "event")
+
+# Graph types build_graph can produce
+GRAPH_BACKENDS = ("networkx", "csr")
+
+# Ways ``patchplanner tune`` searches parameters
+SEARCH_MODES = ("grid", "random", "halving")
+
+# Values tune tries for each strategy's parameters when none are given
+TUNABLE_PARAMS = {
+    "batch_rolling": {"batch_size": [1, 2, 3, 4, 6, 8, 12, 16]},
+    "hybrid": {"cooldown_seconds": [0, 10, 30, 60, 120]},
+    "canary": {"pause_seconds": [0, 30, 60, 120, 300]},
+}
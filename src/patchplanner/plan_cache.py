@@ -0,0 +1,193 @@
+"""On-disk cache of generated plans.
+
+Plans are stored under a hash of the scenario's content, the strategy and its
+constructor parameters, so re-running a strategy on an unchanged scenario
+reuses its plan instead of calling ``generate()`` again. The cache is bounded
+in size: once its entries exceed ``max_bytes``, the least recently used are
+deleted.
+"""
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Optional, Tuple
+
+from . import __version__
+from .models import Plan, ScenarioSpec
+from .planner import STRATEGIES, create_strategy
+
+if TYPE_CHECKING:
+    import networkx as nx
+
+    from .graph import CSRGraph
+
+# Bump when the pickled cache entry layout changes incompatibly.
+_CACHE_FORMAT = 1
+
+# Default bound on the total size of cached plans
+DEFAULT_MAX_BYTES = 256 * 2**20
+
+
+def scenario_digest(scenario: ScenarioSpec) -> str:
+    """SHA-256 of the scenario's content, independent of dict key order.
+
+    Scenarios are mutable, so the content is hashed on every call.
+    """
+    # Nodes and edges serialise with a fixed field order; only the free-form
+    # mappings need their keys sorted.
+    digest = hashlib.sha256(
+        scenario.model_dump_json(exclude={"patch_profiles", "metadata"}).encode()
+    )
+    mappings = scenario.model_dump(mode="json", include={"patch_profiles", "metadata"})
+    digest.update(json.dumps(mappings, sort_keys=True, separators=(",", ":")).encode())
+    return digest.hexdigest()
+
+
+class PlanCache:
+    """Plans stored as pickles in ``cache_dir/plans``, evicted least recently used first.
+
+    Entries are keyed by :func:`scenario_digest`, the strategy's class and
+    its constructor arguments with defaults filled in, so ``batch_size=2``
+    and an omitted ``batch_size`` share an entry. The key also covers the
+    package version and the size and modification time of the modules
+    defining the strategy and its base classes, so editing a strategy
+    invalidates its plans. The graph backend is not part of the key: both
+    produce the same plans.
+
+    Reading an entry marks it as used by updating its modification time.
+    Unreadable entries are regenerated.
+    """
+
+    def __init__(self, cache_dir: str | Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        if max_bytes < 0:
+            raise ValueError("max_bytes must be >= 0")
+        self.directory = Path(cache_dir) / "plans"
+        self.max_bytes = max_bytes
+
+    def key(
+        self,
+        strategy: str,
+        scenario: ScenarioSpec,
+        params: Optional[Mapping[str, Any]] = None,
+    ) -> str:
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strategy}")
+        cls = STRATEGIES[strategy]
+        # Raises TypeError for parameters the constructor does not take
+        bound = inspect.signature(cls).bind(None, None, **(params or {}))
+        bound.apply_defaults()
+        arguments = dict(list(bound.arguments.items())[2:])
+        identity = {
+            "format": _CACHE_FORMAT,
+            "version": __version__,
+            "strategy": strategy,
+            "class": f"{cls.__module__}.{cls.__qualname__}",
+            "sources": _source_stamps(cls),
+            "params": arguments,
+        }
+        digest = hashlib.sha256(scenario_digest(scenario).encode())
+        digest.update(json.dumps(identity, sort_keys=True, default=repr).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Plan]:
+        path = self.directory / f"{key}.pickle"
+        try:
+            with path.open("rb") as handle:
+                plan = pickle.load(handle)
+        except FileNotFoundError:
+            return None
+        except Exception:  # corrupt entry; regenerated by the caller
+            return None
+        if not isinstance(plan, Plan):
+            return None
+        try:
+            os.utime(path)
+        except OSError:  # evicted meanwhile by another process
+            pass
+        return plan
+
+    def put(self, key: str, plan: Plan) -> None:
+        # Write then rename so concurrent readers never see a partial entry.
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                pickle.dump(plan, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, self.directory / f"{key}.pickle")
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+        self._evict()
+
+    def generate(
+        self,
+        strategy: str,
+        scenario: ScenarioSpec,
+        graph: "nx.DiGraph | CSRGraph",
+        params: Optional[Mapping[str, Any]] = None,
+    ) -> Plan:
+        """The cached plan of ``strategy`` for ``scenario``, generated and stored on a miss."""
+        key = self.key(strategy, scenario, params)
+        plan = self.get(key)
+        if plan is None:
+            plan = create_strategy(strategy, scenario, graph, params).generate()
+            self.put(key, plan)
+        return plan
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".pickle"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, entry.path, stat.st_size))
+            total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, path, size in entries:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            if total <= self.max_bytes:
+                return
+
+
+def generate_plan(
+    strategy: str,
+    scenario: ScenarioSpec,
+    graph: "nx.DiGraph | CSRGraph",
+    params: Optional[Mapping[str, Any]] = None,
+    cache_dir: Optional[str | Path] = None,
+) -> Plan:
+    """Generate the plan of ``strategy``, through a :class:`PlanCache` in ``cache_dir`` if given."""
+    if cache_dir is None:
+        return create_strategy(strategy, scenario, graph, params).generate()
+    return PlanCache(cache_dir).generate(strategy, scenario, graph, params)
+
+
+def _source_stamps(cls: type) -> Dict[str, Tuple[int, int]]:
+    """Size and modification time of every module defining ``cls`` or a base class."""
+    stamps = {}
+    for klass in cls.__mro__:
+        path = getattr(sys.modules.get(klass.__module__), "__file__", None)
+        if path is None or path in stamps:
+            continue
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        stamps[path] = (stat.st_size, stat.st_mtime_ns)
+    return stamps
@@ -1,11 +1,77 @@
-from .base import BaseStrategy
-from .bigbang import BigBangStrategy
-from .rolling import RollingStrategy
-from .batch_rolling import BatchRollingStrategy
-from .canary import CanaryStrategy
-from .bluegreen import BlueGreenStrategy
-from .dep_greedy import DependencyAwareGreedyStrategy
-from .hybrid import HybridRiskAwareStrategy
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Mapping, Optional
+
+from .registry import ENTRY_POINT_GROUP, StrategyRegistry
+
+if TYPE_CHECKING:
+    import networkx as nx
+
+    from ..graph import CSRGraph
+    from ..models import ScenarioSpec
+    from .base import BaseStrategy
+    from .batch_rolling import BatchRollingStrategy
+    from .bigbang import BigBangStrategy
+    from .bluegreen import BlueGreenStrategy
+    from .canary import CanaryStrategy
+    from .dep_greedy import DependencyAwareGreedyStrategy
+    from .exposure import ExposureOrderedStrategy
+    from .hybrid import HybridRiskAwareStrategy
+    from .makespan import MakespanPackingStrategy
+    from .optimal import OptimalStrategy
+    from .rolling import RollingStrategy
+
+# Registry of available deployment strategies. Modules are imported on first
+# lookup; third-party strategies register under the ENTRY_POINT_GROUP group.
+STRATEGIES = StrategyRegistry(
+    {
+        "bigbang": ".bigbang:BigBangStrategy",
+        "rolling": ".rolling:RollingStrategy",
+        "batch_rolling": ".batch_rolling:BatchRollingStrategy",
+        "canary": ".canary:CanaryStrategy",
+        "bluegreen": ".bluegreen:BlueGreenStrategy",
+        "dep_greedy": ".dep_greedy:DependencyAwareGreedyStrategy",
+        "hybrid": ".hybrid:HybridRiskAwareStrategy",
+        "makespan": ".makespan:MakespanPackingStrategy",
+        "exposure": ".exposure:ExposureOrderedStrategy",
+        "optimal": ".optimal:OptimalStrategy",
+    }
+)
+
+# Classes re-exported from this package, imported on first attribute access
+_EXPORTS = {
+    "BaseStrategy": ".base",
+    "BigBangStrategy": ".bigbang",
+    "RollingStrategy": ".rolling",
+    "BatchRollingStrategy": ".batch_rolling",
+    "CanaryStrategy": ".canary",
+    "BlueGreenStrategy": ".bluegreen",
+    "DependencyAwareGreedyStrategy": ".dep_greedy",
+    "HybridRiskAwareStrategy": ".hybrid",
+    "MakespanPackingStrategy": ".makespan",
+    "ExposureOrderedStrategy": ".exposure",
+    "OptimalStrategy": ".optimal",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = getattr(import_module(module, __name__), name)
+    return value
+
+
+def create_strategy(
+    name: str,
+    scenario: "ScenarioSpec",
+    graph: "nx.DiGraph | CSRGraph",
+    params: Optional[Mapping[str, Any]] = None,
+) -> "BaseStrategy":
+    """Instantiate the registered strategy ``name`` with keyword ``params``."""
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {name}")
+    return STRATEGIES[name](scenario, graph, **(params or {}))
+
 
 __all__ = [
     "BaseStrategy",
@@ -16,4 +82,11 @@ __all__ = [
     "BlueGreenStrategy",
     "DependencyAwareGreedyStrategy",
     "HybridRiskAwareStrategy",
+    "MakespanPackingStrategy",
+    "ExposureOrderedStrategy",
+    "OptimalStrategy",
+    "ENTRY_POINT_GROUP",
+    "STRATEGIES",
+    "StrategyRegistry",
+    "create_strategy",
 ]
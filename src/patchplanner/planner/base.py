@@ -1,20 +1,25 @@
 """Base class for all patch deployment strategies."""
 from __future__ import annotations
 
+import heapq
 from abc import ABC, abstractmethod
-from typing import Dict, Iterable, List
-
-import networkx as nx
+from collections import Counter, defaultdict
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, Optional
 
 from ..infra_loader import incompatible_components
-from ..models import Plan, PlanStep, ScenarioSpec
+from ..models import HealthState, Plan, PlanStep, ScenarioSpec
+
+if TYPE_CHECKING:
+    import networkx as nx
+
+    from ..graph import CSRGraph
 
 
 class BaseStrategy(ABC):
     """Abstract base for strategy implementations using the Strategy Pattern."""
     name = "base"
 
-    def __init__(self, scenario: ScenarioSpec, graph: nx.DiGraph):
+    def __init__(self, scenario: ScenarioSpec, graph: nx.DiGraph | CSRGraph):
         self.scenario = scenario
         self.graph = graph
         self._incompat_groups = incompatible_components(graph, scenario.edges)
@@ -35,7 +40,123 @@ class BaseStrategy(ABC):
             groups.setdefault(group_id, []).append(node_id)
         return groups
 
-    def _make_steps(self, batches: List[List[str]], action: str) -> List[PlanStep]:
+    def _service_of(self, node_id: str) -> str:
+        """Service a node counts towards for min_up; a node without one is its own."""
+        return self.graph.nodes[node_id].get("service") or node_id
+
+    def _group_by_service(self, node_ids: Iterable[str]) -> Dict[str, List[str]]:
+        by_service: Dict[str, List[str]] = defaultdict(list)
+        for node_id in node_ids:
+            by_service[self._service_of(node_id)].append(node_id)
+        return by_service
+
+    def _get_min_up(self, node_ids: List[str]) -> int:
+        """Get the min_up requirement for a group of nodes."""
+        min_ups = []
+        for node_id in node_ids:
+            node_min = self.graph.nodes[node_id].get("min_up")
+            if node_min is None:
+                node_min = self.scenario.min_up_default
+            min_ups.append(node_min)
+        return max(min_ups) if min_ups else self.scenario.min_up_default
+
+    def _max_down_per_service(self, by_service: Mapping[str, List[str]]) -> Dict[str, int]:
+        """How many of each service's nodes may be down at once without breaking min_up."""
+        return {
+            service: max(0, len(nodes) - self._get_min_up(nodes))
+            for service, nodes in by_service.items()
+        }
+
+    def _down_capacity(self) -> Dict[str, int]:
+        """Healthy nodes each service can lose at once, as ``availability_ok`` counts them.
+
+        Services cover every node in the graph, patchable or not; a negative
+        capacity means the service is below min_up already.
+        """
+        capacity = {}
+        for service, nodes in self._group_by_service(self.graph.nodes).items():
+            healthy = sum(
+                1 for node_id in nodes
+                if self.graph.nodes[node_id].get("health") == HealthState.HEALTHY
+            )
+            capacity[service] = healthy - self._get_min_up(nodes)
+        return capacity
+
+    def _down_demand(self, node_ids: Iterable[str]) -> Counter:
+        """Capacity per service that patching ``node_ids`` together uses up.
+
+        Like the engine, only healthy nodes whose patch needs a restart or a
+        reboot count; nodes patched in place stay available.
+        """
+        demand: Counter = Counter()
+        for node_id in node_ids:
+            data = self.graph.nodes[node_id]
+            patch = data["spec"].patch
+            if data.get("health") == HealthState.HEALTHY and (
+                patch.requires_restart or patch.requires_reboot
+            ):
+                demand[self._service_of(node_id)] += 1
+        return demand
+
+    def _build_safe_batches(
+        self,
+        nodes: List[str],
+        max_down: Mapping[str, int],
+        batch_size: Optional[int] = None,
+    ) -> List[List[str]]:
+        """Pack ``nodes`` into batches that respect per-service ``max_down`` limits.
+
+        ``nodes`` is in priority order. Each batch takes the earliest remaining
+        nodes of every service up to its limit (1 for services missing from
+        ``max_down``), keeping only the first ``batch_size`` of them in
+        priority order when a size is given. Nodes of services whose limit is
+        0 can never be patched safely; they follow all others, one per batch.
+        Batches are sorted by node ID.
+
+        Each service keeps a queue of its remaining nodes and a heap holds
+        the next candidate of every service, so packing costs O(n log s) for
+        n nodes and s services and does not depend on set iteration order.
+        """
+        queues: Dict[str, List[int]] = defaultdict(list)
+        for rank, node_id in enumerate(nodes):
+            queues[self._service_of(node_id)].append(rank)
+        limits = {service: max_down.get(service, 1) for service in queues}
+
+        heads = dict.fromkeys(queues, 0)
+        # (rank of the service's next node, service) for services with capacity
+        ready = [(queue[0], service) for service, queue in queues.items() if limits[service] > 0]
+        heapq.heapify(ready)
+
+        batches: List[List[str]] = []
+        while ready:
+            batch: List[int] = []
+            taken: Dict[str, int] = defaultdict(int)
+            while ready and (batch_size is None or len(batch) < batch_size):
+                rank, service = heapq.heappop(ready)
+                batch.append(rank)
+                taken[service] += 1
+                heads[service] += 1
+                if taken[service] < limits[service] and heads[service] < len(queues[service]):
+                    heapq.heappush(ready, (queues[service][heads[service]], service))
+            # Services that reached their limit this batch are eligible again next batch
+            for service, count in taken.items():
+                if count == limits[service] and heads[service] < len(queues[service]):
+                    heapq.heappush(ready, (queues[service][heads[service]], service))
+            batches.append(sorted(nodes[rank] for rank in batch))
+
+        # Last resort for services that cannot lose any node: one at a time
+        stuck = sorted(
+            rank for service, queue in queues.items() if limits[service] <= 0 for rank in queue
+        )
+        batches.extend([nodes[rank]] for rank in stuck)
+        return batches
+
+    def _make_steps(
+        self,
+        batches: List[List[str]],
+        action: str,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[PlanStep]:
         steps = []
         for idx, batch in enumerate(batches, start=1):
             steps.append(
@@ -44,6 +165,7 @@ class BaseStrategy(ABC):
                     action=action,
                     node_ids=batch,
                     strategy=self.name,
+                    metadata=dict(metadata or {}),
                 )
             )
         return steps
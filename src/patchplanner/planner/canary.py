@@ -12,23 +12,24 @@ class CanaryStrategy(BaseStrategy):
     
     Patches one 'canary' node per service first (with a pause for observation),
     then patches remaining nodes in batches that respect min_up constraints.
+    The observation pause lasts ``pause_seconds``.
     """
     name = "canary"
 
+    def __init__(self, scenario, graph, pause_seconds: int = 60):
+        super().__init__(scenario, graph)
+        if pause_seconds < 0:
+            raise ValueError("pause_seconds must be >= 0")
+        self.pause_seconds = pause_seconds
+
     def generate(self) -> Plan:
         node_ids = self._node_ids()
         
         # Group nodes by service
-        by_service = defaultdict(list)
-        for node_id in node_ids:
-            service = self.graph.nodes[node_id].get("service") or node_id
-            by_service[service].append(node_id)
+        by_service = self._group_by_service(node_ids)
         
         # Calculate how many nodes can be down per service
-        max_down_per_service = {}
-        for service, nodes in by_service.items():
-            min_up = self._get_min_up(nodes)
-            max_down_per_service[service] = max(0, len(nodes) - min_up)
+        max_down_per_service = self._max_down_per_service(by_service)
         
         # Select canaries - one per service (if service can have at least one down)
         canaries = []
@@ -84,7 +85,7 @@ class CanaryStrategy(BaseStrategy):
                 PlanStep(
                     step_id="pause-canary",
                     action="pause",
-                    pause_seconds=60,
+                    pause_seconds=self.pause_seconds,
                     strategy=self.name,
                 )
             )
@@ -94,38 +95,3 @@ class CanaryStrategy(BaseStrategy):
             steps.extend(self._make_steps([batch], action="patch"))
         
         return Plan(strategy=self.name, steps=steps)
-    
-    def _build_safe_batches(self, nodes: List[str], max_down: dict) -> List[List[str]]:
-        """Build batches that respect per-service max_down limits."""
-        batches = []
-        remaining = list(nodes)
-        
-        while remaining:
-            batch = []
-            service_down_count = defaultdict(int)
-            
-            for node_id in list(remaining):
-                service = self.graph.nodes[node_id].get("service") or node_id
-                if service_down_count[service] < max_down.get(service, 1):
-                    batch.append(node_id)
-                    service_down_count[service] += 1
-                    remaining.remove(node_id)
-            
-            if batch:
-                batches.append(sorted(batch))
-            else:
-                # Safety: if we can't make progress, patch one at a time
-                if remaining:
-                    batches.append([remaining.pop(0)])
-        
-        return batches
-    
-    def _get_min_up(self, node_ids: List[str]) -> int:
-        """Get the min_up requirement for a group of nodes."""
-        min_ups = []
-        for node_id in node_ids:
-            node_min = self.graph.nodes[node_id].get("min_up")
-            if node_min is None:
-                node_min = self.scenario.min_up_default
-            min_ups.append(node_min)
-        return max(min_ups) if min_ups else self.scenario.min_up_default
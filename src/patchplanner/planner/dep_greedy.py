@@ -1,27 +1,68 @@
 from __future__ import annotations
 
-from typing import Dict, List, Set
-
-import networkx as nx
+import heapq
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
 
 from ..models import Plan
 from .base import BaseStrategy
 
 
 class DependencyAwareGreedyStrategy(BaseStrategy):
+    """Patch INCOMPATIBLE groups in dependency order, riskiest ready group first.
+
+    By default every group gets its own step. With ``waves=True`` each step
+    instead packs every ready group, in risk order, whose nodes can go down
+    together with the groups already in the step without breaking min_up
+    (the room ``_down_capacity`` allows, used up as ``_down_demand`` counts
+    it); groups that do not fit wait for the next wave. Steps stay barriers,
+    so a group is never patched alongside or before a group it depends on.
+
+    If a service is below min_up before anything is patched, every step
+    fails availability however it is packed, and waves fall back to one
+    group per step; ``plan.metadata["waves_disabled"]`` then lists those
+    services.
+    """
     name = "dep_greedy"
 
+    def __init__(self, scenario, graph, waves: bool = False):
+        super().__init__(scenario, graph)
+        self.waves = waves
+
     def generate(self) -> Plan:
         node_ids = self._node_ids()
         groups = self._group_by_incompatibility(node_ids)
-        group_ids = list(groups.keys())
+        group_risk = self._group_risk(groups)
+        dependents = self._group_dependents(groups)
+
+        capacity = self._down_capacity() if self.waves else {}
+        below = sorted(service for service, room in capacity.items() if room < 0)
+        waves = self._schedule(
+            groups, dependents, group_risk, capacity if self.waves and not below else None
+        )
+        batches = [
+            sorted(node_id for group_id in wave for node_id in groups[group_id])
+            for wave in waves
+        ]
+        if self.waves:
+            # Barrier: an event-driven engine must not overlap dependency levels
+            steps = self._make_steps(batches, action="patch", metadata={"barrier": True})
+            plan = Plan(strategy=self.name, steps=steps)
+            if below:
+                plan.metadata["waves_disabled"] = below
+            return plan
+
+        steps = []
+        for batch in batches:
+            steps.extend(self._make_steps([batch], action="patch", metadata={"barrier": True}))
+        return Plan(strategy=self.name, steps=steps)
+
+    def _group_dependents(self, groups: Dict[object, List[str]]) -> Dict[object, Set[object]]:
+        """Map each group to the groups depending on it, which must be patched after it."""
         group_lookup = {
             node_id: group_id for group_id, nodes in groups.items() for node_id in nodes
         }
-        group_risk = self._group_risk(groups)
-
-        dep_graph = nx.DiGraph()
-        dep_graph.add_nodes_from(group_ids)
+        dependents: Dict[object, Set[object]] = {group_id: set() for group_id in groups}
         for edge in self.scenario.edges:
             src_group = group_lookup.get(edge.source)
             tgt_group = group_lookup.get(edge.target)
@@ -29,30 +70,76 @@ class DependencyAwareGreedyStrategy(BaseStrategy):
                 continue
             if src_group == tgt_group:
                 continue
-            dep_graph.add_edge(tgt_group, src_group)
+            dependents[tgt_group].add(src_group)
+        return dependents
 
-        steps = []
-        remaining: Set[object] = set(group_ids)
-        while remaining:
-            ready = [
-                group_id
-                for group_id in remaining
-                if dep_graph.in_degree(group_id) == 0
-            ]
-            if not ready:
-                raise RuntimeError(
-                    "Dependency cycle detected; cannot build dependency-aware plan."
-                )
-            ready.sort(
-                key=lambda gid: (-group_risk.get(gid, 0.0), str(gid))
-            )
-            chosen = ready[0]
-            batch = sorted(groups[chosen])
-            steps.extend(self._make_steps([batch], action="patch"))
-            dep_graph.remove_node(chosen)
-            remaining.remove(chosen)
+    def _schedule(
+        self,
+        groups: Dict[object, List[str]],
+        dependents: Dict[object, Set[object]],
+        group_risk: Dict[object, float],
+        capacity: Optional[Dict[str, int]] = None,
+    ) -> List[List[object]]:
+        """Order groups into waves so that every group follows the groups it depends on.
 
-        return Plan(strategy=self.name, steps=steps)
+        Kahn's algorithm with a heap of ready groups, riskiest first (ties
+        broken by ``str(group_id)``). Without ``capacity`` each wave is the
+        single next group, in O(V log V + E) for V groups and E dependencies.
+        With it a wave goes through every ready group and takes those that
+        fit the per-service ``capacity`` left by the groups already in it;
+        the rest wait for the next wave. The first group of a wave is always
+        taken so that every wave makes progress.
+        """
+        in_degree: Dict[object, int] = dict.fromkeys(dependents, 0)
+        for targets in dependents.values():
+            for group_id in targets:
+                in_degree[group_id] += 1
+
+        # The position in ``dependents`` only keeps heap entries comparable
+        position = {group_id: idx for idx, group_id in enumerate(dependents)}
+
+        def entry(group_id: object) -> Tuple[float, str, int, object]:
+            return (-group_risk.get(group_id, 0.0), str(group_id), position[group_id], group_id)
+
+        if capacity is not None:
+            demand = {group_id: self._down_demand(nodes) for group_id, nodes in groups.items()}
+
+        ready = [entry(group_id) for group_id, degree in in_degree.items() if degree == 0]
+        heapq.heapify(ready)
+        waves: List[List[object]] = []
+        scheduled = 0
+        while ready:
+            wave = [heapq.heappop(ready)[-1]]
+            if capacity is not None:
+                taken = Counter(demand[wave[0]])
+                deferred = []
+                while ready:
+                    item = heapq.heappop(ready)
+                    needed = demand[item[-1]]
+                    if all(
+                        taken[service] + count <= capacity[service]
+                        for service, count in needed.items()
+                    ):
+                        wave.append(item[-1])
+                        taken.update(needed)
+                    else:
+                        deferred.append(item)
+                for item in deferred:
+                    heapq.heappush(ready, item)
+            waves.append(wave)
+            scheduled += len(wave)
+
+            for chosen in wave:
+                for group_id in dependents[chosen]:
+                    in_degree[group_id] -= 1
+                    if in_degree[group_id] == 0:
+                        heapq.heappush(ready, entry(group_id))
+
+        if scheduled < len(dependents):
+            raise RuntimeError(
+                "Dependency cycle detected; cannot build dependency-aware plan."
+            )
+        return waves
 
     def _group_risk(self, groups: Dict[object, List[str]]) -> Dict[object, float]:
         risk_scores = self._risk_scores(
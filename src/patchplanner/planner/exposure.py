@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from ..models import Plan
+from .base import BaseStrategy
+
+
+@dataclass
+class _Job:
+    """An INCOMPATIBLE group, which is always patched within one step."""
+    nodes: List[str]
+    # Exposure it accrues per second until patched
+    weight: float
+    # Seconds it makes its step last
+    duration: int
+    # Capacity it uses per service while patching
+    demand: Counter
+
+    @property
+    def ratio(self) -> float:
+        """Exposure removed per second of rollout, the key of Smith's rule."""
+        return self.weight / self.duration if self.duration else float("inf")
+
+
+class ExposureOrderedStrategy(BaseStrategy):
+    """Order and pack steps by exposure removed per second of rollout.
+
+    ``exposure_window_weighted`` accrues criticality × severity per second for
+    every unpatched node. With a single node per step the optimal order is
+    Smith's rule: highest weight / duration first. Steps here run several
+    INCOMPATIBLE groups at once and last as long as the slowest, so every step
+    is chosen the same way: for each candidate length, fill a step with the
+    remaining groups no longer than it, in ratio order, while every service
+    they take down stays within min_up (the room ``_down_capacity`` allows);
+    then keep the candidate that removes the most weight per second. Groups
+    that exceed a service's room even in an empty step follow all others,
+    one per step.
+
+    ``plan.metadata`` records the exposure of a failure-free run of the plan
+    (``estimated_exposure``), a lower bound on the exposure of any plan of
+    ``patch`` steps (``exposure_lower_bound``, see :class:`_ExposureBound`)
+    and the relative gap between the two.
+    """
+    name = "exposure"
+
+    def generate(self) -> Plan:
+        jobs = self._jobs(self._node_ids())
+        capacity = self._down_capacity()
+        return self._plan(self._order(jobs, capacity), jobs, capacity)
+
+    def _order(self, jobs: Sequence[_Job], capacity: Dict[str, int]) -> List[List[_Job]]:
+        """Split ``jobs`` into steps, greedily by weight removed per second."""
+        remaining = [job for job in jobs if _fits(job.demand, Counter(), capacity)]
+        oversized = [job for job in jobs if not _fits(job.demand, Counter(), capacity)]
+
+        batches: List[List[_Job]] = []
+        while remaining:
+            best: Optional[List[_Job]] = None
+            best_ratio = -1.0
+            for length in sorted({job.duration for job in remaining}):
+                batch = _fill(remaining, capacity, length)
+                weight = sum(job.weight for job in batch)
+                ratio = weight / length if length else float("inf")
+                if ratio > best_ratio:
+                    best, best_ratio = batch, ratio
+            batches.append(best)
+            chosen = {id(job) for job in best}
+            remaining = [job for job in remaining if id(job) not in chosen]
+        batches.extend([job] for job in oversized)
+        return batches
+
+    def _plan(
+        self, batches: Sequence[Sequence[_Job]], jobs: Sequence[_Job], capacity: Dict[str, int]
+    ) -> Plan:
+        plan = Plan(
+            strategy=self.name,
+            steps=self._make_steps(
+                [sorted(n for job in batch for n in job.nodes) for batch in batches],
+                action="patch",
+            ),
+        )
+        # Nodes the plan never patches accrue exposure until the rollout ends
+        idle_weight = sum(self._weight(n) for n in self._idle_nodes(jobs))
+        estimate = _exposure(batches, idle_weight)
+        kinds = _kinds(jobs)
+        bound = _ExposureBound([kind[0] for kind in kinds], capacity)(
+            [len(kind) for kind in kinds], idle_weight
+        )
+        plan.metadata.update(
+            {
+                "estimated_exposure": estimate,
+                "exposure_lower_bound": bound,
+                "exposure_gap": estimate / bound - 1.0 if bound else 0.0,
+            }
+        )
+        return plan
+
+    def _weight(self, node_id: str) -> float:
+        """Exposure ``node_id`` accrues per second while not on the new version."""
+        data = self.graph.nodes[node_id]
+        if data.get("version") == "v_new":
+            return 0.0
+        return data["criticality"] * data["spec"].patch.severity
+
+    def _jobs(self, node_ids: Iterable[str]) -> List[_Job]:
+        """One job per INCOMPATIBLE group, highest Smith ratio first."""
+        jobs = [
+            _Job(
+                nodes=nodes,
+                weight=sum(self._weight(n) for n in nodes),
+                duration=max(self._duration(n) for n in nodes),
+                demand=self._down_demand(nodes),
+            )
+            for nodes in self._group_by_incompatibility(node_ids).values()
+        ]
+        jobs.sort(key=lambda job: (-job.ratio, -job.weight, min(job.nodes)))
+        return jobs
+
+    def _duration(self, node_id: str) -> int:
+        return self.graph.nodes[node_id]["spec"].patch.patch_duration_seconds
+
+    def _idle_nodes(self, jobs: Sequence[_Job]) -> List[str]:
+        """Nodes of the graph that no job patches."""
+        planned = {n for job in jobs for n in job.nodes}
+        return [n for n in self.graph.nodes if n not in planned]
+
+
+class _ExposureBound:
+    """Lower bound on the exposure still to accrue until the given jobs are patched.
+
+    Jobs are given as ``kinds``, one representative per kind, and the bound
+    is evaluated for any count of each. Dropping the INCOMPATIBLE and
+    step-barrier rules, and counting every job as one node of the service it
+    loads most, leaves each service free to patch up to its room of jobs at
+    a time: identical parallel machines, one per unit of room. For ``m``
+    machines the Eastman-Even-Isaacs bound gives
+    ``sum(w·C) >= sum(w·C1) / m + (m - 1) / (2m) · sum(w·p)``, where ``C1``
+    are the completion times of a single machine in Smith order; no job can
+    finish before its own duration either. Jobs that take nothing down only
+    get the latter bound. ``idle_weight`` accrues until the rollout ends,
+    which takes at least the longest job and at least every service's total
+    work divided by its room.
+
+    Blue-green steps patch on spare capacity outside min_up and are not
+    covered.
+    """
+
+    def __init__(self, kinds: Sequence[_Job], capacity: Dict[str, int]):
+        self.kinds = kinds
+        self.room = {
+            service: max(1, capacity.get(service, 1))
+            for kind in kinds
+            for service in kind.demand
+        }
+        # Kinds bounded per service, in Smith order, and kinds that take nothing down
+        self.by_service: Dict[str, List[int]] = defaultdict(list)
+        self.free: List[int] = []
+        order = sorted(range(len(kinds)), key=lambda k: (-kinds[k].ratio, k))
+        for k in order:
+            demand = kinds[k].demand
+            if not demand:
+                self.free.append(k)
+                continue
+            service = max(sorted(demand), key=lambda s: demand[s] / self.room[s])
+            self.by_service[service].append(k)
+
+    def __call__(self, counts: Sequence[int], idle_weight: float = 0.0) -> float:
+        kinds = self.kinds
+        bound = 0.0
+        for k in self.free:
+            bound += counts[k] * kinds[k].weight * kinds[k].duration
+        for service, members in self.by_service.items():
+            machines = self.room[service]
+            elapsed = single = own = 0.0
+            for k in members:
+                n = counts[k]
+                if not n:
+                    continue
+                weight, duration = kinds[k].weight, kinds[k].duration
+                single += weight * (n * elapsed + duration * n * (n + 1) / 2)
+                own += n * weight * duration
+                elapsed += n * duration
+            bound += max(own, single / machines + (machines - 1) / (2 * machines) * own)
+        if not idle_weight:
+            return bound
+
+        makespan = 0.0
+        load: Dict[str, float] = defaultdict(float)
+        for k, n in enumerate(counts):
+            if not n:
+                continue
+            makespan = max(makespan, kinds[k].duration)
+            for service, count in kinds[k].demand.items():
+                load[service] += n * count * kinds[k].duration / self.room[service]
+        return bound + idle_weight * max(makespan, *load.values(), 0.0)
+
+
+def _kinds(jobs: Sequence[_Job]) -> List[List[_Job]]:
+    """``jobs`` grouped by weight, duration and demand, which makes them interchangeable."""
+    kinds: Dict[tuple, List[_Job]] = {}
+    for job in jobs:
+        key = (job.weight, job.duration, tuple(sorted(job.demand.items())))
+        kinds.setdefault(key, []).append(job)
+    return list(kinds.values())
+
+
+def _exposure(batches: Sequence[Sequence[_Job]], idle_weight: float) -> float:
+    """Exposure of a failure-free run of ``batches``, one step each."""
+    rate = idle_weight + sum(job.weight for batch in batches for job in batch)
+    exposure = 0.0
+    for batch in batches:
+        exposure += rate * max(job.duration for job in batch)
+        rate -= sum(job.weight for job in batch)
+    return exposure
+
+
+def _fits(demand: Counter, taken: Counter, capacity: Dict[str, int]) -> bool:
+    return all(
+        taken[service] + count <= capacity.get(service, 0) for service, count in demand.items()
+    )
+
+
+def _fill(jobs: Sequence[_Job], capacity: Dict[str, int], length: int) -> List[_Job]:
+    """Jobs no longer than ``length``, in the given order, while every service has room."""
+    batch: List[_Job] = []
+    taken: Counter = Counter()
+    for job in jobs:
+        if job.duration <= length and _fits(job.demand, taken, capacity):
+            batch.append(job)
+            taken.update(job.demand)
+    return batch
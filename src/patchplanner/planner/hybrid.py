@@ -8,9 +8,18 @@ from .base import BaseStrategy
 
 
 class HybridRiskAwareStrategy(BaseStrategy):
-    """Risk-aware adaptive strategy: patches high-risk nodes first, chooses optimal sub-strategy per group."""
+    """Risk-aware adaptive strategy: patches high-risk nodes first, chooses optimal sub-strategy per group.
+
+    Every group is followed by a ``cooldown_seconds`` pause.
+    """
     name = "hybrid"
 
+    def __init__(self, scenario, graph, cooldown_seconds: int = 30):
+        super().__init__(scenario, graph)
+        if cooldown_seconds < 0:
+            raise ValueError("cooldown_seconds must be >= 0")
+        self.cooldown_seconds = cooldown_seconds
+
     def generate(self) -> Plan:
         node_ids = self._node_ids()
         risk_scores = self._risk_scores(node_ids)
@@ -22,7 +31,7 @@ class HybridRiskAwareStrategy(BaseStrategy):
         )
 
         steps: List[PlanStep] = []
-        cooldown = 30
+        cooldown = self.cooldown_seconds
         for idx, group_nodes in enumerate(ordered_groups, start=1):
             # Choose blue-green if possible (zero downtime), otherwise rolling
             if self._use_bluegreen(group_nodes):
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+from ..models import Plan
+from .base import BaseStrategy
+
+
+class MakespanPackingStrategy(BaseStrategy):
+    """Pack nodes into as few and as short steps as min_up allows.
+
+    A step lasts as long as its slowest node, so a rollout takes the sum of
+    every step's longest patch duration. INCOMPATIBLE groups are placed
+    longest patch first (first-fit decreasing) into the earliest step that
+    still has room for them in every service they take down. The group that
+    opens a step sets its duration and every later group is no longer, so
+    joining a step never extends it and similar durations share steps.
+
+    Room is what the engine allows: a service may lose its healthy nodes down
+    to min_up, and only nodes whose patch restarts or reboots them count.
+    Groups that exceed a service's room even in an empty step follow all
+    others, one per step.
+    """
+    name = "makespan"
+
+    def generate(self) -> Plan:
+        groups = list(self._group_by_incompatibility(self._node_ids()).values())
+        duration = {
+            node_id: self.graph.nodes[node_id]["spec"].patch.patch_duration_seconds
+            for nodes in groups
+            for node_id in nodes
+        }
+
+        def priority(nodes: List[str]):
+            risk = max(
+                self.graph.nodes[n]["criticality"] * self.graph.nodes[n]["spec"].patch.severity
+                for n in nodes
+            )
+            return (-max(duration[n] for n in nodes), -risk, min(nodes))
+
+        groups.sort(key=priority)
+        capacity = self._down_capacity()
+
+        batches: List[List[str]] = []
+        used: List[Counter] = []
+        oversized: List[List[str]] = []
+        # Earliest step in which each service may still have room
+        first_open: Dict[str, int] = defaultdict(int)
+        for nodes in groups:
+            demand = self._down_demand(nodes)
+            if any(count > capacity.get(service, 0) for service, count in demand.items()):
+                oversized.append(nodes)
+                continue
+            step = max((first_open[service] for service in demand), default=0)
+            while step < len(batches) and any(
+                used[step][service] + count > capacity[service]
+                for service, count in demand.items()
+            ):
+                step += 1
+            if step == len(batches):
+                batches.append([])
+                used.append(Counter())
+            batches[step].extend(nodes)
+            used[step].update(demand)
+            for service in demand:
+                while (
+                    first_open[service] < len(batches)
+                    and used[first_open[service]][service] >= capacity[service]
+                ):
+                    first_open[service] += 1
+
+        batches.extend(oversized)
+        steps = self._make_steps([sorted(batch) for batch in batches], action="patch")
+        return Plan(strategy=self.name, steps=steps)
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import time
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ..models import Plan
+from .exposure import (
+    ExposureOrderedStrategy,
+    _exposure,
+    _ExposureBound,
+    _fits,
+    _Job,
+    _kinds,
+)
+
+# Exposure differences below this are rounding, not improvements
+_EPSILON = 1e-9
+
+# Steps of one length tried per state in the first search pass; the first
+# choices are the ones closest to the ``exposure`` plan's. Skipped steps are
+# tried in later passes unless a bound shows none could do better.
+MAX_BRANCHING = 64
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+class OptimalStrategy(ExposureOrderedStrategy):
+    """Branch-and-bound search for the plan with the lowest exposure.
+
+    Starts from the ``exposure`` plan and searches step sequences depth
+    first, cheapest lower bound first, for one that accrues less
+    ``exposure_window_weighted``. A step is a set of INCOMPATIBLE groups
+    (from ``_group_by_incompatibility``) that fits every service's min_up
+    room, and only maximal steps are tried: one that could still take
+    another group no longer than its slowest is never better than the same
+    step with it. Groups with the same weight, duration and demand are
+    interchangeable, so a state is the count left of each kind. A state is
+    pruned when the exposure accrued so far plus the lower bound of
+    :class:`~patchplanner.planner.exposure._ExposureBound` on what remains
+    cannot beat the best plan, or when it was already reached with no more
+    exposure accrued.
+
+    The search stops after ``time_budget`` seconds and returns the best plan
+    found so far. ``plan.metadata`` records whether the search proved the
+    plan optimal (``proven_optimal``) and how many states it expanded, on
+    top of the ``exposure`` estimate and lower bound.
+    """
+    name = "optimal"
+
+    def __init__(self, scenario, graph, time_budget: float = 5.0):
+        super().__init__(scenario, graph)
+        if time_budget < 0:
+            raise ValueError("time_budget must be >= 0")
+        self.time_budget = time_budget
+        self._proven = False
+        self._expanded = 0
+
+    def _order(self, jobs: Sequence[_Job], capacity: Dict[str, int]) -> List[List[_Job]]:
+        deadline = time.perf_counter() + self.time_budget
+        greedy = super()._order(jobs, capacity)
+
+        fitting = [job for job in jobs if _fits(job.demand, Counter(), capacity)]
+        oversized = [[job] for job in jobs if not _fits(job.demand, Counter(), capacity)]
+        kinds = _kinds(fitting)
+        # Groups patched after the search's steps accrue exposure throughout
+        idle_weight = sum(self._weight(n) for n in self._idle_nodes(jobs))
+        idle_weight += sum(batch[0].weight for batch in oversized)
+        incumbent = _exposure(greedy[: len(greedy) - len(oversized)], idle_weight)
+
+        search = _Search([kind[0] for kind in kinds], capacity, idle_weight, deadline)
+        vectors = search.run([len(kind) for kind in kinds], incumbent)
+        self._proven = search.finished
+        self._expanded = search.expanded
+        if vectors is None:
+            return greedy
+
+        pools = [iter(kind) for kind in kinds]
+        batches = [
+            [next(pools[k]) for k, count in enumerate(vector) for _ in range(count)]
+            for vector in vectors
+        ]
+        return batches + oversized
+
+    def _plan(
+        self, batches: Sequence[Sequence[_Job]], jobs: Sequence[_Job], capacity: Dict[str, int]
+    ) -> Plan:
+        plan = super()._plan(batches, jobs, capacity)
+        plan.metadata.update({"proven_optimal": self._proven, "expanded_states": self._expanded})
+        return plan
+
+
+class _Search:
+    """Depth-first branch and bound over counts of job kinds left to patch."""
+
+    def __init__(
+        self,
+        kinds: Sequence[_Job],
+        capacity: Dict[str, int],
+        idle_weight: float,
+        deadline: float,
+    ):
+        self.kinds = kinds
+        self.capacity = capacity
+        self.idle_weight = idle_weight
+        self.deadline = deadline
+        self.bound = _ExposureBound(kinds, capacity)
+        self.finished = False
+        self.expanded = 0
+        # Steps of one length tried per state in the current pass
+        self.branching = MAX_BRANCHING
+        # Least exposure any step skipped in the current pass could lead to
+        self.skipped_bound = float("inf")
+        # Exposure and steps of the best plan found
+        self.best_cost = float("inf")
+        self.best: Optional[List[Tuple[int, ...]]] = None
+
+    def run(
+        self, counts: Sequence[int], incumbent: float
+    ) -> Optional[List[Tuple[int, ...]]]:
+        """Steps, as counts taken of each kind, of a plan cheaper than ``incumbent``.
+
+        Passes are repeated with MAX_BRANCHING times 8, 64, ... steps per
+        length until one proves its result optimal or the deadline passes.
+        Returns None when no cheaper plan was found.
+        """
+        self.best_cost = incumbent
+        try:
+            while not self._search(tuple(counts)):
+                self.branching *= 8
+            self.finished = True
+        except _OutOfTime:
+            pass
+        return self.best
+
+    def _search(self, counts: Tuple[int, ...]) -> bool:
+        """One depth-first pass; whether it proved the best plan optimal."""
+        self.skipped_bound = float("inf")
+        # Least exposure accrued on reaching each state so far
+        seen: Dict[Tuple[int, ...], float] = {}
+        frames = [iter(self._children(counts, 0.0))]
+        # Step leading to the state of every frame but the first
+        path: List[Tuple[int, ...]] = []
+        while frames:
+            item = next(frames[-1], None)
+            if item is None:
+                frames.pop()
+                if path:
+                    path.pop()
+                continue
+            lower, accrued, state, step = item
+            if lower >= self.best_cost - _EPSILON:
+                # Children come cheapest bound first: so are the rest
+                frames[-1] = iter(())
+                continue
+            if not any(state):
+                self.best_cost, self.best = accrued, path + [step]
+                continue
+            if seen.get(state, float("inf")) <= accrued + _EPSILON:
+                continue
+            seen[state] = accrued
+            frames.append(iter(self._children(state, accrued)))
+            path.append(step)
+        return self.skipped_bound >= self.best_cost - _EPSILON
+
+    def _children(
+        self, counts: Tuple[int, ...], accrued: float
+    ) -> List[Tuple[float, float, Tuple[int, ...], Tuple[int, ...]]]:
+        """(lower bound, exposure accrued, state, step) of every step from ``counts``."""
+        if time.perf_counter() > self.deadline:
+            raise _OutOfTime
+        self.expanded += 1
+        kinds = self.kinds
+        rate = self.idle_weight + sum(n * kind.weight for n, kind in zip(counts, kinds))
+        children = []
+        skipped: List[int] = []
+        for step, length in self._steps(counts, skipped):
+            state = tuple(n - taken for n, taken in zip(counts, step))
+            after = accrued + rate * length
+            lower = after + self.bound(state, self.idle_weight)
+            children.append((lower, after, state, step))
+        children.sort()
+        empty: Counter = Counter()
+        for length in skipped:
+            # The bound only drops as jobs are removed, so no skipped step does
+            # better than one taking all of every kind no longer than
+            # ``length`` that would fit on its own
+            state = tuple(
+                n - self._most(k, n, empty) if kind.duration <= length else n
+                for k, (n, kind) in enumerate(zip(counts, kinds))
+            )
+            lower = accrued + rate * length + self.bound(state, self.idle_weight)
+            self.skipped_bound = min(self.skipped_bound, lower)
+        return children
+
+    def _steps(
+        self, counts: Tuple[int, ...], skipped: List[int]
+    ) -> Iterator[Tuple[Tuple[int, ...], int]]:
+        """Every maximal step from ``counts`` and its length.
+
+        For each length, kinds no longer than it that no other such kind
+        competes with for a service take all they can. The counts of the
+        other, contested kinds are enumerated most first; a kind only takes
+        fewer than fit if a later kind can still use up its room. Steps
+        without a kind of exactly that length belong to a shorter length.
+        Lengths with more than ``branching`` steps are added to ``skipped``.
+        """
+        kinds = self.kinds
+        active = [k for k, n in enumerate(counts) if n]
+        for length in sorted({kinds[k].duration for k in active}):
+            eligible = [k for k in active if kinds[k].duration <= length]
+            users = Counter(service for k in eligible for service in kinds[k].demand)
+            step = [0] * len(counts)
+            taken: Counter = Counter()
+            contested = []
+            for k in eligible:
+                demand = kinds[k].demand
+                if any(users[service] > 1 for service in demand):
+                    contested.append(k)
+                    continue
+                step[k] = self._most(k, counts[k], taken)
+                taken.update({service: step[k] * count for service, count in demand.items()})
+            # Kinds no later contested kind competes with, by the position
+            # from which their count is final
+            last = {}
+            for position, k in enumerate(contested):
+                last.update(dict.fromkeys(kinds[k].demand, position))
+            settled: List[List[int]] = [[] for _ in range(len(contested) + 1)]
+            for k in contested:
+                settled[max(last[service] for service in kinds[k].demand) + 1].append(k)
+            exact = [k for k in eligible if kinds[k].duration == length]
+            tried = 0
+            for choice in self._choose(contested, settled, 0, counts, step, taken):
+                if not any(choice[k] for k in exact):
+                    continue
+                if tried == self.branching:
+                    skipped.append(length)
+                    break
+                tried += 1
+                yield choice, length
+
+    def _choose(
+        self,
+        contested: List[int],
+        settled: List[List[int]],
+        position: int,
+        counts: Tuple[int, ...],
+        step: List[int],
+        taken: Counter,
+    ) -> Iterator[Tuple[int, ...]]:
+        """Maximal completions of ``step`` over ``contested[position:]``."""
+        if time.perf_counter() > self.deadline:
+            raise _OutOfTime
+        # A kind that could take one more once no rival is left is not maximal
+        for k in settled[position]:
+            if step[k] < counts[k] and self._most(k, 1, taken):
+                return
+        if position == len(contested):
+            yield tuple(step)
+            return
+        k = contested[position]
+        demand = self.kinds[k].demand
+        most = self._most(k, counts[k], taken)
+        fewest = most if k in settled[position + 1] else 0
+        for n in range(most, fewest - 1, -1):
+            step[k] = n
+            taken.update({service: n * count for service, count in demand.items()})
+            yield from self._choose(contested, settled, position + 1, counts, step, taken)
+            taken.subtract({service: n * count for service, count in demand.items()})
+        step[k] = 0
+
+    def _most(self, k: int, available: int, taken: Counter) -> int:
+        """How many jobs of kind ``k``, up to ``available``, still fit next to ``taken``."""
+        most = available
+        for service, count in self.kinds[k].demand.items():
+            most = min(most, (self.capacity.get(service, 0) - taken[service]) // count)
+        return max(most, 0)
@@ -0,0 +1,84 @@
+"""Name -> strategy class registry that imports strategies on first lookup."""
+from __future__ import annotations
+
+from collections.abc import MutableMapping
+from importlib import import_module
+from typing import TYPE_CHECKING, Dict, Iterator, Optional, Type, Union
+
+if TYPE_CHECKING:
+    from .base import BaseStrategy
+
+# Entry point group third-party packages use to add strategies
+ENTRY_POINT_GROUP = "patchplanner.strategies"
+
+
+class StrategyRegistry(MutableMapping):
+    """Strategy classes by name, imported when first looked up.
+
+    Entries are classes or ``"module:Class"`` references; a reference is
+    imported and replaced by its class on first access. Strategies published
+    under the ``entry_point_group`` entry point group are discovered the first
+    time a name is missing or the registry is iterated, so looking up a
+    built-in strategy never scans installed packages. Registered names win
+    over entry points of the same name.
+    """
+
+    def __init__(
+        self,
+        entries: Dict[str, Union[str, Type[BaseStrategy]]],
+        entry_point_group: Optional[str] = ENTRY_POINT_GROUP,
+    ):
+        self._entries = dict(entries)
+        self._entry_point_group = entry_point_group
+        self._discovered = entry_point_group is None
+
+    def __getitem__(self, name: str) -> Type[BaseStrategy]:
+        if name not in self._entries:
+            self._discover()
+        entry = self._entries[name]
+        if isinstance(entry, str):
+            entry = self._entries[name] = _resolve(name, entry)
+        return entry
+
+    def __setitem__(self, name: str, entry: Union[str, Type[BaseStrategy]]) -> None:
+        self._entries[name] = entry
+
+    def __delitem__(self, name: str) -> None:
+        del self._entries[name]
+
+    def __contains__(self, name: object) -> bool:
+        if name not in self._entries:
+            self._discover()
+        return name in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        self._discover()
+        return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        self._discover()
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({sorted(self._entries)})"
+
+    def _discover(self) -> None:
+        if self._discovered:
+            return
+        self._discovered = True
+        from importlib.metadata import entry_points
+
+        for entry_point in entry_points(group=self._entry_point_group):
+            self._entries.setdefault(entry_point.name, entry_point.value)
+
+
+def _resolve(name: str, reference: str) -> Type[BaseStrategy]:
+    from .base import BaseStrategy
+
+    module_name, _, attribute = reference.partition(":")
+    target = import_module(module_name, __package__)
+    for part in attribute.split("."):
+        target = getattr(target, part)
+    if not (isinstance(target, type) and issubclass(target, BaseStrategy)):
+        raise TypeError(f"Strategy '{name}' ({reference}) is not a BaseStrategy subclass")
+    return target
@@ -1,3 +1,43 @@
-from .engine import SimulationEngine
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
-__all__ = ["SimulationEngine"]
+if TYPE_CHECKING:
+    from .engine import SimulationEngine
+    from .events import CountingSink, EventLevel, EventSink, JsonlSink, ListSink, NullSink
+    from .montecarlo import MonteCarloResult
+    from .state import SimulationState
+
+# Names re-exported from submodules, imported on first attribute access so
+# that importing e.g. ``simulator.events`` does not load the engine and NumPy.
+_EXPORTS = {
+    "SimulationEngine": ".engine",
+    "CountingSink": ".events",
+    "EventLevel": ".events",
+    "EventSink": ".events",
+    "JsonlSink": ".events",
+    "ListSink": ".events",
+    "NullSink": ".events",
+    "MonteCarloResult": ".montecarlo",
+    "SimulationState": ".state",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = getattr(import_module(module, __name__), name)
+    return value
+
+
+__all__ = [
+    "CountingSink",
+    "EventLevel",
+    "EventSink",
+    "JsonlSink",
+    "ListSink",
+    "MonteCarloResult",
+    "NullSink",
+    "SimulationEngine",
+    "SimulationState",
+]
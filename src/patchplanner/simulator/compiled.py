@@ -0,0 +1,217 @@
+"""Array-backed scenario representation used on the simulation hot path."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..models import CompatibilityLevel, EdgeSpec, HealthState, PatchSpec, ScenarioSpec
+
+# Integer codes for node health, indexed consistently with HEALTH_STATES.
+HEALTHY, DOWN, FAILED = 0, 1, 2
+HEALTH_STATES = (HealthState.HEALTHY, HealthState.DOWN, HealthState.FAILED)
+HEALTH_CODES = {state: code for code, state in enumerate(HEALTH_STATES)}
+
+# Integer codes for edge compatibility, indexed consistently with COMPATIBILITY_LEVELS.
+COMPATIBLE, DEGRADED, INCOMPATIBLE = 0, 1, 2
+COMPATIBILITY_LEVELS = (
+    CompatibilityLevel.COMPATIBLE,
+    CompatibilityLevel.DEGRADED,
+    CompatibilityLevel.INCOMPATIBLE,
+)
+COMPATIBILITY_CODES = {level: code for code, level in enumerate(COMPATIBILITY_LEVELS)}
+
+# Versions are compared by equality only, so they are interned as integer
+# codes; "v_old" and "v_new" always have fixed codes.
+V_OLD, V_NEW = 0, 1
+
+
+@dataclass(frozen=True)
+class CompiledScenario:
+    """Node and edge attributes of a scenario laid out as contiguous arrays.
+
+    Nodes are addressed by their position in ``node_ids``; ``index`` maps a
+    node ID back to that position. ``patches`` holds each distinct
+    :class:`PatchSpec` instance once and ``node_patch`` indexes into it per
+    node. ``takes_down`` marks nodes that are
+    unavailable while patching and ``exposure_weight`` is criticality × severity,
+    the per-second exposure of an unpatched node. ``incident_offsets`` and
+    ``incident_edges`` form a CSR adjacency from each node to the DEGRADED and
+    INCOMPATIBLE edges it is an endpoint of. Services are numbered in order of first
+    appearance, with nodes lacking a service forming a singleton service named
+    after the node (matching ``constraints.service_groups``).
+    """
+    node_ids: List[str]
+    index: Dict[str, int]
+    patches: List[PatchSpec]
+    node_patch: np.ndarray
+    criticality: np.ndarray
+    severity: np.ndarray
+    duration: np.ndarray
+    failure_probability: np.ndarray
+    requires_restart: np.ndarray
+    requires_reboot: np.ndarray
+    rollback_supported: np.ndarray
+    takes_down: np.ndarray
+    exposure_weight: np.ndarray
+    node_service: np.ndarray
+    node_min_up: np.ndarray
+    service_names: List[str]
+    service_min_up: np.ndarray
+    service_order: np.ndarray
+    service_starts: np.ndarray
+    version_names: List[str]
+    version: np.ndarray
+    health: np.ndarray
+    edges: List[EdgeSpec]
+    edge_source: np.ndarray
+    edge_target: np.ndarray
+    edge_compatibility: np.ndarray
+    edge_max_mixed: np.ndarray
+    incident_offsets: np.ndarray
+    incident_edges: np.ndarray
+
+    @classmethod
+    def from_scenario(
+        cls, scenario: ScenarioSpec, edges: Optional[Iterable[EdgeSpec]] = None
+    ) -> "CompiledScenario":
+        """Compile ``scenario``; ``edges`` overrides ``scenario.edges`` when given."""
+        nodes = scenario.nodes
+        node_ids = [node.id for node in nodes]
+        index = {node_id: idx for idx, node_id in enumerate(node_ids)}
+        # Per-patch values are computed once per distinct PatchSpec instance
+        # (the loader interns identical specs) and gathered per node.
+        patch_codes: Dict[int, int] = {}
+        patches: List[PatchSpec] = []
+        node_patch_list = []
+        for node in nodes:
+            code = patch_codes.get(id(node.patch))
+            if code is None:
+                code = patch_codes[id(node.patch)] = len(patches)
+                patches.append(node.patch)
+            node_patch_list.append(code)
+        node_patch = np.array(node_patch_list, dtype=np.intp)
+
+        service_index: Dict[str, int] = {}
+        node_service = [
+            service_index.setdefault(node.service or node.id, len(service_index))
+            for node in nodes
+        ]
+        node_service_arr = np.array(node_service, dtype=np.intp)
+        node_min_up = np.array(
+            [
+                node.min_up if node.min_up is not None else scenario.min_up_default
+                for node in nodes
+            ],
+            dtype=np.int64,
+        )
+        service_min_up = np.full(len(service_index), np.iinfo(np.int64).min, dtype=np.int64)
+        np.maximum.at(service_min_up, node_service_arr, node_min_up)
+        service_order = np.argsort(node_service_arr, kind="stable")
+        sorted_services = node_service_arr[service_order]
+        service_starts = np.flatnonzero(
+            np.r_[True, sorted_services[1:] != sorted_services[:-1]]
+        ) if nodes else np.zeros(0, dtype=np.intp)
+
+        version, version_names = encode_versions(node.version for node in nodes)
+
+        criticality = np.array([node.criticality for node in nodes], dtype=np.int64)
+        severity = np.array([p.severity for p in patches], dtype=np.float64)[node_patch]
+        requires_restart = np.array([p.requires_restart for p in patches], dtype=bool)[node_patch]
+        requires_reboot = np.array([p.requires_reboot for p in patches], dtype=bool)[node_patch]
+
+        edge_list = list(scenario.edges if edges is None else edges)
+        edge_source = np.array([index[e.source] for e in edge_list], dtype=np.intp)
+        edge_target = np.array([index[e.target] for e in edge_list], dtype=np.intp)
+        edge_compatibility = np.array(
+            [COMPATIBILITY_CODES[e.compatibility] for e in edge_list], dtype=np.int8
+        )
+        incident_offsets, incident_edges = _incident_tracked_edges(
+            len(nodes), edge_source, edge_target, edge_compatibility
+        )
+        return cls(
+            node_ids=node_ids,
+            index=index,
+            patches=patches,
+            node_patch=node_patch,
+            criticality=criticality,
+            severity=severity,
+            duration=np.array(
+                [p.patch_duration_seconds for p in patches], dtype=np.int64
+            )[node_patch],
+            failure_probability=np.array(
+                [p.failure_probability for p in patches], dtype=np.float64
+            )[node_patch],
+            requires_restart=requires_restart,
+            requires_reboot=requires_reboot,
+            rollback_supported=np.array(
+                [p.rollback_supported for p in patches], dtype=bool
+            )[node_patch],
+            takes_down=requires_restart | requires_reboot,
+            exposure_weight=criticality * severity,
+            node_service=node_service_arr,
+            node_min_up=node_min_up,
+            service_names=list(service_index),
+            service_min_up=service_min_up,
+            service_order=service_order,
+            service_starts=service_starts,
+            version_names=version_names,
+            version=version,
+            health=np.array([HEALTH_CODES[node.health] for node in nodes], dtype=np.int8),
+            edges=edge_list,
+            edge_source=edge_source,
+            edge_target=edge_target,
+            edge_compatibility=edge_compatibility,
+            edge_max_mixed=np.array(
+                [
+                    e.mixed_max_duration_seconds
+                    if e.mixed_max_duration_seconds is not None
+                    else scenario.incompatible_max_duration_seconds
+                    for e in edge_list
+                ],
+                dtype=np.int64,
+            ),
+            incident_offsets=incident_offsets,
+            incident_edges=incident_edges,
+        )
+
+    def incident(self, node: int) -> np.ndarray:
+        """DEGRADED/INCOMPATIBLE edges with ``node`` as an endpoint."""
+        return self.incident_edges[self.incident_offsets[node] : self.incident_offsets[node + 1]]
+
+    def indices(self, node_ids: Iterable[str]) -> np.ndarray:
+        """Translate node IDs into an array of node indices."""
+        return np.array([self.index[node_id] for node_id in node_ids], dtype=np.intp)
+
+
+def _incident_tracked_edges(
+    node_count: int,
+    edge_source: np.ndarray,
+    edge_target: np.ndarray,
+    edge_compatibility: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """CSR node -> edge adjacency over the edges whose mixed versions are tracked."""
+    tracked = np.flatnonzero(edge_compatibility != COMPATIBLE)
+    endpoints = np.concatenate([edge_source[tracked], edge_target[tracked]])
+    edges = np.concatenate([tracked, tracked])
+    order = np.argsort(endpoints, kind="stable")
+    offsets = np.zeros(node_count + 1, dtype=np.intp)
+    np.cumsum(np.bincount(endpoints, minlength=node_count), out=offsets[1:])
+    return offsets, edges[order].astype(np.intp)
+
+
+def encode_versions(
+    versions: Iterable[Optional[str]], known: Optional[List[str]] = None
+) -> Tuple[np.ndarray, List[str]]:
+    """Intern version strings as integer codes, extending ``known`` as needed."""
+    names = list(known) if known is not None else ["v_old", "v_new"]
+    codes = {name: code for code, name in enumerate(names)}
+    encoded = []
+    for version in versions:
+        code = codes.get(version)
+        if code is None:
+            code = codes[version] = len(names)
+            names.append(version)
+        encoded.append(code)
+    return np.array(encoded, dtype=np.int32), names
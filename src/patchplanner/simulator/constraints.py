@@ -2,11 +2,15 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from typing import Dict, Iterable, List, Tuple
+from typing import TYPE_CHECKING, Dict, Iterable, List, Set, Tuple
 
-import networkx as nx
+import numpy as np
 
 from ..models import CompatibilityLevel, EdgeSpec, HealthState, ScenarioSpec
+from .compiled import HEALTHY, CompiledScenario
+
+if TYPE_CHECKING:
+    import networkx as nx
 
 
 def service_groups(graph: nx.DiGraph) -> Dict[str, List[str]]:
@@ -52,6 +56,76 @@ def availability_ok(
     return (len(violations) == 0, violations)
 
 
+class ServiceHealthIndex:
+    """Per-service healthy counters kept in sync with an encoded health array.
+
+    Health changes must go through :meth:`set_health`, which adjusts the
+    counters of the affected services only. Availability checks then cost
+    O(nodes in the step) rather than a pass over the whole fleet.
+    """
+
+    def __init__(self, compiled: CompiledScenario, health: np.ndarray):
+        self.compiled = compiled
+        self.health = health
+        self.members = (
+            np.split(compiled.service_order, compiled.service_starts[1:])
+            if compiled.service_names
+            else []
+        )
+        self.min_up: List[int] = compiled.service_min_up.tolist()
+        self._node_service: List[int] = compiled.node_service.tolist()
+        self.reset()
+
+    def reset(self) -> None:
+        """Recount healthy nodes per service after the health array was rewritten."""
+        self.healthy: List[int] = np.bincount(
+            self.compiled.node_service[self.health == HEALTHY],
+            minlength=len(self.compiled.service_names),
+        ).tolist()
+        self.below: Set[int] = {
+            service
+            for service, (healthy, min_up) in enumerate(zip(self.healthy, self.min_up))
+            if healthy < min_up
+        }
+
+    def set_health(self, node_idx: Iterable[int], code: int) -> None:
+        """Set the health code of ``node_idx`` and update the affected services."""
+        health = self.health
+        for node in node_idx:
+            previous = health[node]
+            if previous == code:
+                continue
+            health[node] = code
+            if previous == HEALTHY:
+                delta = -1
+            elif code == HEALTHY:
+                delta = 1
+            else:
+                continue
+            service = self._node_service[node]
+            self.healthy[service] += delta
+            if self.healthy[service] < self.min_up[service]:
+                self.below.add(service)
+            else:
+                self.below.discard(service)
+
+    def violations(self, down_idx: Iterable[int]) -> List[str]:
+        """Array-backed equivalent of :func:`availability_ok` for taking ``down_idx`` down."""
+        taken: Dict[int, int] = defaultdict(int)
+        for node in set(down_idx):
+            if self.health[node] == HEALTHY:
+                taken[self._node_service[node]] += 1
+        violations: List[str] = []
+        for service in sorted(self.below.union(taken)):
+            healthy = self.healthy[service] - taken.get(service, 0)
+            if healthy < self.min_up[service]:
+                violations.append(
+                    f"service={self.compiled.service_names[service]} healthy={healthy} "
+                    f"min_up={self.min_up[service]}"
+                )
+        return violations
+
+
 def incompatible_mixed_version_edges(
     graph: nx.DiGraph, edges: Iterable[EdgeSpec]
 ) -> List[Tuple[str, str]]:
@@ -1,22 +1,60 @@
 """Discrete-event simulation engine for patch deployment."""
 from __future__ import annotations
 
+import heapq
 import random
-from typing import Dict, Iterable, List
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Set, Tuple
 
-import networkx as nx
+from ..models import EdgeSpec, Plan, PlanStep, ScenarioSpec, SimulationResult
+from ..options import ENGINE_MODES
+from .compiled import DOWN, FAILED, HEALTHY, V_NEW, V_OLD, CompiledScenario
+from .events import EventLevel, EventSink, ListSink
+from .metrics import (
+    MetricsState,
+    finalize_metrics,
+    init_version_tracking,
+    set_node_version,
+    update_interval_metrics,
+)
+from .montecarlo import MonteCarloResult, run_monte_carlo
+from .state import SimulationState
 
-from ..models import EdgeSpec, HealthState, Plan, PlanStep, ScenarioSpec, SimulationResult
-from .constraints import availability_ok, min_up_for_service, service_groups
-from .metrics import MetricsState, finalize_metrics, update_interval_metrics
+if TYPE_CHECKING:
+    import networkx as nx
+
+    from ..graph import CSRGraph
+
+
+@dataclass
+class _StepProgress:
+    """A patch step whose nodes are still in flight in event mode."""
+    step: PlanStep
+    start: int
+    remaining: int
 
 
 class SimulationEngine:
-    """Executes deployment plans with failure injection and constraint checking."""
-    def __init__(self, scenario: ScenarioSpec, graph: nx.DiGraph, edges):
+    """Executes deployment plans with failure injection and constraint checking.
+
+    Runs never write to the scenario or graph; node state lives in a
+    :class:`SimulationState`, so one engine can serve repeated and concurrent runs.
+    """
+    def __init__(
+        self,
+        scenario: ScenarioSpec,
+        graph: nx.DiGraph | CSRGraph,
+        edges,
+        compiled: CompiledScenario | None = None,
+    ):
         self.scenario = scenario
         self.graph = graph
         self.edges = self._normalize_edges(edges)
+        self.compiled = (
+            compiled
+            if compiled is not None
+            else CompiledScenario.from_scenario(scenario, self.edges)
+        )
 
     def _normalize_edges(self, edges):
         normalized = []
@@ -34,12 +72,46 @@ class SimulationEngine:
             raise TypeError(f"Unsupported edge type: {type(edge)}")
         return normalized
 
-    def run(self, plan: Plan, seed: int | None = None) -> SimulationResult:
-        """Execute plan and return simulation results with metrics."""
+    def new_state(self) -> SimulationState:
+        """Create a run state initialised from the scenario."""
+        return SimulationState(self.compiled)
+
+    def run(
+        self,
+        plan: Plan,
+        seed: int | None = None,
+        state: SimulationState | None = None,
+        mode: str = "step",
+        sink: EventSink | None = None,
+    ) -> SimulationResult:
+        """Execute plan and return simulation results with metrics.
+
+        A caller-supplied ``state`` is reset before the run and holds the final
+        node versions and health afterwards; otherwise a fresh one is used.
+        ``mode`` selects barrier (``"step"``) or discrete-event (``"event"``)
+        execution; see :meth:`_run_event_driven` for the latter.
+
+        Events go to ``sink``, which the caller keeps ownership of. Without
+        one, every event is collected in ``SimulationResult.events``; with a
+        sink other than a :class:`ListSink` that list is left empty.
+        """
+        if mode not in ENGINE_MODES:
+            raise ValueError(f"Unknown engine mode: {mode}")
         rng = random.Random(seed if seed is not None else self.scenario.seed)
         metrics = MetricsState()
-        events: List[Dict[str, object]] = []
-        current_downtime: Dict[str, int] = {}
+        if sink is None:
+            sink = ListSink()
+        events = sink.events if isinstance(sink, ListSink) else []
+        current_downtime: Dict[int, int] = {}
+        if state is None:
+            state = self.new_state()
+        else:
+            state.reset()
+        init_version_tracking(metrics, self.compiled, state.version)
+
+        if mode == "event":
+            self._run_event_driven(plan, metrics, state, sink, current_downtime, rng)
+            return SimulationResult(plan=plan, events=events, metrics=finalize_metrics(metrics))
 
         # Process each step in the plan
         for step in plan.steps:
@@ -47,24 +119,26 @@ class SimulationEngine:
                 if step.metadata.get("guardrail"):
                     metrics.number_of_guardrail_pauses += 1
                 self._advance_time(metrics, step.pause_seconds)
-                events.append(
-                    {
-                        "time": metrics.time_seconds,
-                        "event": "pause",
-                        "step_id": step.step_id,
-                        "duration": step.pause_seconds,
-                    }
-                )
+                if sink.wants(EventLevel.STEP):
+                    sink.emit(
+                        {
+                            "time": metrics.time_seconds,
+                            "event": "pause",
+                            "step_id": step.step_id,
+                            "duration": step.pause_seconds,
+                        }
+                    )
                 continue
 
             if step.action in ("bluegreen_build", "bluegreen_switch"):
-                self._execute_bluegreen_step(metrics, events, step)
+                self._execute_bluegreen_step(metrics, state, sink, step)
                 continue
 
             if step.action.startswith("patch"):
                 self._execute_patch_step(
                     metrics,
-                    events,
+                    state,
+                    sink,
                     current_downtime,
                     step,
                     rng,
@@ -76,81 +150,261 @@ class SimulationEngine:
         metrics_data = finalize_metrics(metrics)
         return SimulationResult(plan=plan, events=events, metrics=metrics_data)
 
+    def run_many(
+        self,
+        plan: Plan,
+        seeds: int,
+        seed: int | None = None,
+        chunk_size: int = 1024,
+    ) -> MonteCarloResult:
+        """Execute plan for ``seeds`` Monte Carlo replicas in one vectorized pass.
+
+        Every replica starts from the scenario's initial state and follows the
+        ``"step"`` mode semantics of :meth:`run`. Replica outcomes are drawn
+        from a NumPy generator seeded with ``seed`` (default: the scenario
+        seed), so they do not reproduce the per-seed streams of :meth:`run`.
+        """
+        return run_monte_carlo(
+            self.compiled,
+            plan,
+            runs=seeds,
+            seed=seed if seed is not None else self.scenario.seed,
+            chunk_size=chunk_size,
+        )
+
+    def _run_event_driven(
+        self,
+        plan: Plan,
+        metrics: MetricsState,
+        state: SimulationState,
+        sink: EventSink,
+        current_downtime: Dict[int, int],
+        rng: random.Random,
+    ) -> None:
+        """Execute plan with per-node completion times drawn off an event heap.
+
+        A patch step starts as soon as none of its nodes is still patching and
+        taking its nodes down satisfies min_up; until then the engine waits for
+        in-flight nodes to complete, so consecutive steps may overlap. Steps
+        with ``metadata["barrier"]`` wait for all in-flight nodes first. Each
+        node is down for its own patch duration and its outcome is drawn when it
+        completes. Pauses and blue-green steps wait for all in-flight nodes.
+        Metrics integrate over the piecewise-constant intervals between events,
+        and service downtime accrues in every interval, pauses included.
+        """
+        compiled = self.compiled
+        heap: List[Tuple[int, int, int, _StepProgress]] = []
+        in_flight: Set[int] = set()
+        sequence = 0
+
+        def advance_to(time: int) -> None:
+            duration = time - metrics.time_seconds
+            self._apply_downtime(metrics, state, current_downtime, duration)
+            self._advance_time(metrics, duration)
+
+        def complete_next() -> None:
+            finish, _, node_idx, progress = heapq.heappop(heap)
+            advance_to(finish)
+            in_flight.discard(node_idx)
+            if compiled.takes_down[node_idx]:
+                state.services.set_health((node_idx,), HEALTHY)
+            self._finish_node_patch(metrics, state, sink, progress.step, node_idx, rng)
+            progress.remaining -= 1
+            if progress.remaining == 0:
+                self._step_complete_event(sink, metrics, progress)
+
+        def drain() -> None:
+            while heap:
+                complete_next()
+
+        for step in plan.steps:
+            if step.action == "pause":
+                drain()
+                if step.metadata.get("guardrail"):
+                    metrics.number_of_guardrail_pauses += 1
+                advance_to(metrics.time_seconds + step.pause_seconds)
+                if sink.wants(EventLevel.STEP):
+                    sink.emit(
+                        {
+                            "time": metrics.time_seconds,
+                            "event": "pause",
+                            "step_id": step.step_id,
+                            "duration": step.pause_seconds,
+                        }
+                    )
+                continue
+
+            if step.action in ("bluegreen_build", "bluegreen_switch"):
+                drain()
+                idx = compiled.indices(step.node_ids)
+                duration = 0
+                if step.action == "bluegreen_build":
+                    duration = int(compiled.duration[idx].max(initial=0))
+                    advance_to(metrics.time_seconds + duration)
+                else:
+                    set_node_version(metrics, compiled, state.version, idx.tolist(), V_NEW)
+                if sink.wants(EventLevel.STEP):
+                    sink.emit(
+                        {
+                            "time": metrics.time_seconds,
+                            "event": step.action,
+                            "step_id": step.step_id,
+                            "node_ids": step.node_ids,
+                            "duration": duration,
+                        }
+                    )
+                continue
+
+            if not step.action.startswith("patch"):
+                raise ValueError(f"Unknown step action: {step.action}")
+
+            if step.metadata.get("barrier"):
+                drain()
+            # Settle completions due now before deciding whether the step can start.
+            while heap and heap[0][0] <= metrics.time_seconds:
+                complete_next()
+
+            node_idx = list(dict.fromkeys(compiled.indices(step.node_ids).tolist()))
+            down_idx = [node for node in node_idx if compiled.takes_down[node]]
+            while True:
+                if in_flight.intersection(node_idx):
+                    complete_next()
+                    continue
+                violations = state.services.violations(down_idx)
+                if not violations:
+                    break
+                if not heap:
+                    raise RuntimeError(
+                        f"Availability constraint violated before step {step.step_id}: "
+                        f"{violations}"
+                    )
+                complete_next()
+
+            start = metrics.time_seconds
+            state.services.set_health(down_idx, DOWN)
+            # Track node unavailability: each node is down for its own duration
+            metrics.node_unavailability_seconds += int(compiled.duration[down_idx].sum())
+            progress = _StepProgress(step=step, start=start, remaining=len(node_idx))
+            for node in node_idx:
+                heapq.heappush(
+                    heap, (start + int(compiled.duration[node]), sequence, node, progress)
+                )
+                sequence += 1
+                in_flight.add(node)
+            if not node_idx:
+                self._step_complete_event(sink, metrics, progress)
+
+        drain()
+
+    def _step_complete_event(
+        self,
+        sink: EventSink,
+        metrics: MetricsState,
+        progress: _StepProgress,
+    ) -> None:
+        if sink.wants(EventLevel.STEP):
+            sink.emit(
+                {
+                    "time": metrics.time_seconds,
+                    "event": "patch_step_complete",
+                    "step_id": progress.step.step_id,
+                    "node_ids": progress.step.node_ids,
+                    "duration": metrics.time_seconds - progress.start,
+                }
+            )
+
     def _advance_time(self, metrics: MetricsState, duration: int) -> None:
-        update_interval_metrics(metrics, self.graph, self.edges, self.scenario, duration)
+        update_interval_metrics(metrics, self.compiled, duration)
 
     def _execute_bluegreen_step(
-        self, metrics: MetricsState, events: List[Dict[str, object]], step: PlanStep
+        self,
+        metrics: MetricsState,
+        state: SimulationState,
+        sink: EventSink,
+        step: PlanStep,
     ) -> None:
         duration = 0
+        idx = self.compiled.indices(step.node_ids)
         if step.action == "bluegreen_build":
-            durations = [
-                self.graph.nodes[node_id]["spec"].patch.patch_duration_seconds
-                for node_id in step.node_ids
-            ]
-            duration = max(durations, default=0)
+            duration = int(self.compiled.duration[idx].max(initial=0))
             self._advance_time(metrics, duration)
         elif step.action == "bluegreen_switch":
-            for node_id in step.node_ids:
-                self.graph.nodes[node_id]["version"] = "v_new"
+            set_node_version(metrics, self.compiled, state.version, idx.tolist(), V_NEW)
             duration = 0
 
-        events.append(
-            {
-                "time": metrics.time_seconds,
-                "event": step.action,
-                "step_id": step.step_id,
-                "node_ids": step.node_ids,
-                "duration": duration,
-            }
-        )
+        if sink.wants(EventLevel.STEP):
+            sink.emit(
+                {
+                    "time": metrics.time_seconds,
+                    "event": step.action,
+                    "step_id": step.step_id,
+                    "node_ids": step.node_ids,
+                    "duration": duration,
+                }
+            )
 
     def _execute_patch_step(
         self,
         metrics: MetricsState,
-        events: List[Dict[str, object]],
-        current_downtime: Dict[str, int],
+        state: SimulationState,
+        sink: EventSink,
+        current_downtime: Dict[int, int],
         step: PlanStep,
         rng: random.Random,
     ) -> None:
-        down_nodes = [
-            node_id
-            for node_id in step.node_ids
-            if self.graph.nodes[node_id]["spec"].patch.requires_restart
-            or self.graph.nodes[node_id]["spec"].patch.requires_reboot
-        ]
-        ok, violations = availability_ok(self.graph, self.scenario, down_nodes)
-        if not ok:
+        compiled = self.compiled
+        idx = compiled.indices(step.node_ids)
+        down_idx = idx[compiled.takes_down[idx]].tolist()
+        violations = state.services.violations(down_idx)
+        if violations:
             raise RuntimeError(
                 f"Availability constraint violated before step {step.step_id}: {violations}"
             )
 
-        for node_id in down_nodes:
-            self.graph.nodes[node_id]["health"] = HealthState.DOWN
+        state.services.set_health(down_idx, DOWN)
+
+        duration = int(compiled.duration[idx].max(initial=0))
 
-        duration = max(
-            [
-                self.graph.nodes[node_id]["spec"].patch.patch_duration_seconds
-                for node_id in step.node_ids
-            ],
-            default=0,
-        )
-        
         # Track node unavailability: nodes × duration (node-seconds)
-        metrics.node_unavailability_seconds += len(down_nodes) * duration
-        
-        self._apply_downtime(metrics, current_downtime, down_nodes, duration)
+        metrics.node_unavailability_seconds += len(down_idx) * duration
+
+        self._apply_downtime(metrics, state, current_downtime, duration)
         self._advance_time(metrics, duration)
 
-        for node_id in down_nodes:
-            self.graph.nodes[node_id]["health"] = HealthState.HEALTHY
+        state.services.set_health(down_idx, HEALTHY)
+
+        for node_idx in idx.tolist():
+            self._finish_node_patch(metrics, state, sink, step, node_idx, rng)
+
+        if sink.wants(EventLevel.STEP):
+            sink.emit(
+                {
+                    "time": metrics.time_seconds,
+                    "event": "patch_step_complete",
+                    "step_id": step.step_id,
+                    "node_ids": step.node_ids,
+                    "duration": duration,
+                }
+            )
 
-        for node_id in step.node_ids:
-            if rng.random() < self.graph.nodes[node_id]["spec"].patch.failure_probability:
-                if self.graph.nodes[node_id]["spec"].patch.rollback_supported:
-                    metrics.rollback_count += 1
-                    self.graph.nodes[node_id]["version"] = "v_old"
-                    events.append(
+    def _finish_node_patch(
+        self,
+        metrics: MetricsState,
+        state: SimulationState,
+        sink: EventSink,
+        step: PlanStep,
+        node_idx: int,
+        rng: random.Random,
+    ) -> None:
+        """Draw the patch outcome of one node and apply it."""
+        compiled = self.compiled
+        node_id = compiled.node_ids[node_idx]
+        if rng.random() < compiled.failure_probability[node_idx]:
+            if compiled.rollback_supported[node_idx]:
+                metrics.rollback_count += 1
+                set_node_version(metrics, compiled, state.version, (node_idx,), V_OLD)
+                if sink.wants(EventLevel.NODE):
+                    sink.emit(
                         {
                             "time": metrics.time_seconds,
                             "event": "rollback",
@@ -158,9 +412,10 @@ class SimulationEngine:
                             "step_id": step.step_id,
                         }
                     )
-                else:
-                    self.graph.nodes[node_id]["health"] = HealthState.FAILED
-                    events.append(
+            else:
+                state.services.set_health((node_idx,), FAILED)
+                if sink.wants(EventLevel.NODE):
+                    sink.emit(
                         {
                             "time": metrics.time_seconds,
                             "event": "patch_failed",
@@ -168,9 +423,10 @@ class SimulationEngine:
                             "step_id": step.step_id,
                         }
                     )
-            else:
-                self.graph.nodes[node_id]["version"] = "v_new"
-                events.append(
+        else:
+            set_node_version(metrics, compiled, state.version, (node_idx,), V_NEW)
+            if sink.wants(EventLevel.NODE):
+                sink.emit(
                     {
                         "time": metrics.time_seconds,
                         "event": "patched",
@@ -179,44 +435,30 @@ class SimulationEngine:
                     }
                 )
 
-        events.append(
-            {
-                "time": metrics.time_seconds,
-                "event": "patch_step_complete",
-                "step_id": step.step_id,
-                "node_ids": step.node_ids,
-                "duration": duration,
-            }
-        )
-
     def _apply_downtime(
         self,
         metrics: MetricsState,
-        current_downtime: Dict[str, int],
-        down_nodes: Iterable[str],
+        state: SimulationState,
+        current_downtime: Dict[int, int],
         duration: int,
     ) -> None:
         if duration <= 0:
             return
 
-        down_set = set(down_nodes)
-        for service, node_ids in service_groups(self.graph).items():
-            min_up = min_up_for_service(self.graph, self.scenario, service, node_ids)
-            healthy = 0
-            for node_id in node_ids:
-                health = self.graph.nodes[node_id].get("health")
-                if node_id in down_set:
-                    continue
-                if health == HealthState.HEALTHY:
-                    healthy += 1
-            if healthy < min_up:
-                metrics.total_downtime_seconds[service] = (
-                    metrics.total_downtime_seconds.get(service, 0) + duration
-                )
-                current_downtime[service] = current_downtime.get(service, 0) + duration
-                metrics.max_continuous_downtime_seconds[service] = max(
-                    metrics.max_continuous_downtime_seconds.get(service, 0),
-                    current_downtime[service],
-                )
-            else:
-                current_downtime[service] = 0
+        # Only services currently below min_up accrue downtime; every other
+        # service with a running streak has it reset.
+        services = self.compiled.service_names
+        below = state.services.below
+        for service_idx in list(current_downtime):
+            if service_idx not in below:
+                del current_downtime[service_idx]
+        for service_idx in sorted(below):
+            service = services[service_idx]
+            metrics.total_downtime_seconds[service] = (
+                metrics.total_downtime_seconds.get(service, 0) + duration
+            )
+            current_downtime[service_idx] = current_downtime.get(service_idx, 0) + duration
+            metrics.max_continuous_downtime_seconds[service] = max(
+                metrics.max_continuous_downtime_seconds.get(service, 0),
+                current_downtime[service_idx],
+            )
@@ -0,0 +1,118 @@
+"""Destinations for the events emitted by :class:`SimulationEngine` runs."""
+from __future__ import annotations
+
+import json
+from collections import Counter
+from enum import IntEnum
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+class EventLevel(IntEnum):
+    """How much detail a sink records; each level includes the ones below it.
+
+    ``STEP`` covers pauses, blue-green steps and ``patch_step_complete``;
+    ``NODE`` adds the per-node ``patched``, ``rollback`` and ``patch_failed``
+    events.
+    """
+    OFF = 0
+    STEP = 1
+    NODE = 2
+
+
+EVENT_LEVELS = {level.name.lower(): level for level in EventLevel}
+
+
+class EventSink:
+    """Receives events from a run.
+
+    The engine only builds an event when ``wants(level)`` is true, so a sink
+    at ``EventLevel.OFF`` costs nothing per event. Sinks may be shared across
+    runs; the caller owns them and calls :meth:`close` when done.
+    """
+
+    def __init__(self, level: EventLevel = EventLevel.NODE):
+        self.level = EventLevel(level)
+
+    def wants(self, level: EventLevel) -> bool:
+        return self.level >= level
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "EventSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class NullSink(EventSink):
+    """Discards everything; events are never built."""
+
+    def __init__(self):
+        super().__init__(EventLevel.OFF)
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        pass
+
+
+class ListSink(EventSink):
+    """Keeps events in memory, as ``SimulationResult.events`` always did."""
+
+    def __init__(self, level: EventLevel = EventLevel.NODE):
+        super().__init__(level)
+        self.events: List[Dict[str, Any]] = []
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        self.events.append(event)
+
+
+class JsonlSink(EventSink):
+    """Streams events to a JSON Lines file, holding at most ``buffer_size`` in memory."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        level: EventLevel = EventLevel.NODE,
+        buffer_size: int = 1024,
+    ):
+        super().__init__(level)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.buffer_size = buffer_size
+        self._buffer: List[str] = []
+        self._handle = self.path.open("w", encoding="utf-8")
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        self._buffer.append(json.dumps(event))
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._handle.write("\n".join(self._buffer))
+            self._handle.write("\n")
+            self._buffer.clear()
+        self._handle.flush()
+
+    def close(self) -> None:
+        if not self._handle.closed:
+            self.flush()
+            self._handle.close()
+
+
+class CountingSink(EventSink):
+    """Counts events by type and keeps the time of the last one."""
+
+    def __init__(self, level: EventLevel = EventLevel.NODE):
+        super().__init__(level)
+        self.counts: Counter[str] = Counter()
+        self.last_time = 0
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        self.counts[event["event"]] += 1
+        self.last_time = event["time"]
@@ -2,11 +2,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, Iterable, Tuple
+from typing import Dict, Iterable, Set, Tuple
 
-import networkx as nx
+import numpy as np
 
-from ..models import CompatibilityLevel, EdgeSpec, ScenarioSpec
+from .compiled import DEGRADED, INCOMPATIBLE, V_NEW, CompiledScenario
 
 
 @dataclass
@@ -24,76 +24,108 @@ class MetricsState:
     number_of_guardrail_pauses: int = 0
     # Node unavailability: total time × nodes being patched (node-seconds)
     node_unavailability_seconds: int = 0
+    # Running sum of criticality × severity over nodes not on v_new
+    exposure_rate: float = 0.0
+    _unpatched_nodes: int = 0
+    # DEGRADED / INCOMPATIBLE edges whose endpoints currently differ in version
+    _mixed_degraded: Set[int] = field(default_factory=set)
+    _mixed_incompatible: Set[int] = field(default_factory=set)
     _edge_mixed_time: Dict[Tuple[str, str], int] = field(default_factory=dict)
     _edge_violation_seen: Dict[Tuple[str, str], bool] = field(default_factory=dict)
 
 
+def init_version_tracking(
+    metrics: MetricsState, compiled: CompiledScenario, version: np.ndarray
+) -> None:
+    """Seed the running exposure rate and mixed-edge sets from the version state at run start."""
+    unpatched = version != V_NEW
+    metrics.exposure_rate = float(np.dot(unpatched, compiled.exposure_weight))
+    metrics._unpatched_nodes = int(np.count_nonzero(unpatched))
+
+    mixed = version[compiled.edge_source] != version[compiled.edge_target]
+    compatibility = compiled.edge_compatibility
+    metrics._mixed_degraded = set(np.flatnonzero(mixed & (compatibility == DEGRADED)).tolist())
+    metrics._mixed_incompatible = set(
+        np.flatnonzero(mixed & (compatibility == INCOMPATIBLE)).tolist()
+    )
+
+
+def set_node_version(
+    metrics: MetricsState,
+    compiled: CompiledScenario,
+    version: np.ndarray,
+    node_idx: Iterable[int],
+    code: int,
+) -> None:
+    """Set the version code of ``node_idx``, adjusting exposure rate and mixed-edge sets."""
+    weight = compiled.exposure_weight
+    for node in node_idx:
+        previous = version[node]
+        if previous == code:
+            continue
+        version[node] = code
+        for edge in compiled.incident(node).tolist():
+            tracked = (
+                metrics._mixed_degraded
+                if compiled.edge_compatibility[edge] == DEGRADED
+                else metrics._mixed_incompatible
+            )
+            if version[compiled.edge_source[edge]] != version[compiled.edge_target[edge]]:
+                tracked.add(edge)
+            else:
+                tracked.discard(edge)
+        if code == V_NEW:
+            metrics.exposure_rate -= weight[node]
+            metrics._unpatched_nodes -= 1
+        elif previous == V_NEW:
+            metrics.exposure_rate += weight[node]
+            metrics._unpatched_nodes += 1
+    if metrics._unpatched_nodes == 0:
+        # Drop accumulated floating-point residue once everything is patched.
+        metrics.exposure_rate = 0.0
+
+
 def update_interval_metrics(
     metrics: MetricsState,
-    graph: nx.DiGraph,
-    edges: Iterable[EdgeSpec],
-    scenario: ScenarioSpec,
+    compiled: CompiledScenario,
     duration: int,
 ) -> None:
     if duration <= 0:
         return
 
     metrics.time_seconds += duration
-    _update_exposure(metrics, graph, duration)
-    _update_mixed_versions(metrics, graph, edges, scenario, duration)
+    _update_exposure(metrics, duration)
+    _update_mixed_versions(metrics, compiled, duration)
 
 
-def _update_exposure(metrics: MetricsState, graph: nx.DiGraph, duration: int) -> None:
+def _update_exposure(metrics: MetricsState, duration: int) -> None:
     """Calculate exposure window: sum of (criticality × severity × time) for unpatched nodes."""
-    exposure = 0.0
-    for node_id, data in graph.nodes(data=True):
-        if data.get("version") != "v_new":
-            criticality = data.get("criticality", 1)
-            severity = data["spec"].patch.severity
-            exposure += criticality * severity
-    metrics.exposure_window_weighted += exposure * duration
+    metrics.exposure_window_weighted += metrics.exposure_rate * duration
 
 
 def _update_mixed_versions(
     metrics: MetricsState,
-    graph: nx.DiGraph,
-    edges: Iterable[EdgeSpec],
-    scenario: ScenarioSpec,
+    compiled: CompiledScenario,
     duration: int,
 ) -> None:
-    degraded_seen = False
-    for edge in edges:
-        src_version = graph.nodes[edge.source].get("version")
-        tgt_version = graph.nodes[edge.target].get("version")
-        if src_version == tgt_version:
-            continue
-
-        if edge.compatibility in (
-            CompatibilityLevel.DEGRADED,
-            CompatibilityLevel.INCOMPATIBLE,
-        ):
-            metrics.mixed_version_time_seconds += duration
-
-        if edge.compatibility == CompatibilityLevel.DEGRADED:
-            degraded_seen = True
-
-        if edge.compatibility == CompatibilityLevel.INCOMPATIBLE:
-            key = (edge.source, edge.target)
-            metrics._edge_mixed_time[key] = metrics._edge_mixed_time.get(key, 0) + duration
-            max_allowed = (
-                edge.mixed_max_duration_seconds
-                if edge.mixed_max_duration_seconds is not None
-                else scenario.incompatible_max_duration_seconds
-            )
-            if metrics._edge_mixed_time[key] > max_allowed and not metrics._edge_violation_seen.get(
-                key
-            ):
-                metrics.number_of_incompatibility_violations += 1
-                metrics._edge_violation_seen[key] = True
+    metrics.mixed_version_time_seconds += (
+        len(metrics._mixed_degraded) + len(metrics._mixed_incompatible)
+    ) * duration
 
-    if degraded_seen:
+    if metrics._mixed_degraded:
         metrics.number_of_degraded_intervals += 1
 
+    for edge_idx in metrics._mixed_incompatible:
+        edge = compiled.edges[edge_idx]
+        key = (edge.source, edge.target)
+        metrics._edge_mixed_time[key] = metrics._edge_mixed_time.get(key, 0) + duration
+        max_allowed = compiled.edge_max_mixed[edge_idx]
+        if metrics._edge_mixed_time[key] > max_allowed and not metrics._edge_violation_seen.get(
+            key
+        ):
+            metrics.number_of_incompatibility_violations += 1
+            metrics._edge_violation_seen[key] = True
+
 
 def finalize_metrics(metrics: MetricsState) -> Dict[str, float | int | Dict[str, int]]:
     total_downtime_overall = sum(metrics.total_downtime_seconds.values())
@@ -0,0 +1,351 @@
+"""Vectorized Monte Carlo execution of a plan over many replicas."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import numpy as np
+
+from ..models import Plan
+from .compiled import (
+    COMPATIBLE,
+    DEGRADED,
+    DOWN,
+    FAILED,
+    HEALTHY,
+    V_NEW,
+    V_OLD,
+    CompiledScenario,
+)
+
+SCALAR_METRICS = (
+    "time_to_full_patch",
+    "exposure_window_weighted",
+    "mixed_version_time_seconds",
+    "number_of_degraded_intervals",
+    "number_of_incompatibility_violations",
+    "rollback_count",
+    "plan_abort_count",
+    "number_of_guardrail_pauses",
+    "node_unavailability_seconds",
+    "total_downtime_seconds_overall",
+    "max_continuous_downtime_seconds_overall",
+)
+
+
+@dataclass
+class MonteCarloResult:
+    """Per-run metric arrays plus aggregated statistics over all replicas.
+
+    ``metrics`` mirrors the keys of a single-run metrics dict, but every scalar
+    metric is an array of shape ``(runs,)`` and every per-service metric maps
+    service names to such arrays.
+    """
+    plan: Plan
+    runs: int
+    metrics: Dict[str, Any]
+    summary: Dict[str, Dict[str, float]]
+
+
+class _ReplicaBatch:
+    """Simulation state for ``runs`` replicas advanced in lockstep."""
+
+    def __init__(
+        self,
+        compiled: CompiledScenario,
+        runs: int,
+    ):
+        self.compiled = compiled
+        version = compiled.version
+        health = compiled.health
+        self.weight = compiled.exposure_weight
+        self.takes_down = compiled.takes_down
+        # Only DEGRADED and INCOMPATIBLE edges contribute to any metric; they
+        # are renumbered densely, with INCOMPATIBLE ones also numbered among
+        # themselves for the per-edge violation clocks.
+        tracked = np.flatnonzero(compiled.edge_compatibility != COMPATIBLE)
+        self.edge_position = np.full(len(compiled.edges), -1, dtype=np.intp)
+        self.edge_position[tracked] = np.arange(len(tracked))
+        self.edge_source = compiled.edge_source[tracked]
+        self.edge_target = compiled.edge_target[tracked]
+        self.edge_degraded = compiled.edge_compatibility[tracked] == DEGRADED
+        self.incompatible_edges = np.flatnonzero(~self.edge_degraded)
+        self.incompatible_position = np.full(len(tracked), -1, dtype=np.intp)
+        self.incompatible_position[self.incompatible_edges] = np.arange(
+            len(self.incompatible_edges)
+        )
+        self.incompatible_max = compiled.edge_max_mixed[tracked][self.incompatible_edges]
+
+        self.version = np.tile(version, (runs, 1))
+        self.health = np.tile(health, (runs, 1))
+        self.alive = np.ones(runs, dtype=bool)
+
+        # Mixed-version flags for tracked edges, refreshed only for edges
+        # incident to nodes whose version flips (see _set_version).
+        self.mixed = np.tile(version[self.edge_source] != version[self.edge_target], (runs, 1))
+        self.mixed_count = self.mixed.sum(axis=1)
+        self.degraded_count = self.mixed[:, self.edge_degraded].sum(axis=1)
+        self.incompatible_replicas = self.mixed[:, self.incompatible_edges].sum(axis=0)
+        self.mixed_incompatible = set(np.flatnonzero(self.incompatible_replicas).tolist())
+
+        # Running per-replica exposure rate, adjusted on version flips only.
+        unpatched = version != V_NEW
+        self.exposure_rate = np.full(runs, float(np.dot(unpatched, self.weight)))
+        self.unpatched = np.full(runs, int(np.count_nonzero(unpatched)), dtype=np.int64)
+
+        # Per-replica service health counters, adjusted only for the columns a
+        # step touches (see _set_health).
+        services = len(compiled.service_names)
+        self.node_service = compiled.node_service
+        self.min_up = compiled.service_min_up
+        self.healthy = np.tile(
+            np.bincount(compiled.node_service[health == HEALTHY], minlength=services),
+            (runs, 1),
+        ).astype(np.int64)
+        self.below = self.healthy < self.min_up
+        self.below_count = self.below.sum(axis=1)
+        self.below_replicas = self.below.sum(axis=0)
+        self.below_services = set(np.flatnonzero(self.below_replicas).tolist())
+        self.streak_services: set[int] = set()
+        self.totals = {
+            name: np.zeros(runs, dtype=np.float64 if name == "exposure_window_weighted" else np.int64)
+            for name in SCALAR_METRICS
+            if not name.endswith("_overall")
+        }
+        self.downtime = np.zeros((runs, services), dtype=np.int64)
+        self.current_downtime = np.zeros((runs, services), dtype=np.int64)
+        self.max_continuous = np.zeros((runs, services), dtype=np.int64)
+        self.edge_mixed_time = np.zeros((runs, len(self.incompatible_max)), dtype=np.int64)
+        self.edge_violation_seen = np.zeros_like(self.edge_mixed_time, dtype=bool)
+
+    def _set_health(self, idx: np.ndarray, health: np.ndarray) -> None:
+        """Assign ``health`` (runs x len(idx)) to distinct columns ``idx``."""
+        delta = (health == HEALTHY).astype(np.int64) - (self.health[:, idx] == HEALTHY)
+        self.health[:, idx] = health
+        services, inverse = np.unique(self.node_service[idx], return_inverse=True)
+        service_delta = np.zeros((len(delta), len(services)), dtype=np.int64)
+        np.add.at(service_delta, (slice(None), inverse), delta)
+        self.healthy[:, services] += service_delta
+
+        below = self.healthy[:, services] < self.min_up[services]
+        previous = self.below[:, services]
+        self.below[:, services] = below
+        self.below_count += below.sum(axis=1) - previous.sum(axis=1)
+        self.below_replicas[services] += below.sum(axis=0) - previous.sum(axis=0)
+        for service, replicas in zip(services.tolist(), self.below_replicas[services].tolist()):
+            if replicas:
+                self.below_services.add(service)
+            else:
+                self.below_services.discard(service)
+
+    def _set_version(self, idx: np.ndarray, version: np.ndarray) -> None:
+        """Assign ``version`` (runs x len(idx)) to distinct columns ``idx``."""
+        delta = (version != V_NEW).astype(np.int64) - (self.version[:, idx] != V_NEW)
+        self.version[:, idx] = version
+        self.exposure_rate += delta @ self.weight[idx]
+        self.unpatched += delta.sum(axis=1)
+        self.exposure_rate[self.unpatched == 0] = 0.0
+
+        incident = [self.compiled.incident(node) for node in idx.tolist()]
+        if not incident:
+            return
+        edges = self.edge_position[np.unique(np.concatenate(incident))]
+        if not edges.size:
+            return
+        mixed = self.version[:, self.edge_source[edges]] != self.version[:, self.edge_target[edges]]
+        delta = mixed.astype(np.int64) - self.mixed[:, edges]
+        self.mixed[:, edges] = mixed
+        self.mixed_count += delta.sum(axis=1)
+        degraded = self.edge_degraded[edges]
+        self.degraded_count += delta[:, degraded].sum(axis=1)
+
+        incompatible = self.incompatible_position[edges[~degraded]]
+        self.incompatible_replicas[incompatible] += delta[:, ~degraded].sum(axis=0)
+        for edge, replicas in zip(
+            incompatible.tolist(), self.incompatible_replicas[incompatible].tolist()
+        ):
+            if replicas:
+                self.mixed_incompatible.add(edge)
+            else:
+                self.mixed_incompatible.discard(edge)
+
+    def advance(self, duration: int) -> None:
+        if duration <= 0:
+            return
+        alive = self.alive
+        self.totals["time_to_full_patch"] += alive * duration
+        self.totals["exposure_window_weighted"] += np.where(
+            alive, self.exposure_rate * duration, 0.0
+        )
+
+        self.totals["mixed_version_time_seconds"] += np.where(
+            alive, self.mixed_count * duration, 0
+        )
+        self.totals["number_of_degraded_intervals"] += alive & (self.degraded_count > 0)
+
+        if not self.mixed_incompatible:
+            return
+        edges = np.array(sorted(self.mixed_incompatible), dtype=np.intp)
+        mixed = self.mixed[:, self.incompatible_edges[edges]] & alive[:, None]
+        mixed_time = self.edge_mixed_time[:, edges] + mixed * duration
+        self.edge_mixed_time[:, edges] = mixed_time
+        newly_violated = (mixed_time > self.incompatible_max[edges]) & ~self.edge_violation_seen[
+            :, edges
+        ]
+        self.totals["number_of_incompatibility_violations"] += newly_violated.sum(axis=1)
+        self.edge_violation_seen[:, edges] |= newly_violated
+
+    def pause(self, duration: int, guardrail: bool) -> None:
+        if guardrail:
+            self.totals["number_of_guardrail_pauses"] += self.alive
+        self.advance(duration)
+
+    def bluegreen_build(self, idx: np.ndarray) -> None:
+        self.advance(int(self.compiled.duration[idx].max(initial=0)))
+
+    def bluegreen_switch(self, idx: np.ndarray) -> None:
+        alive = self.alive[:, None]
+        self._set_version(idx, np.where(alive, V_NEW, self.version[:, idx]))
+
+    def patch(self, idx: np.ndarray, draws: np.ndarray) -> None:
+        compiled = self.compiled
+        down = idx[self.takes_down[idx]]
+
+        # Availability check; replicas that would violate min_up abort here,
+        # exactly where a single run would raise. Only services touched by the
+        # step can change state, all others keep their cached below flag.
+        services, inverse = np.unique(self.node_service[down], return_inverse=True)
+        taken = np.zeros((len(self.alive), len(services)), dtype=np.int64)
+        np.add.at(taken, (slice(None), inverse), self.health[:, down] == HEALTHY)
+        would_below = (self.healthy[:, services] - taken) < self.min_up[services]
+        below_elsewhere = self.below_count - self.below[:, services].sum(axis=1)
+        violating = ((below_elsewhere > 0) | would_below.any(axis=1)) & self.alive
+        self.totals["plan_abort_count"] += violating
+        self.alive &= ~violating
+        alive = self.alive[:, None]
+
+        previous = self.health[:, down]
+        self._set_health(down, np.where(alive, DOWN, previous))
+
+        duration = int(compiled.duration[idx].max(initial=0))
+        self.totals["node_unavailability_seconds"] += self.alive * (len(down) * duration)
+        if duration > 0:
+            self._apply_downtime(duration)
+        self.advance(duration)
+
+        self._set_health(down, np.where(alive, HEALTHY, previous))
+
+        failed = (draws < compiled.failure_probability[idx]) & alive
+        succeeded = ~failed & alive
+        rolled_back = failed & compiled.rollback_supported[idx]
+        hard_failed = failed & ~compiled.rollback_supported[idx]
+        self.totals["rollback_count"] += rolled_back.sum(axis=1)
+        self._set_version(
+            idx, np.where(rolled_back, V_OLD, np.where(succeeded, V_NEW, self.version[:, idx]))
+        )
+        self._set_health(idx, np.where(hard_failed, FAILED, self.health[:, idx]))
+
+    def _apply_downtime(self, duration: int) -> None:
+        # Columns outside below/streak services neither accrue downtime nor
+        # hold a running streak, so they need no update.
+        services = np.array(
+            sorted(self.below_services | self.streak_services), dtype=np.intp
+        )
+        if not services.size:
+            return
+        alive = self.alive[:, None]
+        below = self.below[:, services] & alive
+        self.downtime[:, services] += below * duration
+        current = self.current_downtime[:, services]
+        current = np.where(below, current + duration, np.where(alive, 0, current))
+        self.current_downtime[:, services] = current
+        self.max_continuous[:, services] = np.maximum(
+            self.max_continuous[:, services], current
+        )
+        self.streak_services = set(services[current.any(axis=0)].tolist())
+
+
+def run_monte_carlo(
+    compiled: CompiledScenario,
+    plan: Plan,
+    runs: int,
+    seed: int = 0,
+    chunk_size: int = 1024,
+) -> MonteCarloResult:
+    """Execute ``plan`` for ``runs`` independent replicas from the scenario's initial state.
+
+    Failure outcomes for a patch step are drawn as a single ``(runs, nodes)``
+    matrix. Replicas that would violate an availability constraint stop at that
+    step and are counted in ``plan_abort_count`` instead of raising.
+    Results are reproducible for a given ``seed``, ``runs`` and ``chunk_size``.
+    """
+    if runs < 1:
+        raise ValueError("runs must be >= 1")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+
+    # Replica state is updated column-wise, so repeated node IDs within a step
+    # are collapsed to their first occurrence.
+    steps = [(step, compiled.indices(dict.fromkeys(step.node_ids))) for step in plan.steps]
+    rng = np.random.default_rng(seed)
+
+    batches = []
+    for start in range(0, runs, chunk_size):
+        batch = _ReplicaBatch(compiled, min(chunk_size, runs - start))
+        for step, idx in steps:
+            if step.action == "pause":
+                batch.pause(step.pause_seconds, bool(step.metadata.get("guardrail")))
+            elif step.action == "bluegreen_build":
+                batch.bluegreen_build(idx)
+            elif step.action == "bluegreen_switch":
+                batch.bluegreen_switch(idx)
+            elif step.action.startswith("patch"):
+                batch.patch(idx, rng.random((len(batch.alive), len(idx))))
+            else:
+                raise ValueError(f"Unknown step action: {step.action}")
+        batches.append(batch)
+
+    metrics = _collect_metrics(compiled, batches)
+    return MonteCarloResult(
+        plan=plan, runs=runs, metrics=metrics, summary=summarize_runs(metrics)
+    )
+
+
+def _collect_metrics(compiled: CompiledScenario, batches: List[_ReplicaBatch]) -> Dict[str, Any]:
+    metrics: Dict[str, Any] = {}
+    for name in batches[0].totals:
+        metrics[name] = np.concatenate([batch.totals[name] for batch in batches])
+    downtime = np.concatenate([batch.downtime for batch in batches])
+    max_continuous = np.concatenate([batch.max_continuous for batch in batches])
+
+    metrics["total_downtime_seconds"] = {
+        service: downtime[:, idx]
+        for idx, service in enumerate(compiled.service_names)
+        if downtime[:, idx].any()
+    }
+    metrics["total_downtime_seconds_overall"] = downtime.sum(axis=1)
+    metrics["max_continuous_downtime_seconds"] = {
+        service: max_continuous[:, idx]
+        for idx, service in enumerate(compiled.service_names)
+        if max_continuous[:, idx].any()
+    }
+    metrics["max_continuous_downtime_seconds_overall"] = max_continuous.max(
+        axis=1, initial=0
+    )
+    return metrics
+
+
+def summarize_runs(metrics: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Aggregate per-run scalar metric arrays into distribution statistics."""
+    summary: Dict[str, Dict[str, float]] = {}
+    for name in SCALAR_METRICS:
+        values = np.asarray(metrics[name], dtype=np.float64)
+        summary[name] = {
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+            "min": float(values.min()),
+            "p50": float(np.percentile(values, 50)),
+            "p95": float(np.percentile(values, 95)),
+            "max": float(values.max()),
+        }
+    return summary
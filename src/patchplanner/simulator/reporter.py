@@ -3,7 +3,7 @@ from __future__ import annotations
 import csv
 import json
 from pathlib import Path
-from typing import Any, Dict, Iterable
+from typing import Any, Dict, Iterable, Optional
 
 from ..models import Plan
 
@@ -11,18 +11,24 @@ from ..models import Plan
 def write_report(
     out_dir: str | Path,
     plan: Plan,
-    events: Iterable[Dict[str, Any]],
+    events: Optional[Iterable[Dict[str, Any]]],
     metrics: Dict[str, Any],
 ) -> None:
+    """Write plan, events, metrics and a markdown summary to ``out_dir``.
+
+    Pass ``events=None`` when the run already streamed them to
+    ``events.jsonl`` through a ``JsonlSink``.
+    """
     out_path = Path(out_dir)
     out_path.mkdir(parents=True, exist_ok=True)
 
     (out_path / "plan.json").write_text(
         json.dumps(plan.model_dump(), indent=2), encoding="utf-8"
     )
-    _write_events(out_path / "events.jsonl", events)
+    if events is not None:
+        _write_events(out_path / "events.jsonl", events)
     _write_metrics(out_path / "metrics.csv", metrics)
-    _write_markdown(out_path / "report.md", metrics)
+    _write_markdown(out_path / "report.md", metrics, plan.metadata)
 
 
 def _write_events(path: Path, events: Iterable[Dict[str, Any]]) -> None:
@@ -48,7 +54,9 @@ def _write_metrics(path: Path, metrics: Dict[str, Any]) -> None:
             writer.writerow([key, value])
 
 
-def _write_markdown(path: Path, metrics: Dict[str, Any]) -> None:
+def _write_markdown(
+    path: Path, metrics: Dict[str, Any], plan_metadata: Optional[Dict[str, Any]] = None
+) -> None:
     lines = ["# Patch Strategy Report", ""]
     lines.append("## Summary")
     lines.append("")
@@ -62,4 +70,11 @@ def _write_markdown(path: Path, metrics: Dict[str, Any]) -> None:
     for service, downtime in metrics.get("total_downtime_seconds", {}).items():
         lines.append(f"- {service}: {downtime}")
     lines.append("")
+    if plan_metadata:
+        # Planner estimates, e.g. the exposure lower bound of ``exposure``
+        lines.append("## Plan")
+        lines.append("")
+        for key, value in plan_metadata.items():
+            lines.append(f"- {key}: {value}")
+        lines.append("")
     path.write_text("\n".join(lines), encoding="utf-8")
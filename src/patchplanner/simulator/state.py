@@ -0,0 +1,51 @@
+"""Per-run node state kept apart from the scenario and its graph."""
+from __future__ import annotations
+
+from typing import Dict
+
+from ..models import HealthState
+from .compiled import HEALTH_STATES, CompiledScenario
+from .constraints import ServiceHealthIndex
+
+
+class SimulationState:
+    """Encoded node versions and health for one simulation run.
+
+    The scenario, its graph and its :class:`CompiledScenario` are never written
+    to, so any number of states (one per run or per thread) can share them.
+    :meth:`reset` restores the scenario's initial state in place, letting a
+    caller reuse one state's buffers across many runs.
+    """
+
+    def __init__(self, compiled: CompiledScenario):
+        self.compiled = compiled
+        self.version = compiled.version.copy()
+        self.health = compiled.health.copy()
+        self.services = ServiceHealthIndex(compiled, self.health)
+
+    def reset(self) -> None:
+        """Restore every node to the version and health declared in the scenario."""
+        self.version[:] = self.compiled.version
+        self.health[:] = self.compiled.health
+        self.services.reset()
+
+    def version_of(self, node_id: str) -> str:
+        return self.compiled.version_names[self.version[self.compiled.index[node_id]]]
+
+    def health_of(self, node_id: str) -> HealthState:
+        return HEALTH_STATES[self.health[self.compiled.index[node_id]]]
+
+    def versions(self) -> Dict[str, str]:
+        """Decode the version of every node, keyed by node ID."""
+        names = self.compiled.version_names
+        return {
+            node_id: names[code]
+            for node_id, code in zip(self.compiled.node_ids, self.version.tolist())
+        }
+
+    def health_states(self) -> Dict[str, HealthState]:
+        """Decode the health of every node, keyed by node ID."""
+        return {
+            node_id: HEALTH_STATES[code]
+            for node_id, code in zip(self.compiled.node_ids, self.health.tolist())
+        }
@@ -0,0 +1,220 @@
+"""Search strategy parameters for the one that minimises an objective over the metrics."""
+from __future__ import annotations
+
+import ast
+import inspect
+import itertools
+import math
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from statistics import fmean
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Union
+
+from .compare import ComparisonRun, aggregate, compare_variants
+from .options import SEARCH_MODES, TUNABLE_PARAMS
+from .planner import STRATEGIES
+
+# Successive halving keeps the best 1/HALVING_RATE of the candidates each
+# round and evaluates them on HALVING_RATE times as many seeds.
+HALVING_RATE = 3
+
+
+class Objective:
+    """An arithmetic expression over metric names, to be minimised.
+
+    For example ``time_to_full_patch + 0.01 * exposure_window_weighted``.
+    Numbers, metric names, ``+ - * / // % **``, comparisons (true counts as
+    1) and ``min``, ``max`` and ``abs`` are allowed; anything else is
+    rejected when the expression is parsed.
+    """
+
+    _FUNCTIONS = {"min": min, "max": max, "abs": abs}
+    _NODES = (
+        ast.Expression,
+        ast.BinOp,
+        ast.UnaryOp,
+        ast.Compare,
+        ast.Constant,
+        ast.Name,
+        ast.Load,
+        ast.Call,
+        ast.operator,
+        ast.unaryop,
+        ast.cmpop,
+    )
+
+    def __init__(self, expression: str):
+        try:
+            tree = ast.parse(expression, mode="eval")
+        except SyntaxError as exc:
+            raise ValueError(f"Invalid objective {expression!r}: {exc.msg}") from None
+        for node in ast.walk(tree):
+            if not isinstance(node, self._NODES) or (
+                isinstance(node, ast.Constant) and not isinstance(node.value, (int, float))
+            ):
+                raise ValueError(
+                    f"Invalid objective {expression!r}: {type(node).__name__} is not allowed"
+                )
+            if isinstance(node, ast.Call) and not (
+                isinstance(node.func, ast.Name)
+                and node.func.id in self._FUNCTIONS
+                and not node.keywords
+            ):
+                raise ValueError(
+                    f"Invalid objective {expression!r}: only min, max and abs may be called"
+                )
+        self.expression = expression
+        self.names = {
+            node.id for node in ast.walk(tree) if isinstance(node, ast.Name)
+        } - set(self._FUNCTIONS)
+        self._code = compile(tree, "<objective>", "eval")
+
+    def __call__(self, metrics: Mapping[str, Any]) -> float:
+        missing = sorted(self.names - set(metrics))
+        if missing:
+            raise ValueError(f"Objective uses unknown metrics: {', '.join(missing)}")
+        scope = {name: metrics[name] for name in self.names}
+        return float(eval(self._code, {"__builtins__": {}, **self._FUNCTIONS}, scope))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.expression!r})"
+
+
+@dataclass
+class Trial:
+    """One candidate parameter set and its runs so far.
+
+    ``score`` is the objective of the seed-mean metrics of each scenario,
+    averaged over scenarios; it is infinite when any run failed or its runs
+    could not be aggregated, with the first failure in ``error``.
+    """
+    params: Dict[str, Any]
+    runs: List[ComparisonRun] = field(default_factory=list)
+    # Leading seeds every scenario was simulated with
+    seeds: int = 0
+    score: float = math.inf
+    error: Optional[str] = None
+
+
+def candidates(space: Mapping[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Every combination of the values in ``space``, parameters in name order."""
+    names = sorted(space)
+    combinations = itertools.product(*(space[name] for name in names))
+    return [dict(zip(names, values)) for values in combinations]
+
+
+def tune(
+    scenarios: Iterable[Union[str, Path]],
+    strategy: str,
+    objective: Union[str, Callable[[Mapping[str, Any]], float]] = "time_to_full_patch",
+    space: Optional[Mapping[str, Sequence[Any]]] = None,
+    search: str = "grid",
+    seeds: Iterable[Optional[int]] = (None,),
+    samples: Optional[int] = None,
+    search_seed: int = 0,
+    jobs: Optional[int] = 1,
+    mode: str = "step",
+    cache_dir: Optional[Union[str, Path]] = None,
+    graph_backend: str = "networkx",
+    plan_cache_dir: Optional[Union[str, Path]] = None,
+) -> List[Trial]:
+    """Evaluate parameter sets of ``strategy`` and return them best first.
+
+    ``space`` maps constructor parameters to the values to try (default:
+    ``TUNABLE_PARAMS[strategy]``). ``search`` is one of:
+
+    - ``grid``: every combination, each simulated with every seed.
+    - ``random``: ``samples`` distinct combinations drawn with ``search_seed``.
+    - ``halving``: successive halving over every combination, or ``samples``
+      of them. All start on one seed; each round the best 1/HALVING_RATE go
+      on to HALVING_RATE times as many seeds, until the survivors have run
+      every seed.
+
+    Candidates run through :func:`~patchplanner.compare.compare_variants` in
+    a pool of ``jobs`` processes; ``mode``, ``cache_dir``, ``graph_backend``
+    and ``plan_cache_dir`` are passed on as in :func:`~patchplanner.compare.compare`.
+    ``objective`` is an :class:`Objective` expression or a callable taking the
+    seed-mean metrics of one scenario; it runs in this process, so it need not
+    be picklable.
+
+    Trials that ran every seed come first, lowest score first.
+    """
+    if search not in SEARCH_MODES:
+        raise ValueError(f"Unknown search: {search} (expected {', '.join(SEARCH_MODES)})")
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy}")
+    if space is None:
+        if strategy not in TUNABLE_PARAMS:
+            raise ValueError(f"No default parameter space for {strategy}; pass one")
+        space = TUNABLE_PARAMS[strategy]
+    if not space or any(not values for values in space.values()):
+        raise ValueError("Every parameter needs at least one value")
+    signature = inspect.signature(STRATEGIES[strategy])
+    try:
+        signature.bind(None, None, **dict.fromkeys(space))
+    except TypeError as exc:
+        raise ValueError(f"Invalid parameters for {strategy}: {exc}") from None
+    if samples is not None and samples < 1:
+        raise ValueError("samples must be >= 1")
+    if search == "random" and samples is None:
+        raise ValueError("random search needs samples")
+    if isinstance(objective, str):
+        objective = Objective(objective)
+
+    scenarios = [str(path) for path in scenarios]
+    seeds = tuple(seeds)
+    if not scenarios or not seeds:
+        raise ValueError("tune needs at least one scenario and one seed")
+    pool = candidates(space)
+    if samples is not None and samples < len(pool):
+        pool = random.Random(search_seed).sample(pool, samples)
+    trials = [Trial(params) for params in pool]
+
+    def evaluate(batch: Sequence[Trial], count: int) -> None:
+        batch = [trial for trial in batch if trial.seeds < count]
+        results = compare_variants(
+            scenarios,
+            strategy,
+            [(trial.params, seeds[trial.seeds:count]) for trial in batch],
+            jobs=jobs,
+            mode=mode,
+            cache_dir=cache_dir,
+            graph_backend=graph_backend,
+            plan_cache_dir=plan_cache_dir,
+        )
+        for trial, runs in zip(batch, results):
+            trial.runs.extend(runs)
+            trial.seeds = count
+            _score(trial, objective)
+
+    if search == "halving":
+        alive, count = trials, 1
+        while True:
+            count = len(seeds) if len(alive) == 1 else min(count, len(seeds))
+            evaluate(alive, count)
+            if count == len(seeds):
+                break
+            alive = sorted(alive, key=lambda trial: trial.score)
+            alive = alive[: math.ceil(len(alive) / HALVING_RATE)]
+            count *= HALVING_RATE
+    else:
+        evaluate(trials, len(seeds))
+
+    # Stable, so ties keep the order candidates were generated in
+    return sorted(trials, key=lambda trial: (-trial.seeds, trial.score))
+
+
+def _score(trial: Trial, objective: Callable[[Mapping[str, Any]], float]) -> None:
+    failed = next((run for run in trial.runs if not run.ok), None)
+    if failed is not None:
+        trial.score, trial.error = math.inf, failed.error
+        return
+    # One strategy per trial: aggregate's scenario -> strategy -> metrics
+    try:
+        results = aggregate(trial.runs)
+    except Exception as exc:  # scored as a failed trial, like a failed run
+        trial.score, trial.error = math.inf, f"{type(exc).__name__}: {exc}"
+        return
+    means = [metrics for by_strategy in results.values() for metrics in by_strategy.values()]
+    trial.score = fmean(objective(metrics) for metrics in means)
@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import patchplanner
+
+
+def test_cli_import_defers_heavy_dependencies():
+    heavy = ("networkx", "numpy", "pydantic", "yaml", "matplotlib", "importlib.metadata")
+    code = (
+        "import sys, patchplanner.cli; "
+        f"print(','.join(m for m in {heavy!r} if m in sys.modules))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": str(Path(patchplanner.__file__).parents[1])},
+    )
+    assert completed.stdout.strip() == ""
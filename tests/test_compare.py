@@ -0,0 +1,67 @@
+from patchplanner.compare import _LOADED, aggregate, compare
+from patchplanner.infra_loader import build_graph, load_scenario
+from patchplanner.planner import RollingStrategy
+from patchplanner.simulator.engine import SimulationEngine
+
+
+def test_compare_runs_in_process_and_matches_single_runs():
+    runs = compare(
+        ["data/scenario2.yaml", "data/scenario3.yaml"],
+        ["bigbang", "rolling"],
+        seeds=[1, 2],
+    )
+    assert [(r.scenario, r.strategy, r.seed) for r in runs] == [
+        (scenario, strategy, seed)
+        for scenario in ("scenario2", "scenario3")
+        for strategy in ("bigbang", "rolling")
+        for seed in (1, 2)
+    ]
+    # bigbang takes whole services down and is reported, not raised
+    assert all(not r.ok and "Availability" in r.error for r in runs if r.strategy == "bigbang")
+
+    scenario = load_scenario("data/scenario3.yaml")
+    graph, edges = build_graph(scenario)
+    plan = RollingStrategy(scenario, graph).generate()
+    expected = SimulationEngine(scenario, graph, edges).run(plan, seed=2).metrics
+    assert runs[-1].metrics == expected
+
+    results = aggregate(runs)
+    assert "error" in results["scenario3"]["bigbang"]
+    assert results["scenario3"]["rolling"]["time_to_full_patch"] == expected["time_to_full_patch"]
+    per_service = results["scenario3"]["rolling"]["total_downtime_seconds"]
+    assert set(per_service) == set(expected["total_downtime_seconds"])
+    # Loaded scenarios are not kept past the call, so changed files are reread
+    assert not _LOADED
+
+    parallel = compare(
+        ["data/scenario2.yaml", "data/scenario3.yaml"],
+        ["bigbang", "rolling"],
+        seeds=[1, 2],
+        jobs=2,
+    )
+    assert parallel == runs
+
+
+def test_aggregate_averages_services_missing_from_some_runs(tmp_path):
+    # a fails without rollback on seed 1 but not on seed 0, so only seed 1's
+    # run has downtime for it while b is still being patched
+    path = tmp_path / "failing.yaml"
+    path.write_text(
+        """
+name: failing
+nodes:
+  - id: a
+    type: SERVICE_INSTANCE
+    service: a
+    patch: {patch_duration_seconds: 10, failure_probability: 0.5, rollback_supported: false}
+  - {id: b, type: SERVICE_INSTANCE, service: b, patch: {patch_duration_seconds: 90}}
+""",
+        encoding="utf-8",
+    )
+    for seeds in ([1, 0], [0, 1]):
+        runs = compare([path], ["makespan"], seeds=seeds, mode="event")
+        assert sorted(bool(r.metrics["total_downtime_seconds"]) for r in runs) == [False, True]
+        downtime = next(r.metrics for r in runs if r.seed == 1)["total_downtime_seconds"]
+        metrics = aggregate(runs)["failing"]["makespan"]
+        assert metrics["total_downtime_seconds"] == {"a": downtime["a"] / 2}
+        assert metrics["max_continuous_downtime_seconds"] == {"a": downtime["a"] / 2}
@@ -250,3 +250,54 @@ def test_incompatible_ignores_compatible_edges():
 
     violations = incompatible_mixed_version_edges(graph, edges)
     assert len(violations) == 0
+
+
+def test_service_health_index_tracks_health_flips():
+    """Verify incremental service counters match a full availability scan."""
+    from patchplanner.simulator.compiled import DOWN, FAILED, HEALTHY, CompiledScenario
+    from patchplanner.simulator.constraints import ServiceHealthIndex
+
+    scenario = ScenarioSpec(
+        name="index",
+        min_up_default=1,
+        nodes=[
+            NodeSpec(id="api-1", type=NodeType.SERVICE_INSTANCE, service="api", min_up=2),
+            NodeSpec(id="api-2", type=NodeType.SERVICE_INSTANCE, service="api"),
+            NodeSpec(id="api-3", type=NodeType.SERVICE_INSTANCE, service="api"),
+            NodeSpec(id="db-1", type=NodeType.DATABASE, service="db"),
+        ],
+        edges=[],
+    )
+    compiled = CompiledScenario.from_scenario(scenario)
+    index = ServiceHealthIndex(compiled, compiled.health.copy())
+    api = compiled.indices(["api-1", "api-2", "api-3"]).tolist()
+    graph, _ = build_graph(scenario)
+
+    def matches_full_scan(down):
+        for node_id, code in zip(compiled.node_ids, index.health):
+            graph.nodes[node_id]["health"] = (
+                HealthState.HEALTHY if code == HEALTHY else HealthState.DOWN
+            )
+        ids = [compiled.node_ids[node] for node in down]
+        return index.violations(down) == availability_ok(graph, scenario, ids)[1]
+
+    assert [members.tolist() for members in index.members] == [api, [compiled.index["db-1"]]]
+    assert index.violations([api[0]]) == []
+    assert index.violations(api[:2]) == ["service=api healthy=1 min_up=2"]
+    assert matches_full_scan([api[0]]) and matches_full_scan(api[:2])
+
+    index.set_health([api[0]], FAILED)
+    assert index.healthy[0] == 2
+    assert index.violations([api[1]]) == ["service=api healthy=1 min_up=2"]
+    assert matches_full_scan([api[1]])
+
+    index.set_health([api[1]], DOWN)
+    assert index.below == {0}
+    # Services already below min_up fail any check, even if untouched
+    assert index.violations([]) == ["service=api healthy=1 min_up=2"]
+    assert matches_full_scan([]) and matches_full_scan([compiled.index["db-1"]])
+
+    index.set_health(api[:2], HEALTHY)
+    assert index.healthy[0] == 3
+    assert index.below == set()
+    assert matches_full_scan(api)
@@ -0,0 +1,35 @@
+import networkx as nx
+import pytest
+
+from patchplanner.generate import GeneratorConfig, write_scenario
+from patchplanner.infra_loader import build_graph, load_scenario
+from patchplanner.models import CompatibilityLevel
+from patchplanner.planner import RollingStrategy
+from patchplanner.simulator.engine import SimulationEngine
+
+
+@pytest.mark.parametrize("topology", ["layered", "star", "random_dag", "incompatible_clusters"])
+def test_generated_scenarios_load_and_simulate(tmp_path, topology):
+    config = GeneratorConfig(
+        topology=topology,
+        nodes=300,
+        seed=5,
+        patch_profiles=("restart", "config"),
+        degraded_ratio=0.2,
+    )
+    path = tmp_path / "generated.yaml"
+    node_count, edge_count = write_scenario(config, path)
+    write_scenario(config, tmp_path / "again.yaml")
+    assert path.read_bytes() == (tmp_path / "again.yaml").read_bytes()
+
+    scenario = load_scenario(path)
+    graph, edges = build_graph(scenario)
+    assert len(scenario.nodes) == node_count == 300
+    assert len(edges) == edge_count > 0
+    assert nx.is_directed_acyclic_graph(graph)
+    incompatible = [e for e in edges if e.compatibility == CompatibilityLevel.INCOMPATIBLE]
+    assert bool(incompatible) == (topology == "incompatible_clusters")
+
+    plan = RollingStrategy(scenario, graph).generate()
+    result = SimulationEngine(scenario, graph, edges).run(plan, seed=1)
+    assert result.metrics["time_to_full_patch"] > 0
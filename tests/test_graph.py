@@ -0,0 +1,59 @@
+import pytest
+
+from patchplanner.generate import GeneratorConfig, write_scenario
+from patchplanner.graph import CSRGraph
+from patchplanner.infra_loader import build_graph, incompatible_components, load_scenario
+from patchplanner.models import CompatibilityLevel, EdgeSpec, NodeSpec, NodeType, PatchSpec
+from patchplanner.planner import STRATEGIES, create_strategy
+
+
+def test_csr_graph_backend_matches_networkx(tmp_path):
+    generated = tmp_path / "clusters.yaml"
+    write_scenario(
+        GeneratorConfig(topology="incompatible_clusters", nodes=200, seed=2, degraded_ratio=0.1),
+        generated,
+    )
+    for path in ("data/scenario3.yaml", generated):
+        scenario = load_scenario(path)
+        nx_graph, edges = build_graph(scenario)
+        csr_graph, _ = build_graph(scenario, backend="csr")
+        assert incompatible_components(csr_graph, edges) == incompatible_components(
+            nx_graph, edges
+        )
+        for node_id in nx_graph.nodes:
+            assert csr_graph.in_degree(node_id) == nx_graph.in_degree(node_id)
+            assert csr_graph.out_degree(node_id) == nx_graph.out_degree(node_id)
+            assert dict(csr_graph.nodes[node_id]) == nx_graph.nodes[node_id]
+        for name in STRATEGIES:
+            # A search cut short by its time budget need not repeat itself
+            params = {"time_budget": 0} if name == "optimal" else None
+            plan = create_strategy(name, scenario, nx_graph, params).generate()
+            assert create_strategy(name, scenario, csr_graph, params).generate() == plan
+
+
+def test_csr_graph_adjacency_components_and_topological_order():
+    nodes = [NodeSpec(id=name, type=NodeType.HOST, patch=PatchSpec()) for name in "abcde"]
+    edges = [
+        EdgeSpec(source="a", target="c"),
+        EdgeSpec(source="a", target="b", compatibility=CompatibilityLevel.DEGRADED),
+        # Repeated edges collapse and the last compatibility wins, as in a DiGraph
+        EdgeSpec(source="a", target="b", compatibility=CompatibilityLevel.INCOMPATIBLE),
+        EdgeSpec(source="d", target="c"),
+    ]
+    graph = CSRGraph.from_specs(nodes, edges)
+
+    assert graph.number_of_edges() == 3
+    assert graph.successors("a") == ["b", "c"]
+    assert graph.predecessors("c") == ["a", "d"]
+    assert (graph.in_degree("c"), graph.out_degree("c")) == (2, 0)
+    assert graph.edges["a", "b"]["compatibility"] == CompatibilityLevel.INCOMPATIBLE
+    assert ("b", "a") not in graph.edges
+    assert graph.connected_components().tolist() == [0, 0, 0, 0, 1]
+    order = graph.topological_order()
+    assert order.index("a") < order.index("b") and order.index("d") < order.index("c")
+
+    cyclic = CSRGraph.from_specs(nodes, edges + [EdgeSpec(source="c", target="a")])
+    with pytest.raises(ValueError, match="cycle"):
+        cyclic.topological_order()
+    with pytest.raises(ValueError, match="unknown node 'z'"):
+        CSRGraph.from_specs(nodes, [EdgeSpec(source="a", target="z")])
@@ -0,0 +1,167 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from patchplanner import infra_loader
+from patchplanner.infra_loader import load_scenario
+from patchplanner.models import CompatibilityLevel, NodeSpec, PatchSpec
+from patchplanner.simulator.compiled import CompiledScenario
+
+
+def test_load_scenario_reuses_content_hashed_cache(tmp_path, monkeypatch):
+    source = tmp_path / "scenario.yaml"
+    source.write_text(open("data/scenario1.yaml", encoding="utf-8").read(), encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+
+    fresh = load_scenario(source, cache_dir=cache_dir)
+    assert fresh == load_scenario(source)
+
+    def fail(path):
+        raise AssertionError("cache miss")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(infra_loader, "_parse_scenario", fail)
+        assert load_scenario(source, cache_dir=cache_dir) == fresh
+
+    source.write_text(source.read_text(encoding="utf-8").replace("seed: 7", "seed: 8"))
+    assert load_scenario(source, cache_dir=cache_dir).seed == 8
+    assert len(list((cache_dir / "scenarios").glob("*.pickle"))) == 2
+
+
+def test_load_scenario_streams_jsonl_and_csv_inventories(tmp_path):
+    inventory = tmp_path / "inventory"
+    inventory.mkdir()
+    (inventory / "scenario.yaml").write_text("name: cmdb\nseed: 3\n", encoding="utf-8")
+    (inventory / "nodes.jsonl").write_text(
+        '{"id": "api-1", "type": "SERVICE_INSTANCE", "service": "api", "min_up": 1}\n'
+        '{"id": "api-2", "type": "SERVICE_INSTANCE", "service": "api", "min_up": 1}\n'
+        "\n"
+        '{"id": "db-1", "type": "DATABASE", "criticality": 5,'
+        ' "patch": {"patch_duration_seconds": 90, "severity": 9.0}}\n',
+        encoding="utf-8",
+    )
+    (inventory / "edges.csv").write_text(
+        "source,target,compatibility\napi-1,db-1,\napi-2,db-1,DEGRADED\n", encoding="utf-8"
+    )
+    (inventory / "patches.csv").write_text(
+        "id,patch_duration_seconds,requires_restart,severity\n"
+        "api-1,60,true,7.5\n"
+        "db-1,10,false,1.0\n",
+        encoding="utf-8",
+    )
+
+    scenario = load_scenario(inventory)
+    assert (scenario.name, scenario.seed) == ("cmdb", 3)
+    nodes = {node.id: node for node in scenario.nodes}
+    assert nodes["api-1"].patch == PatchSpec(
+        patch_duration_seconds=60, requires_restart=True, severity=7.5
+    )
+    assert nodes["api-2"].patch == PatchSpec()
+    # An inline patch wins over the patches file, as in YAML scenarios
+    assert nodes["db-1"].patch.patch_duration_seconds == 90
+    assert [e.compatibility for e in scenario.edges] == [
+        CompatibilityLevel.COMPATIBLE,
+        CompatibilityLevel.DEGRADED,
+    ]
+
+    manifest = tmp_path / "manifest.yaml"
+    manifest.write_text(
+        "name: cmdb\nseed: 3\nnodes: inventory/nodes.jsonl\n"
+        "edges: inventory/edges.csv\npatches: inventory/patches.csv\n",
+        encoding="utf-8",
+    )
+    assert load_scenario(manifest) == scenario
+
+    cache_dir = tmp_path / "cache"
+    assert load_scenario(inventory, cache_dir=cache_dir) == scenario
+    with (inventory / "edges.csv").open("a", encoding="utf-8") as handle:
+        handle.write("api-1,api-2,INCOMPATIBLE\n")
+    assert len(load_scenario(inventory, cache_dir=cache_dir).edges) == 3
+    # Removing, adding or converting a record file is not a stale hit
+    (inventory / "edges.csv").unlink()
+    assert load_scenario(inventory, cache_dir=cache_dir).edges == []
+    (inventory / "edges.jsonl").write_text(
+        '{"source": "api-2", "target": "db-1"}\n', encoding="utf-8"
+    )
+    assert len(load_scenario(inventory, cache_dir=cache_dir).edges) == 1
+
+
+def test_bulk_validation_reports_the_first_invalid_record(tmp_path, monkeypatch):
+    monkeypatch.setattr(infra_loader, "VALIDATION_CHUNK_SIZE", 3)
+    records = [
+        {"id": f"n{i}", "type": "HOST", "criticality": 2, "patch": {"severity": 5.0}}
+        for i in range(8)
+    ]
+    records[5]["patch"]["severity"] = 11.0
+    records[6]["criticality"] = 9
+    with pytest.raises(ValidationError) as expected:
+        NodeSpec(**records[5])
+
+    inventory = tmp_path / "inventory"
+    inventory.mkdir()
+    (inventory / "nodes.jsonl").write_text(
+        "".join(json.dumps(record) + "\n" for record in records), encoding="utf-8"
+    )
+    with pytest.raises(ValidationError) as from_jsonl:
+        load_scenario(inventory)
+    assert str(from_jsonl.value) == str(expected.value)
+
+    yaml_path = tmp_path / "scenario.yaml"
+    yaml_path.write_text(json.dumps({"name": "bad", "nodes": records}), encoding="utf-8")
+    with pytest.raises(ValidationError) as from_yaml:
+        load_scenario(yaml_path)
+    assert str(from_yaml.value) == str(expected.value)
+
+    del records[5:7]
+    (inventory / "nodes.jsonl").write_text(
+        "".join(json.dumps(record) + "\n\n" for record in records), encoding="utf-8"
+    )
+    assert [node.id for node in load_scenario(inventory).nodes] == [r["id"] for r in records]
+
+
+def test_patch_profiles_are_resolved_and_interned(tmp_path):
+    path = tmp_path / "profiles.yaml"
+    path.write_text(
+        """
+name: profiles
+patch_profiles:
+  restart: {patch_duration_seconds: 60, requires_restart: true, severity: 6.0}
+  reboot: {patch_duration_seconds: 180, requires_reboot: true, severity: 8.0}
+patches:
+  host-2: {patch_duration_seconds: 5}
+nodes:
+  - {id: api-1, type: SERVICE_INSTANCE, patch_profile: restart}
+  - {id: api-2, type: SERVICE_INSTANCE, patch_profile: restart}
+  - id: api-3
+    type: SERVICE_INSTANCE
+    patch: {patch_duration_seconds: 60, requires_restart: true, severity: 6.0}
+  - {id: host-1, type: HOST, patch_profile: reboot}
+  - {id: host-2, type: HOST, patch_profile: reboot}
+  - {id: host-3, type: HOST}
+  - {id: host-4, type: HOST}
+""",
+        encoding="utf-8",
+    )
+    scenario = load_scenario(path)
+    nodes = {node.id: node for node in scenario.nodes}
+    restart = scenario.patch_profiles["restart"]
+    assert nodes["api-1"].patch is restart
+    assert nodes["api-2"].patch is restart
+    # Identical inline specs share the profile's instance too
+    assert nodes["api-3"].patch is restart
+    assert nodes["host-1"].patch is scenario.patch_profiles["reboot"]
+    # The patches section still takes precedence over a node's profile
+    assert nodes["host-2"].patch.patch_duration_seconds == 5
+    assert nodes["host-3"].patch is nodes["host-4"].patch
+
+    compiled = CompiledScenario.from_scenario(scenario)
+    assert len(compiled.patches) == 4
+    assert compiled.duration.tolist() == [60, 60, 60, 180, 5, 0, 0]
+
+    path.write_text(
+        "name: bad\nnodes:\n  - {id: a, type: HOST, patch_profile: missing}\n",
+        encoding="utf-8",
+    )
+    with pytest.raises(ValueError, match="Unknown patch profile 'missing' for node 'a'"):
+        load_scenario(path)
@@ -0,0 +1,57 @@
+import os
+
+from patchplanner import plan_cache
+from patchplanner.infra_loader import build_graph, load_scenario
+from patchplanner.models import PatchSpec
+from patchplanner.plan_cache import PlanCache, scenario_digest
+from patchplanner.planner import create_strategy
+
+
+def test_plan_cache_reuses_plans_by_content_and_evicts_least_recent(tmp_path, monkeypatch):
+    scenario = load_scenario("data/scenario1.yaml")
+    graph, _ = build_graph(scenario)
+    cache = PlanCache(tmp_path)
+
+    plan = cache.generate("batch_rolling", scenario, graph, {"batch_size": 2})
+    assert plan == create_strategy("batch_rolling", scenario, graph, {"batch_size": 2}).generate()
+    # Defaults are filled in, and an equal scenario loaded again hashes the same
+    again = load_scenario("data/scenario1.yaml")
+    assert scenario_digest(again) == scenario_digest(scenario)
+    assert cache.key("batch_rolling", again) == cache.key(
+        "batch_rolling", scenario, {"batch_size": 2}
+    )
+    assert cache.key("batch_rolling", scenario, {"batch_size": 3}) != cache.key(
+        "batch_rolling", scenario
+    )
+    changed = scenario.model_copy(update={"min_up_default": 2})
+    assert cache.key("batch_rolling", changed) != cache.key("batch_rolling", scenario)
+    # A scenario changed in place is hashed again, not served its old plans
+    before = scenario_digest(again)
+    again.nodes[0].patch = PatchSpec(patch_duration_seconds=999)
+    assert scenario_digest(again) != before
+    again = load_scenario("data/scenario1.yaml")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cache miss")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(plan_cache, "create_strategy", fail)
+        assert cache.generate("batch_rolling", again, graph) == plan
+
+    # A corrupt entry is regenerated
+    entry = tmp_path / "plans" / f"{cache.key('batch_rolling', scenario)}.pickle"
+    entry.write_bytes(b"not a pickle")
+    assert cache.generate("batch_rolling", scenario, graph) == plan
+
+    # Reading an entry keeps it over older ones once the cache is full
+    hybrid = create_strategy("hybrid", scenario, graph).generate()
+    cache.put(cache.key("hybrid", scenario), hybrid)
+    cache.generate("rolling", scenario, graph)
+    os.utime(entry, (0, 0))
+    os.utime(tmp_path / "plans" / f"{cache.key('rolling', scenario)}.pickle", (1, 1))
+    assert cache.get(cache.key("batch_rolling", scenario)) == plan
+    total = sum(p.stat().st_size for p in (tmp_path / "plans").glob("*.pickle"))
+    PlanCache(tmp_path, max_bytes=total - 1).put(cache.key("hybrid", scenario), hybrid)
+    assert sorted(p.stem for p in (tmp_path / "plans").glob("*.pickle")) == sorted(
+        [cache.key("batch_rolling", scenario), cache.key("hybrid", scenario)]
+    )
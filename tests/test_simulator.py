@@ -49,10 +49,11 @@ def test_simulation_rolls_back_on_failure():
     graph, edges = build_graph(scenario)
     plan = RollingStrategy(scenario, graph).generate()
     engine = SimulationEngine(scenario, graph, edges)
-    result = engine.run(plan, seed=1)
+    state = engine.new_state()
+    result = engine.run(plan, seed=1, state=state)
 
     assert result.metrics["rollback_count"] == 1
-    assert graph.nodes["node-1"]["version"] == "v_old"
+    assert state.version_of("node-1") == "v_old"
 
 
 def test_simulation_marks_failed_without_rollback():
@@ -75,9 +76,10 @@ def test_simulation_marks_failed_without_rollback():
     graph, edges = build_graph(scenario)
     plan = RollingStrategy(scenario, graph).generate()
     engine = SimulationEngine(scenario, graph, edges)
-    engine.run(plan, seed=1)
+    state = engine.new_state()
+    engine.run(plan, seed=1, state=state)
 
-    assert graph.nodes["node-1"]["health"] == HealthState.FAILED
+    assert state.health_of("node-1") == HealthState.FAILED
 
 
 def test_simulation_time_advances_correctly():
@@ -393,3 +395,340 @@ def test_deterministic_with_seed():
 
     # Same seed should produce same rollback count
     assert result1.metrics["rollback_count"] == result2.metrics["rollback_count"]
+
+
+def test_run_many_matches_single_run_without_failures():
+    """Verify Monte Carlo replicas reproduce a deterministic single run."""
+    scenario = load_scenario("data/scenario1.yaml")
+    for node in scenario.nodes:
+        node.patch = node.patch.model_copy(update={"failure_probability": 0.0})
+    graph, edges = build_graph(scenario)
+    plan = RollingStrategy(scenario, graph).generate()
+
+    batch = SimulationEngine(scenario, graph, edges).run_many(plan, seeds=8)
+    single = SimulationEngine(scenario, graph, edges).run(plan, seed=1)
+
+    assert batch.runs == 8
+    for key in ("time_to_full_patch", "exposure_window_weighted", "rollback_count"):
+        assert (batch.metrics[key] == single.metrics[key]).all()
+    assert batch.summary["time_to_full_patch"]["mean"] == single.metrics["time_to_full_patch"]
+
+
+def test_run_many_draws_failures_per_replica():
+    """Verify failure outcomes vary per replica and leave the graph untouched."""
+    scenario = ScenarioSpec(
+        name="monte-carlo",
+        min_up_default=0,
+        nodes=[
+            NodeSpec(
+                id=f"node-{idx}",
+                type=NodeType.HOST,
+                patch=PatchSpec(failure_probability=0.5, rollback_supported=True),
+            )
+            for idx in range(4)
+        ],
+        edges=[],
+    )
+    graph, edges = build_graph(scenario)
+    plan = RollingStrategy(scenario, graph).generate()
+    engine = SimulationEngine(scenario, graph, edges)
+
+    result = engine.run_many(plan, seeds=2000, seed=7, chunk_size=500)
+    repeat = engine.run_many(plan, seeds=2000, seed=7, chunk_size=500)
+
+    assert result.metrics["rollback_count"].shape == (2000,)
+    assert 1.8 < result.summary["rollback_count"]["mean"] < 2.2
+    assert (result.metrics["rollback_count"] == repeat.metrics["rollback_count"]).all()
+    assert all(graph.nodes[n]["version"] == "v_old" for n in graph.nodes)
+
+
+def test_run_many_counts_aborted_replicas():
+    """Verify replicas violating min_up are counted as aborts instead of raising."""
+    from patchplanner.planner import BigBangStrategy
+
+    scenario = ScenarioSpec(
+        name="monte-carlo-abort",
+        min_up_default=1,
+        nodes=[
+            NodeSpec(
+                id="svc-1",
+                type=NodeType.SERVICE_INSTANCE,
+                service="api",
+                patch=PatchSpec(patch_duration_seconds=10, requires_restart=True),
+            ),
+        ],
+        edges=[],
+    )
+    graph, edges = build_graph(scenario)
+    plan = BigBangStrategy(scenario, graph).generate()
+    result = SimulationEngine(scenario, graph, edges).run_many(plan, seeds=3)
+
+    assert (result.metrics["plan_abort_count"] == 1).all()
+    assert (result.metrics["time_to_full_patch"] == 0).all()
+
+
+def test_compiled_scenario_indexes_nodes_and_services():
+    """Verify the compiled arrays mirror node, service and edge attributes."""
+    from patchplanner.simulator.compiled import INCOMPATIBLE, CompiledScenario
+
+    scenario = load_scenario("data/scenario2.yaml")
+    compiled = CompiledScenario.from_scenario(scenario)
+
+    idx = compiled.index["control-1"]
+    assert compiled.node_ids[idx] == "control-1"
+    assert compiled.duration[idx] == 70
+    assert compiled.criticality[idx] == 5
+    assert compiled.service_names[compiled.node_service[idx]] == "control"
+    assert list(compiled.service_min_up) == [1, 1]
+    assert compiled.edge_source[0] == compiled.index["edge-a"]
+    assert compiled.edge_compatibility[0] == INCOMPATIBLE
+
+
+def test_exposure_rate_follows_version_flips():
+    """Verify exposure keeps accruing for rolled-back nodes during later pauses."""
+    from patchplanner.models import Plan, PlanStep
+
+    scenario = ScenarioSpec(
+        name="exposure-flips",
+        min_up_default=0,
+        nodes=[
+            NodeSpec(
+                id="node-1",
+                type=NodeType.HOST,
+                criticality=2,
+                patch=PatchSpec(
+                    patch_duration_seconds=10,
+                    severity=5.0,
+                    failure_probability=1.0,
+                    rollback_supported=True,
+                ),
+            ),
+            NodeSpec(
+                id="node-2",
+                type=NodeType.HOST,
+                criticality=1,
+                patch=PatchSpec(patch_duration_seconds=10, severity=4.0),
+            ),
+        ],
+        edges=[],
+    )
+    graph, edges = build_graph(scenario)
+    plan = Plan(
+        strategy="manual",
+        steps=[
+            PlanStep(step_id="patch-1", action="patch", node_ids=["node-1", "node-2"]),
+            PlanStep(step_id="pause-1", action="pause", pause_seconds=100),
+        ],
+    )
+    result = SimulationEngine(scenario, graph, edges).run(plan, seed=1)
+
+    # (10 + 4) × 10s while patching, then only the rolled-back node: 10 × 100s
+    assert result.metrics["exposure_window_weighted"] == 1140.0
+
+
+def test_mixed_version_time_tracks_incident_edges():
+    """Verify mixed-version time starts and stops with endpoint version flips."""
+    from patchplanner.models import Plan, PlanStep
+
+    scenario = ScenarioSpec(
+        name="mixed-edges",
+        min_up_default=0,
+        nodes=[
+            NodeSpec(
+                id="api",
+                type=NodeType.SERVICE_INSTANCE,
+                patch=PatchSpec(patch_duration_seconds=30),
+            ),
+            NodeSpec(
+                id="db",
+                type=NodeType.DATABASE,
+                patch=PatchSpec(patch_duration_seconds=10),
+            ),
+            NodeSpec(
+                id="web",
+                type=NodeType.SERVICE_INSTANCE,
+                patch=PatchSpec(patch_duration_seconds=5),
+            ),
+        ],
+        edges=[
+            EdgeSpec(
+                source="api",
+                target="db",
+                compatibility=CompatibilityLevel.DEGRADED,
+            ),
+            EdgeSpec(
+                source="web",
+                target="api",
+                compatibility=CompatibilityLevel.COMPATIBLE,
+            ),
+        ],
+    )
+    graph, edges = build_graph(scenario)
+    plan = Plan(
+        strategy="manual",
+        steps=[
+            PlanStep(step_id="patch-1", action="patch", node_ids=["api"]),
+            PlanStep(step_id="pause-1", action="pause", pause_seconds=20),
+            PlanStep(step_id="patch-2", action="patch", node_ids=["db"]),
+            PlanStep(step_id="patch-3", action="patch", node_ids=["web"]),
+        ],
+    )
+    result = SimulationEngine(scenario, graph, edges).run(plan, seed=1)
+
+    # api/db are mixed through the pause and the db patch; web/api is COMPATIBLE
+    assert result.metrics["mixed_version_time_seconds"] == 30
+    assert result.metrics["number_of_degraded_intervals"] == 2
+
+
+def test_runs_do_not_mutate_graph_and_can_share_an_engine():
+    """Verify repeated and concurrent runs on one engine are independent."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    scenario = load_scenario("data/scenario3.yaml")
+    graph, edges = build_graph(scenario)
+    plan = RollingStrategy(scenario, graph).generate()
+    engine = SimulationEngine(scenario, graph, edges)
+
+    state = engine.new_state()
+    first = engine.run(plan, seed=3, state=state)
+    assert state.versions() != {node.id: node.version for node in scenario.nodes}
+    second = engine.run(plan, seed=3, state=state)
+    assert first.metrics == second.metrics
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda seed: engine.run(plan, seed=seed), [3] * 8))
+    assert all(result.metrics == first.metrics for result in results)
+    assert all(graph.nodes[n]["version"] == "v_old" for n in graph.nodes)
+    assert all(graph.nodes[n]["health"] == HealthState.HEALTHY for n in graph.nodes)
+
+
+def test_event_mode_completes_nodes_independently():
+    """Verify event mode frees each node after its own patch duration."""
+    from patchplanner.planner import BigBangStrategy
+
+    scenario = ScenarioSpec(
+        name="event-mode",
+        min_up_default=0,
+        nodes=[
+            NodeSpec(
+                id="slow",
+                type=NodeType.HOST,
+                criticality=1,
+                patch=PatchSpec(patch_duration_seconds=100, requires_reboot=True, severity=1.0),
+            ),
+            NodeSpec(
+                id="fast",
+                type=NodeType.HOST,
+                criticality=1,
+                patch=PatchSpec(patch_duration_seconds=10, requires_reboot=True, severity=1.0),
+            ),
+        ],
+        edges=[],
+    )
+    graph, edges = build_graph(scenario)
+    plan = BigBangStrategy(scenario, graph).generate()
+    engine = SimulationEngine(scenario, graph, edges)
+
+    step = engine.run(plan, seed=1).metrics
+    event = engine.run(plan, seed=1, mode="event").metrics
+
+    assert step["node_unavailability_seconds"] == 200
+    assert event["node_unavailability_seconds"] == 110
+    assert event["time_to_full_patch"] == 100
+    # fast is patched after 10s, slow after 100s
+    assert event["exposure_window_weighted"] == 110.0
+
+
+def test_event_mode_overlaps_steps_within_availability():
+    """Verify event mode starts the next step early unless min_up forbids it."""
+    from patchplanner.models import Plan, PlanStep
+
+    scenario = ScenarioSpec(
+        name="event-overlap",
+        min_up_default=1,
+        nodes=[
+            NodeSpec(
+                id="api-1",
+                type=NodeType.SERVICE_INSTANCE,
+                service="api",
+                patch=PatchSpec(patch_duration_seconds=100, requires_restart=True),
+            ),
+            NodeSpec(
+                id="api-2",
+                type=NodeType.SERVICE_INSTANCE,
+                service="api",
+                patch=PatchSpec(patch_duration_seconds=30, requires_restart=True),
+            ),
+            NodeSpec(
+                id="db",
+                type=NodeType.DATABASE,
+                min_up=0,
+                patch=PatchSpec(patch_duration_seconds=50, requires_restart=True),
+            ),
+        ],
+        edges=[],
+    )
+    graph, edges = build_graph(scenario)
+    plan = Plan(
+        strategy="manual",
+        steps=[
+            PlanStep(step_id="patch-1", action="patch", node_ids=["api-1"]),
+            PlanStep(step_id="patch-2", action="patch", node_ids=["db"]),
+            PlanStep(step_id="patch-3", action="patch", node_ids=["api-2"]),
+        ],
+    )
+    engine = SimulationEngine(scenario, graph, edges)
+    result = engine.run(plan, seed=1, mode="event")
+
+    # db overlaps api-1; api-2 must wait for api-1 to come back at t=100
+    assert result.metrics["time_to_full_patch"] == 130
+    assert result.metrics["total_downtime_seconds_overall"] == 0
+    completions = [e for e in result.events if e["event"] == "patch_step_complete"]
+    assert [(e["step_id"], e["time"]) for e in completions] == [
+        ("patch-2", 50),
+        ("patch-1", 100),
+        ("patch-3", 130),
+    ]
+
+    barrier = plan.model_copy(deep=True)
+    barrier.steps[1].metadata["barrier"] = True
+    # db now waits for api-1; api-2 still overlaps db
+    assert engine.run(barrier, seed=1, mode="event").metrics["time_to_full_patch"] == 150
+
+
+def test_event_sinks_stream_filter_and_count(tmp_path):
+    import json
+
+    from patchplanner.simulator.events import (
+        CountingSink,
+        EventLevel,
+        JsonlSink,
+        ListSink,
+        NullSink,
+    )
+
+    scenario = load_scenario("data/scenario1.yaml")
+    graph, edges = build_graph(scenario)
+    plan = RollingStrategy(scenario, graph).generate()
+    engine = SimulationEngine(scenario, graph, edges)
+    expected = engine.run(plan, seed=3).events
+
+    with JsonlSink(tmp_path / "events.jsonl", buffer_size=2) as sink:
+        result = engine.run(plan, seed=3, sink=sink)
+    assert result.events == []
+    lines = (tmp_path / "events.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == expected
+
+    steps = ListSink(EventLevel.STEP)
+    assert engine.run(plan, seed=3, sink=steps).events == [
+        e for e in expected if e["event"] == "patch_step_complete"
+    ]
+
+    counts = CountingSink()
+    engine.run(plan, seed=3, sink=counts)
+    assert sum(counts.counts.values()) == len(expected)
+    assert counts.last_time == expected[-1]["time"]
+
+    silent = engine.run(plan, seed=3, sink=NullSink())
+    assert silent.events == []
+    assert silent.metrics == result.metrics
@@ -1,7 +1,10 @@
+import pytest
+
 from patchplanner.infra_loader import build_graph
 from patchplanner.models import (
     CompatibilityLevel,
     EdgeSpec,
+    HealthState,
     NodeSpec,
     NodeType,
     PatchSpec,
@@ -90,6 +93,87 @@ def test_dep_greedy_groups_incompatible_nodes():
     assert set(plan.steps[0].node_ids) == {"a", "b"}
 
 
+def test_dep_greedy_takes_riskiest_ready_group_and_rejects_cycles():
+    nodes = [
+        NodeSpec(
+            id=node_id,
+            type=NodeType.SERVICE_INSTANCE,
+            service=node_id,
+            criticality=criticality,
+            patch=PatchSpec(severity=5.0),
+        )
+        for node_id, criticality in (("db", 1), ("cache", 1), ("api", 5), ("batch", 3))
+    ]
+    edges = [
+        EdgeSpec(source="api", target="db"),
+        EdgeSpec(source="api", target="cache"),
+        EdgeSpec(source="batch", target="db"),
+    ]
+    scenario = ScenarioSpec(name="dep-heap", min_up_default=0, nodes=nodes, edges=edges)
+    graph, _ = build_graph(scenario)
+    plan = DependencyAwareGreedyStrategy(scenario, graph).generate()
+    # db unblocks batch, which outranks cache; api waits for both of its dependencies
+    assert [step.node_ids[0] for step in plan.steps] == ["db", "batch", "cache", "api"]
+
+    cyclic = scenario.model_copy(update={"edges": edges + [EdgeSpec(source="db", target="api")]})
+    graph, _ = build_graph(cyclic)
+    with pytest.raises(RuntimeError, match="Dependency cycle"):
+        DependencyAwareGreedyStrategy(cyclic, graph).generate()
+
+
+def test_dep_greedy_waves_pack_ready_groups_within_min_up():
+    from patchplanner.simulator.constraints import availability_ok
+
+    nodes = [
+        NodeSpec(
+            id=f"{service}-{i}",
+            type=NodeType.SERVICE_INSTANCE,
+            service=service,
+            min_up=1,
+            patch=PatchSpec(requires_restart=True),
+        )
+        for service in ("api", "web", "db")
+        for i in range(3)
+    ]
+    # Every api and web instance depends on db-0
+    edges = [
+        EdgeSpec(source=f"{service}-{i}", target="db-0")
+        for service in ("api", "web")
+        for i in range(3)
+    ]
+    scenario = ScenarioSpec(name="waves", nodes=nodes, edges=edges)
+    graph, _ = build_graph(scenario)
+
+    serial = DependencyAwareGreedyStrategy(scenario, graph).generate()
+    plan = DependencyAwareGreedyStrategy(scenario, graph, waves=True).generate()
+    assert len(serial.steps) == 9
+    assert len(plan.steps) < len(serial.steps)
+
+    position = {}
+    for idx, step in enumerate(plan.steps):
+        assert step.metadata["barrier"]
+        assert availability_ok(graph, scenario, step.node_ids)[0]
+        position.update(dict.fromkeys(step.node_ids, idx))
+    assert sorted(position) == sorted(node.id for node in nodes)
+    assert all(position[edge.target] < position[edge.source] for edge in edges)
+    assert "waves_disabled" not in plan.metadata
+
+    # Nodes patched in place stay up, so they never hold a group back
+    in_place = scenario.model_copy(
+        update={"nodes": [node.model_copy(update={"patch": PatchSpec()}) for node in nodes]}
+    )
+    graph, _ = build_graph(in_place)
+    assert len(DependencyAwareGreedyStrategy(in_place, graph, waves=True).generate().steps) == 2
+
+    # A service below min_up fails every step: waves fall back to one group each
+    nodes[:3] = [node.model_copy(update={"health": HealthState.DOWN}) for node in nodes[:3]]
+    degraded = scenario.model_copy(update={"nodes": nodes})
+    graph, _ = build_graph(degraded)
+    plan = DependencyAwareGreedyStrategy(degraded, graph, waves=True).generate()
+    assert len(plan.steps) == 9
+    assert plan.metadata["waves_disabled"] == ["api"]
+
+
 def test_bigbang_patches_all_at_once():
     """Verify BigBang strategy patches everything in one step."""
     from patchplanner.planner import BigBangStrategy
@@ -202,7 +286,12 @@ def test_canary_patches_subset_first():
     assert len(plan.steps) >= 2
     assert "canary" in plan.steps[0].step_id
     # Should have a pause step
-    assert any(step.action == "pause" for step in plan.steps)
+    pauses = [step.pause_seconds for step in plan.steps if step.action == "pause"]
+    assert pauses == [60]
+    plan = CanaryStrategy(scenario, graph, pause_seconds=5).generate()
+    assert [step.pause_seconds for step in plan.steps if step.action == "pause"] == [5]
+    with pytest.raises(ValueError):
+        CanaryStrategy(scenario, graph, pause_seconds=-1)
 
 
 def test_hybrid_chooses_bluegreen_when_possible():
@@ -243,6 +332,9 @@ def test_hybrid_chooses_bluegreen_when_possible():
     # With min_up=3 and 3 nodes, should use blue-green
     assert any(step.action == "bluegreen_build" for step in plan.steps)
     assert any(step.action == "bluegreen_switch" for step in plan.steps)
+    assert [step.pause_seconds for step in plan.steps if step.action == "pause"] == [30] * 3
+    plan = HybridRiskAwareStrategy(scenario, graph, cooldown_seconds=0).generate()
+    assert [step.pause_seconds for step in plan.steps if step.action == "pause"] == [0] * 3
 
 
 def test_hybrid_uses_rolling_when_constrained():
@@ -308,3 +400,185 @@ def test_batch_rolling_respects_batch_size():
     # Each step should have at most 2 nodes
     for step in plan.steps:
         assert len(step.node_ids) <= 2
+
+
+def test_strategy_registry_resolves_lazily_and_discovers_entry_points(monkeypatch):
+    import importlib.metadata
+
+    from patchplanner.planner import RollingStrategy, StrategyRegistry
+
+    discovered = []
+
+    def entry_points(group):
+        discovered.append(group)
+        return [
+            importlib.metadata.EntryPoint(
+                name="plugin", value="patchplanner.planner.bigbang:BigBangStrategy", group=group
+            ),
+            importlib.metadata.EntryPoint(
+                name="broken", value="patchplanner.models:PatchSpec", group=group
+            ),
+        ]
+
+    monkeypatch.setattr(importlib.metadata, "entry_points", entry_points)
+    registry = StrategyRegistry({"rolling": ".rolling:RollingStrategy"}, "test.strategies")
+
+    # Built-in names resolve without scanning installed packages
+    assert registry["rolling"] is RollingStrategy
+    assert discovered == []
+    assert "plugin" in registry
+    assert discovered == ["test.strategies"]
+    assert registry["plugin"].name == "bigbang"
+    assert list(registry) == ["rolling", "plugin", "broken"]
+    with pytest.raises(TypeError, match="not a BaseStrategy subclass"):
+        registry["broken"]
+    with pytest.raises(KeyError):
+        registry["missing"]
+
+
+def test_safe_batches_follow_priority_and_service_limits():
+    from patchplanner.planner import BatchRollingStrategy, RollingStrategy
+
+    nodes = [
+        NodeSpec(
+            id=f"{service}-{i}",
+            type=NodeType.SERVICE_INSTANCE,
+            service=service,
+            criticality=5 - i,
+            min_up=min_up,
+            patch=PatchSpec(),
+        )
+        for service, count, min_up in (("api", 4, 2), ("web", 3, 1), ("db", 1, 1))
+        for i in range(count)
+    ]
+    scenario = ScenarioSpec(name="batches", nodes=nodes, edges=[])
+    graph, _ = build_graph(scenario)
+
+    rolling = RollingStrategy(scenario, graph).generate()
+    assert [step.node_ids for step in rolling.steps] == [
+        ["api-0", "api-1", "web-0", "web-1"],
+        ["api-2", "api-3", "web-2"],
+        # db cannot lose its only node; it is patched last, on its own
+        ["db-0"],
+    ]
+
+    batched = BatchRollingStrategy(scenario, graph, batch_size=3).generate()
+    assert [step.node_ids for step in batched.steps] == [
+        ["api-0", "api-1", "web-0"],
+        ["api-2", "web-1", "web-2"],
+        ["api-3"],
+        ["db-0"],
+    ]
+    assert BatchRollingStrategy(scenario, graph, batch_size=3).generate() == batched
+
+
+def test_makespan_packs_similar_durations_within_min_up():
+    from patchplanner.planner import MakespanPackingStrategy, RollingStrategy
+    from patchplanner.simulator.engine import SimulationEngine
+
+    reboot = PatchSpec(patch_duration_seconds=180, requires_reboot=True)
+    restart = PatchSpec(patch_duration_seconds=30, requires_restart=True)
+    nodes = [
+        NodeSpec(
+            id=node_id,
+            type=NodeType.SERVICE_INSTANCE,
+            service="api",
+            criticality=criticality,
+            min_up=2,
+            patch=patch,
+        )
+        for node_id, criticality, patch in (
+            ("api-0", 5, reboot),
+            ("api-1", 5, restart),
+            ("api-2", 1, reboot),
+            ("api-3", 1, restart),
+        )
+    ] + [
+        # Patched in place, so they never count against min_up
+        NodeSpec(
+            id=f"web-{i}",
+            type=NodeType.SERVICE_INSTANCE,
+            service="web",
+            min_up=2,
+            patch=PatchSpec(patch_duration_seconds=10),
+        )
+        for i in range(3)
+    ]
+    scenario = ScenarioSpec(name="makespan", nodes=nodes)
+    graph, edges = build_graph(scenario)
+
+    plan = MakespanPackingStrategy(scenario, graph).generate()
+    assert [step.node_ids for step in plan.steps] == [
+        ["api-0", "api-2", "web-0", "web-1", "web-2"],
+        ["api-1", "api-3"],
+    ]
+
+    engine = SimulationEngine(scenario, graph, edges)
+    packed = engine.run(plan).metrics["time_to_full_patch"]
+    rolling = engine.run(RollingStrategy(scenario, graph).generate()).metrics
+    assert packed == 210
+    assert packed < rolling["time_to_full_patch"]
+
+
+def test_exposure_follows_smiths_rule_and_reports_lower_bound():
+    from patchplanner.planner import ExposureOrderedStrategy, RollingStrategy
+    from patchplanner.simulator.engine import SimulationEngine
+
+    nodes = [
+        NodeSpec(
+            id=node_id,
+            type=NodeType.SERVICE_INSTANCE,
+            service="svc",
+            criticality=criticality,
+            min_up=2,
+            patch=PatchSpec(
+                patch_duration_seconds=duration, requires_restart=True, severity=severity
+            ),
+        )
+        for node_id, criticality, severity, duration in (
+            ("slow", 5, 2.0, 300),
+            ("hot", 4, 10.0, 30),
+            ("warm", 3, 5.0, 60),
+        )
+    ]
+    scenario = ScenarioSpec(name="exposure", nodes=nodes)
+    graph, edges = build_graph(scenario)
+
+    plan = ExposureOrderedStrategy(scenario, graph).generate()
+    # Highest criticality × severity per second of patching first
+    assert [step.node_ids for step in plan.steps] == [["hot"], ["warm"], ["slow"]]
+
+    engine = SimulationEngine(scenario, graph, edges)
+    exposure = engine.run(plan).metrics["exposure_window_weighted"]
+    rolling = engine.run(RollingStrategy(scenario, graph).generate()).metrics
+    assert exposure == plan.metadata["estimated_exposure"] == 65 * 30 + 25 * 60 + 10 * 300
+    assert exposure < rolling["exposure_window_weighted"]
+    # One node at a time is a single machine, where Smith's rule is optimal
+    assert plan.metadata["exposure_lower_bound"] == pytest.approx(exposure)
+    assert plan.metadata["exposure_gap"] == pytest.approx(0.0)
+
+
+def test_optimal_improves_on_exposure_plan_and_honours_time_budget():
+    from patchplanner.infra_loader import load_scenario
+    from patchplanner.planner import ExposureOrderedStrategy, OptimalStrategy
+    from patchplanner.simulator.engine import SimulationEngine
+
+    scenario = load_scenario("data/scenario1.yaml")
+    graph, edges = build_graph(scenario)
+    greedy = ExposureOrderedStrategy(scenario, graph).generate()
+
+    plan = OptimalStrategy(scenario, graph, time_budget=30).generate()
+    assert plan.metadata["proven_optimal"]
+    assert plan.metadata["estimated_exposure"] < greedy.metadata["estimated_exposure"]
+    assert plan.metadata["exposure_lower_bound"] <= plan.metadata["estimated_exposure"]
+    patched = sorted(n for step in plan.steps for n in step.node_ids)
+    assert patched == sorted(n for step in greedy.steps for n in step.node_ids)
+    SimulationEngine(scenario, graph, edges).run(plan)
+
+    # Without time to search, the starting point is returned as is
+    rushed = OptimalStrategy(scenario, graph, time_budget=0).generate()
+    assert not rushed.metadata["proven_optimal"]
+    assert [step.node_ids for step in rushed.steps] == [step.node_ids for step in greedy.steps]
+
+    with pytest.raises(ValueError, match="time_budget"):
+        OptimalStrategy(scenario, graph, time_budget=-1)
@@ -0,0 +1,81 @@
+import math
+
+import pytest
+
+from patchplanner import tune as tune_module
+from patchplanner.compare import compare
+from patchplanner.tune import Objective, tune
+
+
+def test_tune_searches_parameters_with_an_objective():
+    objective = Objective("time_to_full_patch + max(rollback_count, 0.5) * 100")
+    assert objective({"time_to_full_patch": 10, "rollback_count": 0}) == 60
+    for invalid in ("__import__('os')", "time_to_full_patch.real", "'text'", "lambda: 1"):
+        with pytest.raises(ValueError):
+            Objective(invalid)
+
+    scenarios = ["data/scenario1.yaml", "data/scenario3.yaml"]
+    trials = tune(scenarios, "batch_rolling", space={"batch_size": [1, 2, 4]}, seeds=[1, 2])
+    assert [trial.seeds for trial in trials] == [2, 2, 2]
+    assert [trial.score for trial in trials] == sorted(trial.score for trial in trials)
+    # Scores are the objective of the seed means, averaged over scenarios
+    best = trials[0]
+    runs = compare(
+        scenarios, ["batch_rolling"], seeds=[1, 2], strategy_params={"batch_rolling": best.params}
+    )
+    per_scenario = [
+        sum(r.metrics["time_to_full_patch"] for r in runs if r.scenario == name) / 2
+        for name in ("scenario1", "scenario3")
+    ]
+    assert best.score == pytest.approx(sum(per_scenario) / 2)
+    assert tune(
+        scenarios, "batch_rolling", space={"batch_size": [1, 2, 4]}, seeds=[1, 2], jobs=2
+    )[0].params == best.params
+
+    # Halving runs every seed only for the survivors; random draws distinct samples
+    halved = tune(
+        ["data/scenario1.yaml"], "canary", search="halving", seeds=range(9), jobs=2
+    )
+    assert sorted(trial.seeds for trial in halved) == [1, 1, 1, 3, 9]
+    assert halved[0].params == {"pause_seconds": 0}
+    drawn = tune(["data/scenario1.yaml"], "hybrid", search="random", samples=2)
+    assert len({trial.params["cooldown_seconds"] for trial in drawn}) == 2
+
+    with pytest.raises(ValueError):
+        tune(scenarios, "hybrid", space={"bogus": [1]})
+
+
+def test_tune_scores_seeds_with_differing_service_downtime(tmp_path, monkeypatch):
+    # a fails without rollback on seed 1 but not on seed 0, so only seed 1's
+    # run has downtime for it while b is still being patched
+    path = tmp_path / "failing.yaml"
+    path.write_text(
+        """
+name: failing
+nodes:
+  - id: a
+    type: SERVICE_INSTANCE
+    service: a
+    patch: {patch_duration_seconds: 10, failure_probability: 0.5, rollback_supported: false}
+  - {id: b, type: SERVICE_INSTANCE, service: b, patch: {patch_duration_seconds: 90}}
+""",
+        encoding="utf-8",
+    )
+    objective = "time_to_full_patch + total_downtime_seconds_overall"
+    trials = tune(
+        [path], "batch_rolling", objective, {"batch_size": [1, 2]}, seeds=[1, 0], mode="event"
+    )
+    assert [trial.error for trial in trials] == [None, None]
+    assert all(math.isfinite(trial.score) for trial in trials)
+    downtime = [run.metrics["total_downtime_seconds"] for run in trials[0].runs]
+    assert downtime[1] == {} != downtime[0]
+
+    def fail(runs):
+        raise TypeError("unaggregatable")
+
+    monkeypatch.setattr(tune_module, "aggregate", fail)
+    trials = tune(
+        [path], "batch_rolling", objective, {"batch_size": [1]}, seeds=[1, 0], mode="event"
+    )
+    assert trials[0].score == math.inf
+    assert trials[0].error == "TypeError: unaggregatable"